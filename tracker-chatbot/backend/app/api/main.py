@@ -3,20 +3,26 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 import json
 import asyncio
 import os
+import hashlib
 import tempfile
 import logging
 from datetime import datetime
 
 # Import our modules
 from ..config import settings
-from ..pdf_processor.parser import PDFParser
+from ..pdf_processor.parser import PDFParser, parse_page_ranges
 from ..pdf_processor.chunker import SemanticChunker
+from ..pdf_processor.dedup import ChunkDeduplicator
+from ..pdf_processor.ocr import OCRProcessor
 from ..knowledge_base.embedder import Embedder
 from ..knowledge_base.vector_store import VectorStore
+from ..knowledge_base.parent_store import ParentStore
+from ..knowledge_base.ingest_cache import IngestCache
 from ..retrieval.hybrid_search import HybridSearcher
 from ..llm.groq_client import GroqClient
 from ..llm.prompt_templates import SYSTEM_PROMPT, WELCOME_MESSAGE, ERROR_FALLBACK_PROMPT
@@ -44,10 +50,15 @@ app.add_middleware(
 # Global components (initialized on startup)
 pdf_parser = None
 chunker = None
+deduplicator = None
 embedder = None
 vector_store = None
+parent_store = None
 hybrid_searcher = None
 groq_client = None
+ingest_cache = None
+ocr_processor = None
+ocr_jobs = None  # Single background thread feeding OCR'd pages into the index
 
 # In-memory session storage
 sessions = {}
@@ -56,6 +67,8 @@ sessions = {}
 class ChatRequest(BaseModel):
     message: str
     session_id: Optional[str] = None
+    chunk_type: Optional[str] = None  # "text" or "table" restricts retrieval to that kind of chunk
+    section: Optional[str] = None  # Restricts retrieval to a section (or chapter) by title
 
 
 class ChatResponse(BaseModel):
@@ -70,6 +83,28 @@ class UploadResponse(BaseModel):
     page_count: int
     chunk_count: int
     processing_time: float
+    cache_hit: bool = False
+    already_indexed: bool = False
+    ocr_pages_queued: int = 0
+    reindexed_pages: Optional[List[int]] = None
+    duplicates_removed: int = 0
+    chunks_merged: int = 0
+    parent_count: int = 0
+    table_timeout_pages: List[int] = []
+
+
+class PreflightResponse(BaseModel):
+    filename: str
+    valid: bool
+    page_count: int
+    encrypted: bool
+    needs_password: bool
+    has_text_layer: bool
+    sampled_pages: int
+    image_only_sampled_pages: int
+    estimated_chars: int
+    estimated_chunks: int
+    estimated_seconds: float
 
 
 class StatsResponse(BaseModel):
@@ -77,12 +112,15 @@ class StatsResponse(BaseModel):
     total_chunks: int
     vector_store_stats: Dict[str, Any]
     search_stats: Dict[str, Any]
+    cache_stats: Dict[str, Any] = {}
+    ocr_stats: Dict[str, Any] = {}
 
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize components on startup."""
-    global pdf_parser, chunker, embedder, vector_store, hybrid_searcher, groq_client
+    global pdf_parser, chunker, embedder, vector_store, hybrid_searcher, groq_client, ingest_cache
+    global ocr_processor, ocr_jobs, deduplicator, parent_store
     
     logger.info("Starting PDF Chatbot API...")
     
@@ -93,10 +131,16 @@ async def startup_event():
         os.makedirs(settings.vector_db.persist_directory, exist_ok=True)
         
         # Initialize components
-        pdf_parser = PDFParser()
-        chunker = SemanticChunker(
-            chunk_size=settings.pdf.chunk_size,
-            chunk_overlap=settings.pdf.chunk_overlap
+        pdf_parser = PDFParser(
+            workers=settings.pdf.parse_workers,
+            parallel_min_pages=settings.pdf.parallel_min_pages,
+            table_backend=settings.pdf.table_backend,
+            protected_terms=settings.pdf.protected_terms,
+            extraction_mode=settings.pdf.extraction_mode,
+            table_workers=settings.pdf.table_workers,
+            table_page_timeout=settings.pdf.table_page_timeout,
+            strip_boilerplate=settings.pdf.strip_boilerplate,
+            boilerplate_min_fraction=settings.pdf.boilerplate_min_fraction
         )
         embedder = Embedder(
             model_name=settings.embedding.model,
@@ -104,15 +148,72 @@ async def startup_event():
             device=settings.embedding.device,
             normalize_embeddings=settings.embedding.normalize_embeddings
         )
+        if settings.pdf.token_chunks:
+            # Chunks measured with the model's tokenizer; text past its input limit would never be embedded
+            token_budget = embedder.chunk_token_budget()
+            chunk_size = min(settings.pdf.chunk_tokens or token_budget, token_budget)
+            chunk_overlap = settings.pdf.chunk_overlap_tokens
+            length_function = embedder.token_length()
+            # Merged chunks may outgrow chunk_size, but never the model input
+            merge_max_size = token_budget
+            logger.info(f"Token chunking: {chunk_size} tokens per chunk, {chunk_overlap} overlap")
+        else:
+            chunk_size = settings.pdf.chunk_size
+            chunk_overlap = settings.pdf.chunk_overlap
+            length_function = None
+            merge_max_size = None
+        child_size = child_overlap = 0
+        if settings.pdf.parent_child_chunks:
+            # Parents are never embedded, only their children have to fit the model input
+            chunk_size = settings.pdf.parent_chunk_size
+            child_size = settings.pdf.child_chunk_size
+            child_overlap = settings.pdf.child_chunk_overlap
+            if settings.pdf.token_chunks:
+                child_size = min(child_size, token_budget)
+            merge_max_size = None
+            logger.info(f"Parent/child chunking: {chunk_size} per parent, {child_size} per child")
+        chunker = SemanticChunker(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            category_keywords=settings.pdf.category_keywords,
+            cross_page=settings.pdf.cross_page_chunks,
+            length_function=length_function,
+            structure=settings.pdf.structure_chunks,
+            workers=settings.pdf.chunk_workers,
+            parallel_min_pages=settings.pdf.parallel_min_pages,
+            merge_min_size=settings.pdf.merge_min_size,
+            merge_max_size=merge_max_size,
+            child_size=child_size,
+            child_overlap=child_overlap
+        )
+        if settings.pdf.dedup_chunks:
+            deduplicator = ChunkDeduplicator(threshold=settings.pdf.dedup_threshold)
         vector_store = VectorStore(
             persist_directory=settings.vector_db.persist_directory,
             collection_name=settings.vector_db.collection_name
         )
+        ingest_cache = IngestCache(
+            cache_dir=settings.cache.path,
+            max_size_mb=settings.cache.max_size_mb,
+            enabled=settings.cache.enabled
+        )
+        if settings.ocr.enabled:
+            ocr_processor = OCRProcessor(
+                workers=settings.ocr.workers,
+                dpi=settings.ocr.dpi,
+                language=settings.ocr.language,
+                page_timeout=settings.ocr.page_timeout,
+                text_cleaner=pdf_parser.text_cleaner
+            )
+            ocr_jobs = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ocr")
+        if settings.pdf.parent_child_chunks:
+            parent_store = ParentStore(path=settings.vector_db.parent_store_path)
         hybrid_searcher = HybridSearcher(
             vector_store=vector_store,
             embedder=embedder,
             alpha=settings.retrieval.hybrid_alpha,
-            rrf_k=settings.retrieval.rrf_k
+            rrf_k=settings.retrieval.rrf_k,
+            parent_store=parent_store
         )
         logger.info(f"GROQ_API_KEY loaded: {bool(settings.groq.api_key)}")
         
@@ -136,6 +237,21 @@ async def startup_event():
         raise
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release worker processes on shutdown."""
+    if ocr_jobs is not None:
+        ocr_jobs.shutdown(wait=False)
+    if ocr_processor is not None:
+        ocr_processor.close()
+    if pdf_parser is not None:
+        pdf_parser.close()
+    if chunker is not None:
+        chunker.close()
+    if parent_store is not None:
+        parent_store.close()
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -153,7 +269,9 @@ async def get_stats():
             document_count=vector_stats.get('document_count', 0),
             total_chunks=search_stats.get('indexed_documents', 0),
             vector_store_stats=vector_stats,
-            search_stats=search_stats
+            search_stats=search_stats,
+            cache_stats=ingest_cache.get_stats(),
+            ocr_stats=ocr_processor.get_stats() if ocr_processor else {'enabled': False}
         )
         
     except Exception as e:
@@ -161,67 +279,394 @@ async def get_stats():
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/api/upload")
-async def upload_pdf(file: UploadFile = File(...)):
-    """Upload and process a PDF file."""
+def _parse_cache_settings() -> Dict[str, Any]:
+    """Settings that change parsed pages (chunking and resource limits excluded)."""
+    return settings.pdf.model_dump(exclude={
+        'max_size_mb', 'chunk_size', 'chunk_overlap', 'category_keywords', 'cross_page_chunks',
+        'token_chunks', 'chunk_tokens', 'chunk_overlap_tokens', 'structure_chunks',
+        'dedup_chunks', 'dedup_threshold', 'merge_min_size',
+        'parent_child_chunks', 'parent_chunk_size', 'child_chunk_size', 'child_chunk_overlap',
+        'supported_formats',
+        'parse_workers', 'parallel_min_pages', 'chunk_workers',
+        'preflight_pages_per_second', 'preflight_chunks_per_second'
+    })
+
+
+def _ingest_cache_settings() -> Dict[str, Any]:
+    """Settings that change chunks or their embeddings."""
+    return {
+        'pdf': settings.pdf.model_dump(exclude={
+            'max_size_mb', 'parse_workers', 'parallel_min_pages', 'chunk_workers',
+            'preflight_pages_per_second', 'preflight_chunks_per_second'
+        }),
+        'embedding_model': settings.embedding.model,
+        'normalize_embeddings': settings.embedding.normalize_embeddings,
+    }
+
+
+UPLOAD_READ_SIZE = 1024 * 1024  # Bytes read from the request body per step
+
+
+def _check_upload(file: UploadFile):
+    """Reject non-PDF uploads and uploads whose declared size is over the limit."""
     if not file.filename.endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are supported")
     
-    if file.size > settings.pdf.max_size_mb * 1024 * 1024:
+    if file.size is not None and file.size > settings.pdf.max_size_mb * 1024 * 1024:
         raise HTTPException(
             status_code=400, 
             detail=f"File size exceeds {settings.pdf.max_size_mb}MB limit"
         )
+
+
+async def _save_upload(file: UploadFile) -> Tuple[str, str]:
+    """
+    Stream an upload to a temporary file without holding the body in memory.
+    
+    The size limit is enforced while reading, so oversized bodies are
+    rejected as soon as they cross it.
+    
+    Returns:
+        Tuple of (temp file path, SHA-256 hex digest of the content)
+    """
+    max_bytes = settings.pdf.max_size_mb * 1024 * 1024
+    sha256 = hashlib.sha256()
+    size = 0
+    
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
+        temp_file_path = temp_file.name
+        try:
+            while True:
+                block = await file.read(UPLOAD_READ_SIZE)
+                if not block:
+                    break
+                size += len(block)
+                if size > max_bytes:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"File size exceeds {settings.pdf.max_size_mb}MB limit"
+                    )
+                sha256.update(block)
+                temp_file.write(block)
+        except BaseException:
+            temp_file.close()
+            os.unlink(temp_file_path)
+            raise
+    
+    return temp_file_path, sha256.hexdigest()
+
+
+def _preflight(file_path: str) -> Dict[str, Any]:
+    """Run PDFParser.preflight with the configured chunking and throughput settings."""
+    # With parent/child chunking the embedded chunks are the children
+    splitter = chunker.child_splitter or chunker.text_splitter
+    return pdf_parser.preflight(
+        file_path,
+        chunk_size=splitter.chunk_size * chunker.chars_per_unit,
+        chunk_overlap=splitter.chunk_overlap * chunker.chars_per_unit,
+        pages_per_second=settings.pdf.preflight_pages_per_second,
+        chunks_per_second=settings.pdf.preflight_chunks_per_second
+    )
+
+
+def _retrieval_filter(request: ChatRequest) -> Optional[Dict[str, Any]]:
+    """Metadata filter narrowing the candidates of both searches, or None."""
+    conditions = []
+    if request.chunk_type:
+        conditions.append({'chunk_type': request.chunk_type})
+    if request.section:
+        # A chapter title covers all of its sub-sections
+        conditions.append({'$or': [{'section': request.section}, {'chapter': request.section}]})
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {'$and': conditions}
+
+
+def _build_documents(chunks, embeddings: List[List[float]], filename: str, source: str,
+                     content_hash: str, extraction: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Pair chunks with their embeddings and the metadata stored in the indexes."""
+    documents = []
+    for i, chunk in enumerate(chunks):
+        metadata = {
+            'page_number': chunk.page_number,
+            # Every chunk carries its page span so re-indexing pages can find
+            # the chunks that run across them
+            'page_start': chunk.metadata.get('page_start', chunk.page_number),
+            'page_end': chunk.metadata.get('page_end', chunk.page_number),
+            'chunk_id': chunk.chunk_id,
+            'category': chunk.category,
+            'section': chunk.metadata.get('section', ''),
+            'section_path': chunk.metadata.get('section_path', ''),
+            'chapter': chunk.metadata.get('chapter', ''),
+            'chunk_type': chunk.metadata.get('chunk_type', 'text'),
+            'filename': filename,
+            'source': source,
+            'content_hash': content_hash
+        }
+        if 'duplicate_pages' in chunk.metadata:
+            metadata['duplicate_pages'] = chunk.metadata['duplicate_pages']
+        if 'merged_pages' in chunk.metadata:
+            metadata['merged_pages'] = chunk.metadata['merged_pages']
+        if 'parent_id' in chunk.metadata:
+            metadata['parent_id'] = chunk.metadata['parent_id']
+        if 'table_number' in chunk.metadata:
+            metadata['table_number'] = chunk.metadata['table_number']
+        if extraction:
+            metadata['extraction'] = extraction
+        documents.append({
+            'id': chunk.chunk_id,
+            'content': chunk.content,
+            'embedding': embeddings[i] if i < len(embeddings) else [],
+            'metadata': metadata
+        })
+    return documents
+
+
+def _track_ocr_pages(pages: Iterable[Dict[str, Any]], ocr_pages: List[int],
+                     stream_state: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Pass pages through, recording the numbers of pages flagged for OCR.
+    
+    stream_state['complete'] is set once the last page has been read without error.
+    """
+    for page_info in pages:
+        if page_info.get('needs_ocr'):
+            ocr_pages.append(page_info['page_number'])
+        yield page_info
+    if stream_state is not None:
+        stream_state['complete'] = True
+
+
+def _schedule_ocr(file_path: str, page_numbers: List[int], content_hash: str,
+                  filename: str, source: str, replace: bool = False) -> bool:
+    """
+    Queue OCR of image-only pages in the background.
+    
+    Args:
+        replace: The pages were just re-indexed, so OCR runs even if this
+            content was OCR'd before
+    
+    Returns:
+        True if a job was queued; the job then owns (and deletes) file_path
+    """
+    if not page_numbers or ocr_processor is None or not ocr_processor.available:
+        return False
+    if not replace and vector_store.has_documents(
+            {'$and': [{'content_hash': content_hash}, {'extraction': 'ocr'}]}):
+        return False
+    
+    ocr_jobs.submit(_run_ocr_job, file_path, page_numbers, content_hash, filename, source)
+    logger.info(f"Queued OCR of {len(page_numbers)} image-only pages from {filename}")
+    return True
+
+
+def _run_ocr_job(file_path: str, page_numbers: List[int], content_hash: str,
+                 filename: str, source: str):
+    """OCR pages, then chunk, embed and index them like any other page (runs on the OCR thread)."""
+    try:
+        pages = ocr_processor.ocr_pages(file_path, page_numbers)
+        chunks = chunker.chunk_pages(pages, {'title': source}, doc_id=f"{content_hash[:16]}_ocr")
+        if deduplicator is not None:
+            chunks = deduplicator.deduplicate(chunks)
+        chunks = chunker.merge_small_chunks(chunks)
+        if not chunks:
+            logger.info(f"OCR produced no text for {filename}")
+            return
+        
+        if parent_store is not None:
+            parent_store.put(_build_documents(chunks, [], filename, source, content_hash, extraction='ocr'))
+            chunks = chunker.split_children(chunks)
+        embeddings = embedder.embed_texts([chunk.content for chunk in chunks])
+        documents = _build_documents(chunks, embeddings, filename, source, content_hash, extraction='ocr')
+        vector_store.upsert_documents(documents)
+        
+        # BM25 only holds the most recent upload; extend it if that is still this document
+        hybrid_searcher.extend_if_current(documents, content_hash)
+        
+        logger.info(f"Indexed {len(documents)} OCR chunks from {len(page_numbers)} pages of {filename}")
+        
+    except Exception as e:
+        logger.error(f"Error running OCR for {filename}: {str(e)}")
+    finally:
+        try:
+            os.unlink(file_path)
+        except OSError:
+            pass
+
+
+@app.post("/api/preflight")
+async def preflight_pdf(file: UploadFile = File(...)):
+    """Report page count, encryption, text layer and estimated ingest cost without parsing."""
+    _check_upload(file)
+    temp_file_path, _ = await _save_upload(file)
+    
+    try:
+        return PreflightResponse(filename=file.filename, **_preflight(temp_file_path))
+        
+    except Exception as e:
+        logger.error(f"Error running preflight for {file.filename}: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        os.unlink(temp_file_path)
+
+
+@app.post("/api/upload")
+async def upload_pdf(file: UploadFile = File(...), pages: Optional[str] = Form(None)):
+    """
+    Upload and process a PDF file.
+    
+    With `pages` (e.g. "1-5,120-"), only those pages are parsed, and their
+    chunks replace the indexed chunks of the same pages of this filename.
+    """
+    _check_upload(file)
     
     start_time = asyncio.get_event_loop().time()
     
+    # Save uploaded file temporarily
+    temp_file_path, content_hash = await _save_upload(file)
+    
     try:
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
-        
-        # Parse PDF
-        logger.info(f"Parsing PDF: {file.filename}")
-        pdf_content = pdf_parser.parse_pdf(temp_file_path)
-        
-        # Chunk content
-        logger.info("Chunking content...")
-        chunks = chunker.chunk_document(pdf_content)
-        
-        # Generate embeddings
-        logger.info("Generating embeddings...")
-        chunk_texts = [chunk.content for chunk in chunks]
-        embeddings = embedder.embed_texts(chunk_texts)
-        
-        # Prepare documents for indexing
-        documents = []
-        for i, chunk in enumerate(chunks):
-            doc = {
-                'content': chunk.content,
-                'embedding': embeddings[i] if i < len(embeddings) else [],
-                'metadata': {
-                    'page_number': chunk.page_number,
-                    'chunk_id': chunk.chunk_id,
-                    'category': chunk.category,
-                    'filename': file.filename,
-                    'source': pdf_content.metadata.get('title', file.filename)
-                }
-            }
-            documents.append(doc)
+        # Reject documents we cannot parse before spending CPU on them
+        preflight = _preflight(temp_file_path)
+        if preflight['needs_password']:
+            raise HTTPException(status_code=400, detail="PDF is password protected")
+        if not preflight['valid']:
+            raise HTTPException(status_code=400, detail="File is not a valid PDF or has no pages")
+        
+        page_selection = None
+        replaced_pages = None
+        if pages:
+            try:
+                page_selection = parse_page_ranges(pages, preflight['page_count'])
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            # Indexed chunks that run past the selection are replaced whole, so the
+            # pages they cover are parsed again too (an earlier version of the file
+            # may have had pages this one does not)
+            replaced_pages = vector_store.expand_page_selection(file.filename, page_selection)
+            page_selection = [page for page in replaced_pages if page <= preflight['page_count']]
+        # A partial parse is cached separately from the whole document
+        selection_key = ({'pages': page_selection},) if page_selection else ()
+        
+        # Identical bytes with identical settings always produce identical chunks
+        ingest_key = ingest_cache.make_key(content_hash, _ingest_cache_settings(), *selection_key)
+        cached = ingest_cache.get_documents(ingest_key)
+        
+        if cached is not None:
+            logger.info(f"Ingest cache hit for {file.filename}, skipping parse and embedding")
+            documents = cached['documents']
+            parents = cached.get('parents', [])
+            page_count = cached['info'].get('page_count', 0)
+            ocr_pages = cached['info'].get('ocr_pages', [])
+            duplicates_removed = cached['info'].get('duplicates_removed', 0)
+            chunks_merged = cached['info'].get('chunks_merged', 0)
+            table_timeout_pages = []
+            source = cached['info'].get('title') or file.filename
+            for doc in documents + parents:
+                doc['metadata']['filename'] = file.filename
+                doc['metadata']['source'] = source
+        else:
+            # Parse and chunk as a page stream, so the full document text is never held in memory
+            logger.info(f"Parsing and chunking PDF: {file.filename}")
+            pdf_metadata = pdf_parser.get_metadata(temp_file_path)
+            page_count = pdf_metadata.get('page_count', 0)
+            source = pdf_metadata.get('title') or file.filename
+            ocr_pages = []
+            stream_state = {'complete': False}
+            
+            parse_key = ingest_cache.make_key(content_hash, _parse_cache_settings(), *selection_key)
+            page_stream = ingest_cache.get_pages(parse_key)
+            if page_stream is None:
+                page_stream = ingest_cache.tee_pages(
+                    parse_key, pdf_parser.iter_pages(temp_file_path, page_selection)
+                )
+            page_stream = _track_ocr_pages(page_stream, ocr_pages, stream_state)
+            # Outline TOC up front; a printed TOC arrives with the pages instead,
+            # unless the selection skips the pages it is printed on
+            toc = pdf_parser.get_toc(temp_file_path, scan_text=page_selection is not None)
+            # Tables not found in the text pass come from their own pass
+            tables = None
+            table_info = {}
+            if not pdf_parser.tables_in_text_pass:
+                tables = pdf_parser.get_tables(temp_file_path, page_selection, table_info)
+            table_timeout_pages = table_info.get('table_timeout_pages', [])
+            if table_timeout_pages:
+                logger.warning(f"Table extraction timed out on pages {table_timeout_pages} of {file.filename}")
+            chunks = chunker.chunk_pages(page_stream, pdf_metadata, doc_id=content_hash[:16],
+                                         toc=toc, tables=tables)
+            
+            # Repeated boilerplate is embedded once; the kept copy lists the other pages
+            duplicates_removed = 0
+            if deduplicator is not None:
+                chunk_count = len(chunks)
+                chunks = deduplicator.deduplicate(chunks)
+                duplicates_removed = chunk_count - len(chunks)
+            
+            # Fragments are folded into their neighbours after deduplication, which matches them alone
+            chunk_count = len(chunks)
+            chunks = chunker.merge_small_chunks(chunks)
+            chunks_merged = chunk_count - len(chunks)
+            
+            # Small children are embedded and matched; the chunks themselves become their parents
+            parents = []
+            if parent_store is not None:
+                parents = _build_documents(chunks, [], file.filename, source, content_hash)
+                chunks = chunker.split_children(chunks)
+            
+            # Generate embeddings
+            logger.info("Generating embeddings...")
+            chunk_texts = [chunk.content for chunk in chunks]
+            embeddings = embedder.embed_texts(chunk_texts)
+            
+            # Prepare documents for indexing
+            documents = _build_documents(chunks, embeddings, file.filename, source, content_hash)
+            
+            # Only a document whose every page (and every page's tables) was read
+            # may be served from the cache; a timeout may not recur on a retry
+            if stream_state['complete'] and not table_timeout_pages:
+                ingest_cache.put_documents(ingest_key, documents, info={
+                    'page_count': page_count,
+                    'title': pdf_metadata.get('title', ''),
+                    'ocr_pages': ocr_pages,
+                    'duplicates_removed': duplicates_removed,
+                    'chunks_merged': chunks_merged
+                }, parents=parents)
+            else:
+                logger.warning(f"Parse of {file.filename} was incomplete, not caching its chunks")
         
         # Index documents
         logger.info("Indexing documents...")
         
-        # First, add documents to vector store (ChromaDB)
-        vector_store.add_documents(documents)
+        if page_selection:
+            # Swap out only the chunks of the re-parsed pages
+            already_indexed = False
+            # The selection was widened to the spans of the chunks covering it,
+            # so everything deleted here has just been parsed again
+            vector_store.delete_pages(file.filename, replaced_pages)
+            vector_store.upsert_documents(documents)
+            hybrid_searcher.replace_documents(documents, file.filename, replaced_pages)
+            if parent_store is not None:
+                parent_store.delete_pages(file.filename, replaced_pages)
+        else:
+            # First, add documents to vector store (ChromaDB); chunk IDs are content-derived,
+            # so chunks already stored from an earlier upload are skipped
+            added = vector_store.upsert_documents(documents)
+            already_indexed = bool(documents) and not added
+            if already_indexed:
+                logger.info(f"{file.filename} is already in the vector store, skipping vector indexing")
+            
+            # Then, build BM25 index
+            hybrid_searcher.index_documents(documents)
         
-        # Then, build BM25 index
-        hybrid_searcher.index_documents(documents)
+        # Parents are looked up by ID when their children match, so they are never embedded
+        if parent_store is not None:
+            parent_store.put(parents)
         
-        # Clean up temp file
-        os.unlink(temp_file_path)
+        # Image-only pages are OCR'd off the request path and indexed when done
+        ocr_queued = _schedule_ocr(temp_file_path, ocr_pages, content_hash, file.filename, source,
+                                   replace=page_selection is not None)
+        if not ocr_queued:
+            os.unlink(temp_file_path)
         
         processing_time = asyncio.get_event_loop().time() - start_time
         
@@ -230,20 +675,31 @@ async def upload_pdf(file: UploadFile = File(...)):
         return UploadResponse(
             status="success",
             filename=file.filename,
-            page_count=pdf_content.metadata.get('page_count', 0),
-            chunk_count=len(chunks),
-            processing_time=processing_time
+            page_count=page_count,
+            chunk_count=len(documents),
+            processing_time=processing_time,
+            cache_hit=cached is not None,
+            already_indexed=already_indexed,
+            ocr_pages_queued=len(ocr_pages) if ocr_queued else 0,
+            reindexed_pages=page_selection,
+            duplicates_removed=duplicates_removed,
+            chunks_merged=chunks_merged,
+            parent_count=len(parents),
+            table_timeout_pages=table_timeout_pages
         )
         
+    except HTTPException:
+        os.unlink(temp_file_path)
+        raise
+        
     except Exception as e:
         logger.error(f"Error processing PDF {file.filename}: {str(e)}")
         
         # Clean up temp file if it exists
-        if 'temp_file_path' in locals():
-            try:
-                os.unlink(temp_file_path)
-            except:
-                pass
+        try:
+            os.unlink(temp_file_path)
+        except:
+            pass
         
         raise HTTPException(status_code=500, detail=f"Error processing PDF: {str(e)}")
 
@@ -269,7 +725,8 @@ async def chat(request: ChatRequest):
         logger.info(f"Chat request for session {session_id}: {request.message}")
         
         # Search for relevant documents
-        search_results = hybrid_searcher.search(request.message, top_k=settings.retrieval.top_k)
+        where = _retrieval_filter(request)
+        search_results = hybrid_searcher.search(request.message, top_k=settings.retrieval.top_k, where=where)
         logger.info(f"Chat search returned {len(search_results)} results for query: '{request.message}'")
         
         if not search_results:
@@ -284,8 +741,14 @@ async def chat(request: ChatRequest):
         context_parts = []
         for result in search_results:
             page_num = result.get('metadata', {}).get('page_number', 'Unknown')
+            page_end = result.get('metadata', {}).get('page_end', page_num)
+            pages_label = f"Pages {page_num}-{page_end}" if page_end != page_num else f"Page {page_num}"
+            section = result.get('metadata', {}).get('section', '')
             content = result.get('content', '')
-            context_parts.append(f"(Page {page_num}) {content}")
+            if section:
+                context_parts.append(f"({pages_label}, Section: {section}) {content}")
+            else:
+                context_parts.append(f"({pages_label}) {content}")
         
         context = "\n\n".join(context_parts)
         
@@ -318,7 +781,14 @@ async def chat(request: ChatRequest):
             citations = []
             for result in search_results:
                 page_num = result.get('metadata', {}).get('page_number', 'Unknown')
-                citations.append({"page": page_num, "content": result.get('content', '')[:100] + "..."})
+                citations.append({
+                    "page": page_num,
+                    "page_end": result.get('metadata', {}).get('page_end', page_num),
+                    "also_on_pages": [int(page) for page in
+                                      result.get('metadata', {}).get('duplicate_pages', '').split(', ') if page],
+                    "section": result.get('metadata', {}).get('section', ''),
+                    "content": result.get('content', '')[:100] + "..."
+                })
             
             return {
                 "answer": full_response,
@@ -17,6 +17,7 @@ class VectorDBConfig(BaseSettings):
     path: str = "./data/chroma_db"
     collection_name: str = "pdf_documents"
     persist_directory: str = "./data/chroma_db"
+    parent_store_path: str = "./data/parents.sqlite3"  # Parents of child chunks (parent_child_chunks)
 
 
 class EmbeddingConfig(BaseSettings):
@@ -38,6 +39,46 @@ class PDFConfig(BaseSettings):
     chunk_size: int = 800
     chunk_overlap: int = 150
     supported_formats: list = ["pdf"]
+    parse_workers: int = 1  # 1 = serial, 0 = one process per CPU core
+    parallel_min_pages: int = 64  # Smaller documents are always parsed serially
+    chunk_workers: int = 1  # Processes for chunking pages (1 = serial, 0 = one per CPU core)
+    table_backend: str = "pymupdf"  # "pymupdf" (single pass) or "pdfplumber" (legacy second pass)
+    protected_terms: Optional[list] = None  # Acronyms kept intact by text cleaning (None = built-in list)
+    extraction_mode: str = "text"  # "text" (plain text + regex cleanup) or "blocks" (layout-aware)
+    table_workers: int = 0  # Processes for table extraction with a per-page budget (0 = no pool)
+    table_page_timeout: float = 10.0  # Seconds before table extraction on a page is abandoned
+    strip_boilerplate: bool = True  # Remove running headers, footers and page-number lines
+    boilerplate_min_fraction: float = 0.5  # Share of pages an edge line must repeat on to be stripped
+    category_keywords: Optional[dict] = None  # Chunk category -> keywords (None = built-in list)
+    cross_page_chunks: bool = False  # Chunk the running text of consecutive pages instead of each page
+    token_chunks: bool = False  # Size chunks in embedding-model tokens instead of characters
+    chunk_tokens: int = 0  # Chunk size in tokens with token_chunks (0 = as much as the model embeds)
+    chunk_overlap_tokens: int = 32  # Chunk overlap in tokens with token_chunks
+    structure_chunks: bool = False  # Cut chunks at section starts (TOC titles, headings)
+    dedup_chunks: bool = True  # Drop near-duplicate chunks (repeated notices, headers) before embedding
+    dedup_threshold: float = 0.9  # Estimated shingle similarity at which chunks count as duplicates
+    merge_min_size: int = 200  # Text chunks with fewer characters are merged with their neighbours (0 = off)
+    parent_child_chunks: bool = False  # Embed and match small child chunks, answer with the chunks they were cut from
+    parent_chunk_size: int = 1500  # Parent size with parent_child_chunks (characters, or tokens with token_chunks)
+    child_chunk_size: int = 200  # Child size with parent_child_chunks, same unit
+    child_chunk_overlap: int = 40  # Child overlap with parent_child_chunks, same unit
+    # Throughput assumptions behind the preflight ingest-time estimate
+    preflight_pages_per_second: float = 40.0
+    preflight_chunks_per_second: float = 60.0
+
+
+class OCRConfig(BaseSettings):
+    enabled: bool = False  # Needs pytesseract and the tesseract binary
+    workers: int = 1  # OCR processes, separate from the extraction pool
+    dpi: int = 300
+    language: str = "eng"
+    page_timeout: float = 60.0  # Seconds before OCR of a page is abandoned
+
+
+class CacheConfig(BaseSettings):
+    enabled: bool = True
+    path: str = "./data/cache"
+    max_size_mb: int = 512  # Least recently used entries are evicted above this size
 
 
 class APIConfig(BaseSettings):
@@ -64,6 +105,8 @@ class Settings(BaseSettings):
     embedding: EmbeddingConfig = Field(default_factory=EmbeddingConfig)
     retrieval: RetrievalConfig = Field(default_factory=RetrievalConfig)
     pdf: PDFConfig = Field(default_factory=PDFConfig)
+    ocr: OCRConfig = Field(default_factory=OCRConfig)
+    cache: CacheConfig = Field(default_factory=CacheConfig)
     api: APIConfig = Field(default_factory=APIConfig)
     
     # Paths
@@ -1,7 +1,7 @@
 from sentence_transformers import SentenceTransformer
 import torch
 import numpy as np
-from typing import List, Union, Optional
+from typing import Dict, List, Union, Optional
 import logging
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
@@ -10,6 +10,53 @@ import time
 logger = logging.getLogger(__name__)
 
 
+class TokenLength:
+    def __init__(self, tokenizer, cache_size: int = 65536):
+        """
+        Length of a text in model tokens, for sizing chunks with the splitter's length_function.
+        
+        Special tokens ([CLS], [SEP]) are not counted; they are added once per
+        input, not per piece. Counts are cached, because the text splitter
+        measures the same pieces again while it merges and overlaps them.
+        
+        Args:
+            tokenizer: Fast (Rust) Hugging Face tokenizer of the embedding model
+            cache_size: Texts whose counts are kept
+        """
+        self.tokenizer = tokenizer
+        self.cache_size = cache_size
+        self._cache: Dict[str, int] = {}
+    
+    def __call__(self, text: str) -> int:
+        count = self._cache.get(text)
+        if count is None:
+            count = self.batch([text])[0]
+        return count
+    
+    def batch(self, texts: List[str]) -> List[int]:
+        """Token counts of several texts; uncached texts are tokenized in one call."""
+        counts = {text: self._cache[text] for text in texts if text in self._cache}
+        missing = [text for text in dict.fromkeys(texts) if text not in counts]
+        if missing:
+            encoded = self.tokenizer(
+                missing,
+                add_special_tokens=False,
+                return_attention_mask=False,
+                return_token_type_ids=False,
+                verbose=False  # Texts longer than the model input are expected here
+            )
+            for text, input_ids in zip(missing, encoded['input_ids']):
+                counts[text] = len(input_ids)
+                self._remember(text, len(input_ids))
+        return [counts[text] for text in texts]
+    
+    def _remember(self, text: str, count: int):
+        # Oldest entries go first; dicts keep insertion order
+        if len(self._cache) >= self.cache_size:
+            del self._cache[next(iter(self._cache))]
+        self._cache[text] = count
+
+
 class Embedder:
     def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2", 
                  batch_size: int = 32, device: str = "cpu", normalize_embeddings: bool = True):
@@ -43,6 +90,19 @@ class Embedder:
             logger.error(f"Failed to load model {self.model_name}: {str(e)}")
             raise
     
+    @property
+    def max_seq_length(self) -> int:
+        """Tokens of an input the model embeds; anything after them is truncated."""
+        return self.model.max_seq_length
+    
+    def chunk_token_budget(self) -> int:
+        """Text tokens that fit in one model input next to the special tokens."""
+        return self.max_seq_length - self.model.tokenizer.num_special_tokens_to_add(pair=False)
+    
+    def token_length(self) -> TokenLength:
+        """Cached token counter using the model's tokenizer (see TokenLength)."""
+        return TokenLength(self.model.tokenizer)
+    
     def embed_texts(self, texts: List[str], show_progress: bool = False) -> List[List[float]]:
         """
         Embed a list of texts.
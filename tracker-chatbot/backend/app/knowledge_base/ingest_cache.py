@@ -0,0 +1,285 @@
+import numpy as np
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Iterable, Iterator
+import hashlib
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Bump when the on-disk layout changes so stale entries are never read
+CACHE_FORMAT_VERSION = 7
+
+
+def _json_default(obj: Any) -> Any:
+    """Serialize values such as fitz.Rect that json does not know about."""
+    try:
+        return list(obj)
+    except TypeError:
+        return str(obj)
+
+
+class IngestCache:
+    def __init__(self, cache_dir: str = "./data/cache", max_size_mb: int = 512, enabled: bool = True):
+        """
+        Content-addressed on-disk cache for the upload pipeline.
+
+        Two kinds of entries are stored, both keyed by make_key():
+        - pages: parsed page dicts (JSON lines), keyed by PDF hash + parser settings
+        - documents: chunk contents, metadata and embeddings ready for indexing
+          (plus the parents of child chunks), keyed by PDF hash + parser,
+          chunker and embedding settings
+
+        Args:
+            cache_dir: Directory holding the cache files
+            max_size_mb: Total size above which least recently used entries are evicted
+            enabled: When False every lookup misses and nothing is written
+        """
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.enabled = enabled
+
+        # entry name -> (list of file paths, total size), least recently used first
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._size_bytes = 0
+        self._counters = {
+            'page_hits': 0,
+            'page_misses': 0,
+            'document_hits': 0,
+            'document_misses': 0,
+            'evictions': 0,
+        }
+
+        if self.enabled:
+            os.makedirs(os.path.join(cache_dir, "pages"), exist_ok=True)
+            os.makedirs(os.path.join(cache_dir, "documents"), exist_ok=True)
+            self._load_index()
+            logger.info(f"Initialized ingest cache at {cache_dir} "
+                        f"({len(self._entries)} entries, {self._size_bytes / 1e6:.1f}MB)")
+
+    @staticmethod
+    def make_key(content_hash: str, *settings: Dict[str, Any]) -> str:
+        """
+        Build a cache key from the PDF content hash and the settings that affect the result.
+
+        Args:
+            content_hash: SHA-256 hex digest of the PDF bytes
+            settings: Dicts of settings that change the cached output
+
+        Returns:
+            Hex digest identifying the cache entry
+        """
+        payload = json.dumps([CACHE_FORMAT_VERSION, content_hash, *settings],
+                             sort_keys=True, default=_json_default)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get_pages(self, key: str) -> Optional[Iterator[Dict[str, Any]]]:
+        """
+        Look up parsed pages.
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            Iterator reading the cached pages lazily, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        name = f"pages/{key}"
+        if name not in self._entries:
+            self._counters['page_misses'] += 1
+            return None
+
+        self._counters['page_hits'] += 1
+        self._touch(name)
+        return self._read_pages(os.path.join(self.cache_dir, f"{name}.jsonl"))
+
+    def tee_pages(self, key: str, pages: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Pass a page stream through while writing it to the cache.
+
+        Pages go to disk as they are yielded, so the stream stays bounded in
+        memory. The entry only becomes visible once the stream is exhausted.
+
+        Args:
+            key: Cache key from make_key()
+            pages: Page dicts, e.g. from PDFParser.iter_pages()
+
+        Yields:
+            The same page dicts
+        """
+        if not self.enabled:
+            yield from pages
+            return
+
+        name = f"pages/{key}"
+        path = os.path.join(self.cache_dir, f"{name}.jsonl")
+        tmp_path = f"{path}.tmp"
+        completed = False
+
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for page_info in pages:
+                    f.write(json.dumps(page_info, default=_json_default))
+                    f.write("\n")
+                    yield page_info
+            os.replace(tmp_path, path)
+            completed = True
+            self._add_entry(name, [path])
+        finally:
+            if not completed and os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def get_documents(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up chunks with their embeddings.
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            Dict with 'info', 'documents' (each with 'content', 'embedding'
+            and 'metadata') and 'parents' (each with 'content' and 'metadata'),
+            or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        name = f"documents/{key}"
+        if name not in self._entries:
+            self._counters['document_misses'] += 1
+            return None
+
+        base = os.path.join(self.cache_dir, name)
+        try:
+            with open(f"{base}.json", "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            embeddings = np.load(f"{base}.npy")
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry {name}: {str(e)}")
+            self._remove_entry(name)
+            self._counters['document_misses'] += 1
+            return None
+
+        for doc, embedding in zip(entry['documents'], embeddings):
+            doc['embedding'] = embedding.tolist()
+
+        self._counters['document_hits'] += 1
+        self._touch(name)
+        return entry
+
+    def put_documents(self, key: str, documents: List[Dict[str, Any]],
+                      info: Optional[Dict[str, Any]] = None,
+                      parents: Optional[List[Dict[str, Any]]] = None):
+        """
+        Store chunks with their embeddings.
+
+        Args:
+            key: Cache key from make_key()
+            documents: Documents with 'content', 'embedding' and 'metadata'
+            info: Extra document-level values returned with the entry
+            parents: Parent documents of child chunks ('content' and 'metadata'; not embedded)
+        """
+        if not self.enabled or not documents:
+            return
+
+        name = f"documents/{key}"
+        base = os.path.join(self.cache_dir, name)
+
+        try:
+            # Embeddings go to a binary array; as JSON they would be several times larger
+            embeddings = np.asarray([doc.get('embedding', []) for doc in documents], dtype=np.float32)
+            with open(f"{base}.npy", "wb") as f:
+                np.save(f, embeddings)
+            with open(f"{base}.json", "w", encoding="utf-8") as f:
+                json.dump({
+                    'info': info or {},
+                    'documents': [
+                        {'content': doc.get('content', ''), 'metadata': doc.get('metadata', {})}
+                        for doc in documents
+                    ],
+                    'parents': [
+                        {'content': doc.get('content', ''), 'metadata': doc.get('metadata', {})}
+                        for doc in parents or []
+                    ]
+                }, f, default=_json_default)
+            self._add_entry(name, [f"{base}.json", f"{base}.npy"])
+        except Exception as e:
+            logger.warning(f"Failed to cache documents for {key}: {str(e)}")
+            self._remove_entry(name, [f"{base}.json", f"{base}.npy"])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache size and hit/miss counters."""
+        return {
+            'enabled': self.enabled,
+            'entries': len(self._entries),
+            'size_bytes': self._size_bytes,
+            'max_size_bytes': self.max_size_bytes,
+            **self._counters
+        }
+
+    def clear(self):
+        """Remove every cache entry."""
+        for name in list(self._entries):
+            self._remove_entry(name)
+
+    def _read_pages(self, path: str) -> Iterator[Dict[str, Any]]:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+    def _load_index(self):
+        """Rebuild the LRU index from the files on disk (oldest modification first)."""
+        entries = {}
+        for kind in ("pages", "documents"):
+            directory = os.path.join(self.cache_dir, kind)
+            for filename in os.listdir(directory):
+                path = os.path.join(directory, filename)
+                if filename.endswith(".tmp"):
+                    os.unlink(path)  # Left behind by an interrupted write
+                    continue
+                name = f"{kind}/{filename.split('.', 1)[0]}"
+                stat = os.stat(path)
+                paths, size, mtime = entries.get(name, ([], 0, 0.0))
+                entries[name] = (paths + [path], size + stat.st_size, max(mtime, stat.st_mtime))
+
+        for name, (paths, size, _) in sorted(entries.items(), key=lambda item: item[1][2]):
+            self._entries[name] = (paths, size)
+            self._size_bytes += size
+
+    def _add_entry(self, name: str, paths: List[str]):
+        if name in self._entries:
+            self._size_bytes -= self._entries.pop(name)[1]
+        size = sum(os.path.getsize(path) for path in paths)
+        self._entries[name] = (paths, size)
+        self._size_bytes += size
+        self._evict()
+
+    def _touch(self, name: str):
+        """Mark an entry as most recently used (mtime persists the order across restarts)."""
+        self._entries.move_to_end(name)
+        for path in self._entries[name][0]:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+
+    def _remove_entry(self, name: str, paths: Optional[List[str]] = None):
+        if name in self._entries:
+            paths, size = self._entries.pop(name)
+            self._size_bytes -= size
+        for path in paths or []:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits its size budget."""
+        while self._size_bytes > self.max_size_bytes and len(self._entries) > 1:
+            name = next(iter(self._entries))
+            self._remove_entry(name)
+            self._counters['evictions'] += 1
+            logger.info(f"Evicted cache entry {name}")
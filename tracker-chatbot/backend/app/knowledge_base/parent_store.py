@@ -0,0 +1,132 @@
+import sqlite3
+import threading
+from typing import List, Dict, Any, Iterable
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Bound on the IDs in one IN (...) lookup; SQLite limits the variables of a statement
+_LOOKUP_BATCH = 500
+
+
+class ParentStore:
+    def __init__(self, path: str = "./data/parents.sqlite3"):
+        """
+        On-disk map from parent chunk ID to the parent's content and metadata.
+
+        With parent/child chunking only the small child chunks are embedded
+        and indexed; the parents they were cut from are stored here and
+        fetched by primary key when their children match, instead of with a
+        second vector query.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        # Shared by the request handlers and the OCR thread
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS parents ("
+                "id TEXT PRIMARY KEY, filename TEXT, page_number INTEGER, page_end INTEGER, "
+                "content TEXT NOT NULL, metadata TEXT NOT NULL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS parents_filename ON parents (filename)")
+
+        logger.info(f"Initialized parent store at {path} ({self.count()} parents)")
+
+    def put(self, documents: List[Dict[str, Any]]) -> int:
+        """
+        Store parents, replacing any with the same ID.
+
+        Args:
+            documents: Documents with 'content' and 'metadata'; the ID is taken
+                from 'id' or metadata['chunk_id']
+
+        Returns:
+            Number of parents stored
+        """
+        rows = []
+        for doc in documents:
+            metadata = doc.get('metadata', {})
+            page_number = metadata.get('page_number')
+            rows.append((
+                doc.get('id') or metadata['chunk_id'],
+                metadata.get('filename'),
+                page_number,
+                metadata.get('page_end', page_number),
+                doc.get('content', ''),
+                json.dumps(metadata)
+            ))
+        if not rows:
+            return 0
+
+        with self._lock, self._connection:
+            self._connection.executemany("INSERT OR REPLACE INTO parents VALUES (?, ?, ?, ?, ?, ?)", rows)
+        logger.info(f"Stored {len(rows)} parent chunks")
+        return len(rows)
+
+    def get_many(self, ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Look up parents by ID.
+
+        Returns:
+            ID -> {'id', 'content', 'metadata'} for the IDs that are stored
+        """
+        ids = list(dict.fromkeys(ids))
+        parents = {}
+        with self._lock:
+            for start in range(0, len(ids), _LOOKUP_BATCH):
+                batch = ids[start:start + _LOOKUP_BATCH]
+                rows = self._connection.execute(
+                    f"SELECT id, content, metadata FROM parents WHERE id IN ({', '.join('?' * len(batch))})",
+                    batch
+                )
+                for parent_id, content, metadata in rows:
+                    parents[parent_id] = {'id': parent_id, 'content': content, 'metadata': json.loads(metadata)}
+        return parents
+
+    def delete_pages(self, filename: str, page_numbers: List[int]) -> int:
+        """Remove the parents of a file that cover any of the given pages (see VectorStore.delete_pages)."""
+        pages = set(page_numbers)
+        if not pages:
+            return 0
+        with self._lock, self._connection:
+            rows = self._connection.execute(
+                "SELECT id, page_number, page_end FROM parents "
+                "WHERE filename = ? AND page_number <= ? AND page_end >= ?",
+                (filename, max(pages), min(pages))
+            ).fetchall()
+            ids = [parent_id for parent_id, page_start, page_end in rows
+                   if not pages.isdisjoint(range(page_start, page_end + 1))]
+            for start in range(0, len(ids), _LOOKUP_BATCH):
+                batch = ids[start:start + _LOOKUP_BATCH]
+                self._connection.execute(
+                    f"DELETE FROM parents WHERE id IN ({', '.join('?' * len(batch))})", batch
+                )
+        return len(ids)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM parents").fetchone()[0]
+
+    def clear(self):
+        """Remove every parent."""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM parents")
+        logger.info("Cleared parent store")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'path': self.path,
+            'parent_count': self.count()
+        }
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
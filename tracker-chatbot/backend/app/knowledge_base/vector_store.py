@@ -2,13 +2,17 @@ import chromadb
 from chromadb.config import Settings as ChromaSettings
 from chromadb.utils import embedding_functions
 import uuid
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Set, Tuple
 import logging
 import json
 import time
 
 logger = logging.getLogger(__name__)
 
+# Bound on the IDs or records in one Chroma call; Chroma's SQLite backend limits
+# the variables of a statement (see ParentStore)
+_ID_BATCH = 500
+
 
 class VectorStore:
     def __init__(self, persist_directory: str = "./data/chroma_db", 
@@ -57,7 +61,8 @@ class VectorStore:
         Add documents to the vector store.
         
         Args:
-            documents: List of documents with 'content', 'embedding', and 'metadata'
+            documents: List of documents with 'content', 'embedding', and 'metadata';
+                the ID is taken from 'id' or metadata['chunk_id'] (random if neither is set)
             
         Returns:
             List of document IDs
@@ -73,15 +78,14 @@ class VectorStore:
             metadatas = []
             
             for doc in documents:
-                # Generate unique ID
-                doc_id = str(uuid.uuid4())
-                ids.append(doc_id)
+                doc_id = self._document_id(doc)
                 
                 # Get embedding
                 embedding = doc.get('embedding', [])
                 if not embedding:
                     logger.warning(f"Document {doc_id} has no embedding, skipping")
                     continue
+                ids.append(doc_id)
                 embeddings.append(embedding)
                 
                 # Get content
@@ -100,12 +104,14 @@ class VectorStore:
             
             # Add to collection
             logger.info(f"Adding {len(ids)} documents to collection...")
-            self.collection.add(
-                ids=ids,
-                embeddings=embeddings,
-                documents=documents_text,
-                metadatas=metadatas
-            )
+            for start in range(0, len(ids), _ID_BATCH):
+                end = start + _ID_BATCH
+                self.collection.add(
+                    ids=ids[start:end],
+                    embeddings=embeddings[start:end],
+                    documents=documents_text[start:end],
+                    metadatas=metadatas[start:end]
+                )
             
             # Verify the add operation
             try:
@@ -121,6 +127,40 @@ class VectorStore:
             logger.error(f"Error adding documents to vector store: {str(e)}")
             raise
     
+    def upsert_documents(self, documents: List[Dict[str, Any]]) -> List[str]:
+        """
+        Add only the documents whose IDs are not in the collection yet.
+        
+        With content-derived chunk IDs, re-uploading a file adds nothing, so the
+        collection grows with unique content only.
+        
+        Args:
+            documents: Documents as for add_documents
+            
+        Returns:
+            IDs of the documents that were added
+        """
+        if not documents:
+            return []
+        
+        # Later duplicates within the batch are dropped as well
+        by_id = {}
+        for doc in documents:
+            by_id.setdefault(self._document_id(doc), doc)
+        
+        ids = list(by_id)
+        existing = set()
+        for start in range(0, len(ids), _ID_BATCH):
+            existing.update(self.collection.get(ids=ids[start:start + _ID_BATCH], include=[])['ids'])
+        new_documents = [{**doc, 'id': doc_id} for doc_id, doc in by_id.items() if doc_id not in existing]
+        
+        if not new_documents:
+            logger.info(f"All {len(by_id)} documents are already in the vector store")
+            return []
+        
+        logger.info(f"Upserting {len(new_documents)} new documents ({len(existing)} already present)")
+        return self.add_documents(new_documents)
+    
     def query(self, query_embedding: List[float], 
               top_k: int = 8, 
               where: Optional[Dict[str, Any]] = None,
@@ -219,6 +259,24 @@ class VectorStore:
             logger.error(f"Error getting document {doc_id}: {str(e)}")
             return None
     
+    def has_documents(self, where: Dict[str, Any]) -> bool:
+        """
+        Check whether any document matches a metadata filter.
+        
+        Args:
+            where: Metadata filter conditions
+            
+        Returns:
+            True if at least one document matches, False otherwise
+        """
+        try:
+            results = self.collection.get(where=where, limit=1, include=['metadatas'])
+            return bool(results['ids'])
+            
+        except Exception as e:
+            logger.error(f"Error checking documents for {where}: {str(e)}")
+            return False
+    
     def delete_documents(self, doc_ids: List[str]) -> bool:
         """
         Delete documents from the vector store.
@@ -233,7 +291,7 @@ class VectorStore:
             return True
         
         try:
-            self.collection.delete(ids=doc_ids)
+            self._delete_ids(doc_ids)
             logger.info(f"Successfully deleted {len(doc_ids)} documents")
             return True
             
@@ -241,6 +299,113 @@ class VectorStore:
             logger.error(f"Error deleting documents: {str(e)}")
             return False
     
+    def delete_where(self, where: Dict[str, Any]) -> int:
+        """
+        Delete all documents matching a metadata filter.
+        
+        Args:
+            where: Metadata filter conditions
+            
+        Returns:
+            Number of documents deleted
+        """
+        try:
+            results = self.collection.get(where=where, include=[])
+            doc_ids = results['ids']
+            self._delete_ids(doc_ids)
+            logger.info(f"Deleted {len(doc_ids)} documents matching {where}")
+            return len(doc_ids)
+            
+        except Exception as e:
+            logger.error(f"Error deleting documents for {where}: {str(e)}")
+            raise
+    
+    def _page_spans(self, filename: str, pages: Set[int]) -> Dict[str, range]:
+        """
+        ID -> page span of the chunks of a file that cover any of the given pages.
+        
+        Chunks can span pages, so candidates are those whose page span overlaps
+        the range of the selection; they are then checked page by page, which
+        leaves out chunks that fall in a gap of a non-contiguous selection.
+        """
+        where = {'$and': [
+            {'filename': filename},
+            {'$or': [
+                {'$and': [{'page_start': {'$lte': max(pages)}}, {'page_end': {'$gte': min(pages)}}]},
+                # Chunks stored before every chunk carried its page span
+                {'page_number': {'$in': sorted(pages)}}
+            ]}
+        ]}
+        results = self.collection.get(where=where, include=['metadatas'])
+        spans = {}
+        for doc_id, metadata in zip(results['ids'], results['metadatas']):
+            span = range(metadata.get('page_start', metadata['page_number']),
+                         metadata.get('page_end', metadata['page_number']) + 1)
+            if not pages.isdisjoint(span):
+                spans[doc_id] = span
+        return spans
+    
+    def expand_page_selection(self, filename: str, page_numbers: List[int]) -> List[int]:
+        """
+        Grow a page selection of a file until no stored chunk crosses its edge.
+        
+        Re-indexing pages replaces every chunk that covers them, including chunks
+        that run into neighbouring pages (cross-page and merged chunks). Those
+        pages must be parsed again as well, or their text is lost; their chunks
+        may in turn reach further, so the selection grows until it is stable.
+        
+        Args:
+            filename: File the pages belong to
+            page_numbers: Pages asked to be re-indexed
+            
+        Returns:
+            Sorted pages to parse and replace (a superset of page_numbers)
+        """
+        pages = set(page_numbers)
+        if not pages:
+            return []
+        while True:
+            grown = pages.union(*self._page_spans(filename, pages).values())
+            if grown == pages:
+                break
+            pages = grown
+        if len(pages) > len(set(page_numbers)):
+            logger.info(f"Re-indexing {len(pages)} pages of {filename} for {len(set(page_numbers))} selected, "
+                        f"to keep chunks that span pages whole")
+        return sorted(pages)
+    
+    def delete_pages(self, filename: str, page_numbers: List[int]) -> int:
+        """
+        Delete the chunks of a file that cover any of the given pages.
+        
+        Chunks that run past the selection go as well, so callers parse the
+        pages from expand_page_selection() to put their text back.
+        
+        Args:
+            filename: File the pages belong to
+            page_numbers: Pages being re-indexed
+            
+        Returns:
+            Number of documents deleted
+        """
+        pages = set(page_numbers)
+        if not pages:
+            return 0
+        try:
+            doc_ids = list(self._page_spans(filename, pages))
+            self._delete_ids(doc_ids)
+            logger.info(f"Deleted {len(doc_ids)} documents covering {len(pages)} pages of {filename}")
+            return len(doc_ids)
+            
+        except Exception as e:
+            logger.error(f"Error deleting pages of {filename}: {str(e)}")
+            raise
+    
+    def _delete_ids(self, doc_ids: List[str]):
+        """Delete documents by ID, in batches of _ID_BATCH."""
+        for start in range(0, len(doc_ids), _ID_BATCH):
+            self.collection.delete(ids=doc_ids[start:start + _ID_BATCH])
+    
     def clear_collection(self) -> bool:
         """
         Clear all documents from the collection.
@@ -299,6 +464,11 @@ class VectorStore:
             logger.error(f"Error listing collections: {str(e)}")
             return []
     
+    @staticmethod
+    def _document_id(doc: Dict[str, Any]) -> str:
+        """Stable ID of a document: its 'id', else its chunk ID, else a random one."""
+        return doc.get('id') or (doc.get('metadata') or {}).get('chunk_id') or str(uuid.uuid4())
+    
     def _make_serializable(self, obj: Any) -> Any:
         """
         Convert object to JSON-serializable format.
@@ -0,0 +1,117 @@
+import re
+from collections import Counter
+from typing import Dict, List, Any, Iterable, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Lines at each end of a page's text that can be a running header or footer
+EDGE_LINES = 3
+# Top and bottom bands of the page height (blocks mode) that hold headers and footers
+MARGIN_FRACTION = 0.08
+# Pages sampled, evenly spread over the document, to find repeating lines
+DETECT_SAMPLE_PAGES = 60
+# Fewer sampled pages with text than this and nothing counts as repeating
+MIN_DETECT_PAGES = 4
+
+# Page numbers and dates differ from page to page; "Page 3 of 40" and "Page 4 of 40" are one line
+_DIGITS_RE = re.compile(r'\d+')
+
+
+def normalize_line(line: str) -> str:
+    """Comparison key of a line: lowercase, single spaces, digit runs as '#'."""
+    return _DIGITS_RE.sub('#', " ".join(line.split()).lower())
+
+
+def _edge_indexes(lines: List[str]) -> Set[int]:
+    """Indexes of the first and last EDGE_LINES non-empty lines."""
+    filled = [i for i, line in enumerate(lines) if line.strip()]
+    return set(filled[:EDGE_LINES] + filled[-EDGE_LINES:])
+
+
+def _edge_blocks(blocks: List[Dict[str, Any]], page_height: float) -> Set[int]:
+    """Indexes of blocks at either end of the reading order or inside the top/bottom margins."""
+    edges = set(range(min(EDGE_LINES, len(blocks)))) | set(range(max(len(blocks) - EDGE_LINES, 0), len(blocks)))
+    if page_height > 0:
+        top = page_height * MARGIN_FRACTION
+        bottom = page_height * (1 - MARGIN_FRACTION)
+        edges.update(i for i, block in enumerate(blocks) if block['bbox'][3] <= top or block['bbox'][1] >= bottom)
+    return edges
+
+
+def text_edge_lines(text: str) -> List[str]:
+    """Header/footer candidates of raw page text."""
+    lines = text.split('\n')
+    return [lines[i] for i in sorted(_edge_indexes(lines))]
+
+
+def block_edge_lines(blocks: List[Dict[str, Any]], page_height: float) -> List[str]:
+    """Header/footer candidates of layout blocks: every line of an edge block."""
+    return [line for i in sorted(_edge_blocks(blocks, page_height)) for line in blocks[i]['text'].split('\n')]
+
+
+class BoilerplateFilter:
+    def __init__(self, lines: Iterable[str] = ()):
+        """
+        Running headers, footers and page-number lines of one document.
+
+        Such lines repeat on most pages, so every chunk would pay for them in
+        embedding tokens and LLM context. Only lines near the page edges are
+        ever removed: the first and last few lines of the text, and in blocks
+        mode also blocks inside the top and bottom margins.
+
+        Args:
+            lines: Normalized lines (see normalize_line) to remove
+        """
+        self.lines = frozenset(lines)
+
+    def __bool__(self) -> bool:
+        return bool(self.lines)
+
+    @classmethod
+    def from_pages(cls, page_lines: Iterable[List[str]], min_fraction: float = 0.5) -> 'BoilerplateFilter':
+        """
+        Find the lines repeating on more than min_fraction of the pages.
+
+        Args:
+            page_lines: Header/footer candidates of each sampled page
+                (text_edge_lines or block_edge_lines)
+            min_fraction: Share of pages a line must appear on
+        """
+        counts = Counter()
+        pages = 0
+        for lines in page_lines:
+            keys = {normalize_line(line) for line in lines} - {''}
+            if keys:
+                pages += 1
+                counts.update(keys)
+
+        if pages < MIN_DETECT_PAGES:
+            return cls()
+        return cls(line for line, count in counts.items() if count > min_fraction * pages)
+
+    def strip_text(self, text: str) -> Tuple[str, int]:
+        """Remove repeating lines at the edges of raw page text; returns the text and the characters removed."""
+        lines = text.split('\n')
+        drop = {i for i in _edge_indexes(lines) if normalize_line(lines[i]) in self.lines}
+        if not drop:
+            return text, 0
+        removed = sum(len(lines[i]) + 1 for i in drop)
+        return '\n'.join(line for i, line in enumerate(lines) if i not in drop), removed
+
+    def strip_blocks(self, blocks: List[Dict[str, Any]], page_height: float) -> Tuple[List[Dict[str, Any]], int]:
+        """Remove repeating lines from edge blocks, dropping blocks left empty; returns the blocks and the characters removed."""
+        edges = _edge_blocks(blocks, page_height)
+        kept = []
+        removed = 0
+        for i, block in enumerate(blocks):
+            if i in edges:
+                lines = block['text'].split('\n')
+                remaining = [line for line in lines if normalize_line(line) not in self.lines]
+                if len(remaining) < len(lines):
+                    removed += len(block['text']) - len('\n'.join(remaining))
+                    if not any(line.strip() for line in remaining):
+                        continue
+                    block = {**block, 'text': '\n'.join(remaining)}
+            kept.append(block)
+        return kept, removed
@@ -0,0 +1,111 @@
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Category keywords for semantic classification, in tie-break order
+DEFAULT_CATEGORY_KEYWORDS = {
+    "hardware": [
+        "voltage", "current", "power", "watt", "amp", "ohm", "resistance",
+        "circuit", "board", "chip", "processor", "memory", "storage",
+        "sensor", "actuator", "motor", "battery", "connector", "cable",
+        "pin", "gpio", "uart", "spi", "i2c", "pcb", "solder", "wiring"
+    ],
+    "communication": [
+        "gps", "wifi", "bluetooth", "lora", "radio", "antenna", "signal",
+        "transmission", "reception", "protocol", "network", "ethernet",
+        "tcp", "udp", "http", "mqtt", "modbus", "can", "rs485", "serial"
+    ],
+    "power": [
+        "battery", "solar", "charging", "consumption", "efficiency",
+        "regulator", "converter", "inverter", "ups", "backup", "supply"
+    ],
+    "software": [
+        "firmware", "algorithm", "code", "programming", "software",
+        "application", "driver", "library", "api", "function", "variable",
+        "class", "method", "debug", "compile", "install", "configure"
+    ],
+    "commands": [
+        "command", "instruction", "syntax", "parameter", "argument",
+        "option", "flag", "execute", "run", "start", "stop", "restart",
+        "configure", "setup", "install", "update", "upgrade"
+    ]
+}
+
+# Punctuation and symbols (ASCII, Latin-1, general punctuation) become word breaks;
+# translate() + split() tokenizes about twice as fast as a word regex
+_WORD_BREAKS = str.maketrans({chr(c): ' ' for c in range(0x2070) if not chr(c).isalnum()})
+
+
+def _words(text: str) -> List[str]:
+    """Lowercase words of a text."""
+    return text.lower().translate(_WORD_BREAKS).split()
+
+
+class KeywordCategorizer:
+    def __init__(self, category_keywords: Optional[Dict[str, Iterable[str]]] = None):
+        """
+        Build the keyword lookup once so every chunk is scored in one pass over its words.
+
+        Keywords match whole words, plus their plain plurals ('sensors' counts
+        for 'sensor', but 'scan' no longer counts for 'can'). Keywords of several
+        words match as a phrase.
+
+        Args:
+            category_keywords: Category name -> keywords (defaults to
+                DEFAULT_CATEGORY_KEYWORDS); dict order breaks score ties
+        """
+        if category_keywords is None:
+            category_keywords = DEFAULT_CATEGORY_KEYWORDS
+        self.categories: Tuple[str, ...] = tuple(category_keywords)
+
+        # Word -> indexes of the categories it counts for
+        word_categories: Dict[str, List[int]] = {}
+        phrase_categories: Dict[str, List[int]] = {}
+        for index, keywords in enumerate(category_keywords.values()):
+            for keyword in set(keywords):
+                words = _words(keyword)
+                if not words:
+                    continue
+                target = word_categories if len(words) == 1 else phrase_categories
+                target.setdefault(" ".join(words), []).append(index)
+
+        self._word_categories = {word: tuple(indexes) for word, indexes in word_categories.items()}
+        # Plain plurals are looked up as their keyword: sensors -> sensor, switches -> switch
+        self._word_forms = {}
+        for word in self._word_categories:
+            for form in (word + 'es', word + 's'):
+                self._word_forms.setdefault(form, word)
+        self._word_forms.update((word, word) for word in self._word_categories)
+        self._phrase_categories = {phrase: tuple(indexes) for phrase, indexes in phrase_categories.items()}
+        # Phrases are found on the space-joined words, so punctuation between words does not matter
+        self._phrase_re = (
+            re.compile(r'\b(?:' + '|'.join(re.escape(phrase) for phrase in
+                                           sorted(self._phrase_categories, key=len, reverse=True)) + r')\b')
+            if self._phrase_categories else None
+        )
+
+    def categorize(self, text: str) -> List[str]:
+        """Categories of a text, highest keyword count first ('general' if none match)."""
+        scores = [0] * len(self.categories)
+        words = _words(text)
+
+        # Each keyword counts once, however often (and in whichever form) it occurs
+        word_forms = self._word_forms
+        for keyword in {word_forms[word] for word in word_forms.keys() & words}:
+            for index in self._word_categories[keyword]:
+                scores[index] += 1
+
+        if self._phrase_re is not None:
+            for phrase in set(self._phrase_re.findall(" ".join(words))):
+                for index in self._phrase_categories[phrase]:
+                    scores[index] += 1
+
+        # Stable sort keeps the configured category order for equal scores
+        ranked = sorted((index for index, score in enumerate(scores) if score), key=lambda i: -scores[i])
+        return [self.categories[index] for index in ranked] or ["general"]
+
+    def categorize_batch(self, texts: Iterable[str]) -> List[List[str]]:
+        """Categories of each text, in order."""
+        return [self.categorize(text) for text in texts]
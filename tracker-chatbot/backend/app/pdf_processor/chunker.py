@@ -1,12 +1,56 @@
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Callable, Tuple
 import re
+import os
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
+from functools import lru_cache
 import logging
 import hashlib
 
+from .toc import SectionIndex
+from .categorizer import KeywordCategorizer, DEFAULT_CATEGORY_KEYWORDS
+
 logger = logging.getLogger(__name__)
 
+# Cross-page mode splits the running text once this many chunks' worth has accumulated
+CROSS_PAGE_WINDOW = 4
+
+# Pages sent to a chunking worker per task
+PAGES_PER_TASK = 16
+
+# Chunker instance owned by each chunking worker process
+_worker_chunker = None
+
+# Rough characters per model token, for the few places that need a character
+# length while chunks are measured in tokens
+CHARS_PER_TOKEN = 4
+
+# Split points from coarsest to finest
+SEPARATORS = [
+    "\n\n\n",  # Triple newlines (major sections)
+    "\n\n",    # Double newlines (sections)
+    "\n",      # Single newlines (paragraphs)
+    ". ",      # Sentence followed by space
+    "? ",      # Question followed by space
+    "! ",      # Exclamation followed by space
+    "; ",      # Semicolon followed by space
+    ", ",      # Comma followed by space
+    " ",       # Space (words)
+    ""         # Character level
+]
+
+
+@lru_cache(maxsize=1024)
+def _title_pattern(title: str) -> Optional[re.Pattern]:
+    """Case-insensitive pattern for a section title in page text, any whitespace between its words."""
+    words = title.split()
+    if not any(char.isalnum() for char in title):
+        return None
+    return re.compile(r'\s+'.join(re.escape(word) for word in words), re.IGNORECASE)
+
 
 @dataclass
 class DocumentChunk:
@@ -18,7 +62,39 @@ class DocumentChunk:
 
 
 class SemanticChunker:
-    def __init__(self, chunk_size: int = 800, chunk_overlap: int = 150, min_size: int = 50):
+    def __init__(self, chunk_size: int = 800, chunk_overlap: int = 150, min_size: int = 50,
+                 category_keywords: Optional[Dict[str, List[str]]] = None, cross_page: bool = False,
+                 length_function: Optional[Callable[[str], int]] = None, structure: bool = False,
+                 workers: int = 1, parallel_min_pages: int = 64, merge_min_size: int = 200,
+                 merge_max_size: Optional[int] = None, child_size: int = 0, child_overlap: int = 40):
+        """
+        Args:
+            chunk_size: Maximum chunk length, measured by length_function
+            chunk_overlap: Length shared by neighbouring chunks, measured by length_function
+            min_size: Text chunks with fewer characters are dropped
+            category_keywords: Category name -> keywords (None = built-in list)
+            cross_page: Chunk the running text of consecutive pages, so text that
+                crosses a page break stays in one chunk; chunks then carry
+                'page_start' and 'page_end'
+            length_function: Measures chunk_size and chunk_overlap (default len,
+                i.e. characters); pass Embedder.token_length() to size chunks in
+                model tokens, so no chunk runs past the model's input limit
+            structure: Cut chunks where sections start (TOC titles found in the
+                page text and heading blocks), so no chunk spans two sections
+                and each carries its own section path; cross_page is ignored
+            workers: Processes that split and categorize pages (1 = serial,
+                0 = one per CPU core); not used in cross_page mode
+            parallel_min_pages: Pages are chunked serially until a document has
+                reached this many
+            merge_min_size: merge_small_chunks folds text chunks with fewer
+                characters into their neighbours (0 = no merging)
+            merge_max_size: Longest merged chunk, measured by length_function
+                (None = chunk_size + chunk_overlap); in tokens, at most what the
+                embedding model reads
+            child_size: Size of the child chunks split_children cuts each chunk
+                into, measured by length_function (0 = no children)
+            child_overlap: Length shared by neighbouring child chunks
+        """
         # Parameter validation
         if chunk_size <= 0:
             raise ValueError("chunk_size must be positive")
@@ -28,179 +104,594 @@ class SemanticChunker:
             raise ValueError("min_size must be non-negative")
         if chunk_overlap >= chunk_size:
             raise ValueError("chunk_overlap must be less than chunk_size")
+        if workers < 0:
+            raise ValueError("workers must be non-negative")
+        if merge_min_size < 0:
+            raise ValueError("merge_min_size must be non-negative")
+        if merge_max_size is not None and merge_max_size <= 0:
+            raise ValueError("merge_max_size must be positive")
+        if child_size < 0:
+            raise ValueError("child_size must be non-negative")
+        if child_size and not 0 <= child_overlap < child_size:
+            raise ValueError("child_overlap must be non-negative and less than child_size")
             
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         self.min_size = min_size
+        self.merge_min_size = merge_min_size
+        # A page tail is mostly the splitter's overlap, so it rarely fits next to a full chunk within chunk_size
+        self.merge_max_size = merge_max_size or chunk_size + chunk_overlap
+        self.structure = structure
+        # Section boundaries, not page breaks, delimit chunks in structure mode
+        self.cross_page = cross_page and not structure
+        self.length_function = length_function or len
+        # Characters per unit of chunk_size
+        self.chars_per_unit = 1 if self.length_function is len else CHARS_PER_TOKEN
         
-        # Initialize LangChain text splitter
-        self.text_splitter = RecursiveCharacterTextSplitter(
+        # Same boundaries as LangChain's RecursiveCharacterTextSplitter, in a single scan
+        self.text_splitter = RecursiveSplitter(
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
-            length_function=len,
-            separators=[
-                "\n\n\n",  # Triple newlines (major sections)
-                "\n\n",    # Double newlines (sections)
-                "\n",      # Single newlines (paragraphs)
-                ". ",      # Sentence followed by space
-                "? ",      # Question followed by space
-                "! ",      # Exclamation followed by space
-                "; ",      # Semicolon followed by space
-                ", ",      # Comma followed by space
-                " ",       # Space (words)
-                ""         # Character level
-            ]
+            length_function=self.length_function,
+            separators=SEPARATORS
         )
+        self.child_size = child_size
+        self.child_splitter = RecursiveSplitter(
+            chunk_size=child_size,
+            chunk_overlap=child_overlap,
+            length_function=self.length_function,
+            separators=SEPARATORS
+        ) if child_size else None
         
-        # Category keywords for semantic classification
+        # Keyword lookup built once; every chunk is scored in one pass over its words
+        self.categorizer = KeywordCategorizer(category_keywords)
         self.category_keywords = {
-            "hardware": [
-                "voltage", "current", "power", "watt", "amp", "ohm", "resistance",
-                "circuit", "board", "chip", "processor", "memory", "storage",
-                "sensor", "actuator", "motor", "battery", "connector", "cable",
-                "pin", "gpio", "uart", "spi", "i2c", "pcb", "solder", "wiring"
-            ],
-            "communication": [
-                "gps", "wifi", "bluetooth", "lora", "radio", "antenna", "signal",
-                "transmission", "reception", "protocol", "network", "ethernet",
-                "tcp", "udp", "http", "mqtt", "modbus", "can", "rs485", "serial"
-            ],
-            "power": [
-                "battery", "solar", "charging", "consumption", "efficiency",
-                "regulator", "converter", "inverter", "ups", "backup", "supply"
-            ],
-            "software": [
-                "firmware", "algorithm", "code", "programming", "software",
-                "application", "driver", "library", "api", "function", "variable",
-                "class", "method", "debug", "compile", "install", "configure"
-            ],
-            "commands": [
-                "command", "instruction", "syntax", "parameter", "argument",
-                "option", "flag", "execute", "run", "start", "stop", "restart",
-                "configure", "setup", "install", "update", "upgrade"
-            ]
+            category: list(keywords)
+            for category, keywords in (category_keywords or DEFAULT_CATEGORY_KEYWORDS).items()
+        }
+        
+        self.workers = workers or os.cpu_count() or 1
+        self.parallel_min_pages = parallel_min_pages
+        # Constructor arguments replayed in worker processes (workers always chunk serially)
+        self._worker_options: Dict[str, Any] = {
+            'chunk_size': chunk_size,
+            'chunk_overlap': chunk_overlap,
+            'min_size': min_size,
+            'category_keywords': category_keywords,
+            'length_function': length_function,
         }
+        self._executor = None
     
     def chunk_document(self, pdf_content) -> List[DocumentChunk]:
         """Chunk PDF content into semantic segments."""
-        chunks = []
-        
         # Validate input
         if not pdf_content:
             logger.error("pdf_content is None or empty")
-            return chunks
+            return []
             
         # Safe attribute access with validation
         if not hasattr(pdf_content, 'pages') or not pdf_content.pages:
             logger.error("pdf_content.pages is missing or empty")
-            return chunks
+            return []
             
-        # Generate unique document ID for chunk ID uniqueness
-        doc_id = hashlib.md5(str(id(pdf_content)).encode()).hexdigest()[:8]
+        # Same page text, same document ID, so re-chunking yields the same chunk IDs
+        doc_id = self.document_id(pdf_content.pages)
         logger.info(f"Processing document {doc_id} with {len(pdf_content.pages)} pages")
         
+        return self.chunk_pages(pdf_content.pages, getattr(pdf_content, 'metadata', None), doc_id,
+                                getattr(pdf_content, 'toc', None), getattr(pdf_content, 'tables', None))
+    
+    def chunk_pages(self, pages: Iterable[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None,
+                    doc_id: Optional[str] = None,
+                    toc: Optional[List[Dict[str, Any]]] = None,
+                    tables: Optional[Iterable[Dict[str, Any]]] = None) -> List[DocumentChunk]:
+        """
+        Chunk a stream of page dicts (e.g. from PDFParser.iter_pages).
+        
+        Pages are consumed one at a time, so only the chunks are held in memory.
+        
+        Args:
+            pages: Iterable of page dicts with 'text' and 'page_number'
+            metadata: Document metadata providing 'title' and 'author'
+            doc_id: Document identifier used in chunk IDs, e.g. a hash of the PDF
+                bytes; without it, chunk IDs rest on page, position and content alone
+            toc: TOC entries used to tag chunks with their section; printed TOC
+                entries found on streamed pages ('toc_entries') are added as they arrive
+            tables: Table records found outside the page pass; when given, the
+                'tables' of the pages are ignored
+            
+        Returns:
+            List of document chunks, unmerged (see merge_small_chunks)
+            
+        Raises:
+            Whatever the page stream raises: pages are read while chunking, so
+            a parse failure would otherwise pass for a shorter document
+        """
+        chunks = []
+        
         try:
-            # Process each page separately to maintain page context
-            for page_info in pdf_content.pages:
-                if not isinstance(page_info, dict):
-                    logger.warning(f"Skipping invalid page_info: {type(page_info)}")
-                    continue
-                    
-                # Safe page text extraction
-                page_text = page_info.get('text', '').strip()
-                page_number = page_info.get('page_number', 0)
-                
-                if not page_text:
-                    logger.debug(f"Skipping empty page {page_number}")
-                    continue
-                
-                # Split page text into chunks
-                page_chunks = self.text_splitter.split_text(page_text)
-                logger.debug(f"Page {page_number}: split into {len(page_chunks)} chunks")
+            for chunk in self.iter_chunks(pages, metadata, doc_id, toc, tables):
+                chunks.append(chunk)
+        except Exception as e:
+            logger.error(f"Error chunking document after {len(chunks)} chunks: {str(e)}")
+            raise
+        
+        logger.info(f"Created {len(chunks)} chunks from document")
+        return chunks
+    
+    def iter_chunks(self, pages: Iterable[Dict[str, Any]], metadata: Optional[Dict[str, Any]] = None,
+                    doc_id: Optional[str] = None,
+                    toc: Optional[List[Dict[str, Any]]] = None,
+                    tables: Optional[Iterable[Dict[str, Any]]] = None) -> Iterator[DocumentChunk]:
+        """
+        Yield chunks page by page without merging; tables become chunks of their own.
+        
+        With workers, pages past parallel_min_pages are split and categorized
+        in batches across the process pool. TOC and section tracking stay in
+        this process, and chunks come out in the same order with the same IDs
+        as in serial mode.
+        """
+        section_index = SectionIndex(toc)
+        
+        if doc_id is None:
+            doc_id = "doc"
+        
+        # Add source metadata safely
+        if metadata:
+            source_metadata = {
+                'source': metadata.get('title', 'Unknown'),
+                'author': metadata.get('author', 'Unknown')
+            }
+        else:
+            source_metadata = {
+                'source': 'Unknown',
+                'author': 'Unknown'
+            }
+        
+        span_buffer = _PageSpanBuffer() if self.cross_page else None
+        # Section path in force at the end of the previous page (structure mode)
+        section_state = {'path': []}
+        
+        # Pool batches in flight, oldest first: (pages, future); pages are
+        # (table chunks, page number, segments) and are yielded in that order
+        use_pool = self.workers > 1 and span_buffer is None
+        batch = []
+        pending = deque()
+        max_in_flight = self.workers * 2
+        page_count = 0
+        
+        # Process each page separately to maintain page context
+        for page_info in pages:
+            if not isinstance(page_info, dict):
+                logger.warning(f"Skipping invalid page_info: {type(page_info)}")
+                continue
+            page_count += 1
+            
+            # A printed TOC precedes the pages it points to
+            if page_info.get('toc_entries'):
+                section_index.add(page_info['toc_entries'])
+            
+            page_tables = []
+            if tables is None and page_info.get('tables'):
+                page_tables = list(self.iter_table_chunks(page_info['tables'], source_metadata, doc_id, section_index))
                 
-                for i, chunk_text in enumerate(page_chunks):
-                    if not chunk_text.strip():
-                        continue
-                    
-                    # Ensure minimum chunk size
-                    if len(chunk_text.strip()) < self.min_size:
-                        continue
-                    
-                    # Create unique chunk ID with document identifier
-                    chunk_id = f"{doc_id}_page_{page_number}_chunk_{i+1}"
-                    
-                    # Categorize chunk (can return multiple categories)
-                    categories = self._categorize_chunk(chunk_text)
-                    primary_category = categories[0] if categories else "general"
-                    
-                    # Safe metadata extraction
-                    metadata = {
-                        'page_number': page_number,
-                        'chunk_index': i + 1,
-                        'total_chunks_on_page': len(page_chunks),
-                        'char_count': len(chunk_text),
-                        'word_count': len(chunk_text.split()),
-                        'category': primary_category,
-                        'all_categories': ', '.join(categories) if categories else '',  # Convert list to string
-                        'document_id': doc_id
-                    }
-                    
-                    # Add source metadata safely
-                    if hasattr(pdf_content, 'metadata') and pdf_content.metadata:
-                        metadata.update({
-                            'source': getattr(pdf_content.metadata, 'get', lambda x, y: y)('title', 'Unknown'),
-                            'author': getattr(pdf_content.metadata, 'get', lambda x, y: y)('author', 'Unknown')
-                        })
-                    else:
-                        metadata.update({
-                            'source': 'Unknown',
-                            'author': 'Unknown'
-                        })
-                    
-                    # Create document chunk
-                    chunk = DocumentChunk(
-                        content=chunk_text.strip(),
-                        page_number=page_number,
-                        chunk_id=chunk_id,
-                        metadata=metadata,
-                        category=primary_category
-                    )
-                    
-                    chunks.append(chunk)
+            # Safe page text extraction
+            page_text = page_info.get('text', '').strip()
+            page_number = page_info.get('page_number', 0)
             
-            # Apply small chunk merging if needed
-            if len(chunks) > 1000:  # Memory protection for large documents
-                logger.warning(f"Large document detected ({len(chunks)} chunks), applying merging")
-                chunks = self.merge_small_chunks(chunks)
+            if not page_text:
+                logger.debug(f"Skipping empty page {page_number}")
+                segments = []
+            elif span_buffer is not None:
+                segments = None
+            elif self.structure:
+                segments = self._section_segments(page_info, page_text, page_number, section_index, section_state)
+            else:
+                segments = [(page_text, section_index.lookup(page_number))]
             
-            logger.info(f"Created {len(chunks)} chunks from document")
-            return chunks
+            if use_pool and page_count >= self.parallel_min_pages:
+                if page_tables or segments:
+                    batch.append((page_tables, page_number, segments))
+                if len(batch) >= PAGES_PER_TASK:
+                    future = self._submit_batch(batch, source_metadata, doc_id)
+                    pending.append((batch, future))
+                    batch = []
+                    # Without a pool the rest of the document is chunked here
+                    use_pool = future is not None
+                if len(pending) >= max_in_flight:
+                    yield from self._drain_batch(*pending.popleft(), source_metadata, doc_id)
+                continue
             
+            # Earlier pages may still be in the pool (or waiting after it failed)
+            while pending:
+                yield from self._drain_batch(*pending.popleft(), source_metadata, doc_id)
+            yield from page_tables
+            if not page_text:
+                continue
+            
+            if span_buffer is not None:
+                # Text only runs on into the next page if no page is missing in between
+                if not span_buffer.continues_with(page_number):
+                    yield from self._iter_span_chunks(span_buffer, True, source_metadata, doc_id, section_index)
+                span_buffer.add(page_number, page_text)
+                if span_buffer.length >= self.chunk_size * self.chars_per_unit * CROSS_PAGE_WINDOW:
+                    yield from self._iter_span_chunks(span_buffer, False, source_metadata, doc_id, section_index)
+                continue
+            
+            yield from self._segment_chunks(page_number, segments, source_metadata, doc_id)
+        
+        if batch:
+            pending.append((batch, self._submit_batch(batch, source_metadata, doc_id)))
+        while pending:
+            yield from self._drain_batch(*pending.popleft(), source_metadata, doc_id)
+        
+        if span_buffer is not None:
+            yield from self._iter_span_chunks(span_buffer, True, source_metadata, doc_id, section_index)
+        
+        # Tables from a separate pass are tagged once the whole TOC is known
+        if tables is not None:
+            yield from self.iter_table_chunks(tables, source_metadata, doc_id, section_index)
+    
+    def _segment_chunks(self, page_number: int, segments: List[Tuple[str, List[str]]],
+                        source_metadata: Dict[str, Any], doc_id: str) -> List[DocumentChunk]:
+        """Split the section segments of one page and build its text chunks."""
+        page_chunks = []
+        chunk_sections = []
+        for segment_text, section_path in segments:
+            segment_chunks = self.text_splitter.split_text(segment_text)
+            page_chunks.extend(segment_chunks)
+            chunk_sections.extend([section_path] * len(segment_chunks))
+        logger.debug(f"Page {page_number}: split into {len(page_chunks)} chunks")
+        page_categories = self.categorizer.categorize_batch(page_chunks)
+        
+        chunks = []
+        for i, chunk_text in enumerate(page_chunks):
+            if not chunk_text.strip():
+                continue
+            
+            # Ensure minimum chunk size
+            if len(chunk_text.strip()) < self.min_size:
+                continue
+            
+            # Create unique chunk ID with document identifier
+            chunk_id = self._chunk_id(doc_id, page_number, f"chunk_{i+1}", chunk_text)
+            
+            # Categorize chunk (can return multiple categories)
+            categories = page_categories[i]
+            primary_category = categories[0] if categories else "general"
+            
+            # Safe metadata extraction
+            chunk_metadata = {
+                'page_number': page_number,
+                'chunk_index': i + 1,
+                'total_chunks_on_page': len(page_chunks),
+                'char_count': len(chunk_text),
+                'word_count': len(chunk_text.split()),
+                'category': primary_category,
+                'all_categories': ', '.join(categories) if categories else '',  # Convert list to string
+                'document_id': doc_id,
+                **self._section_metadata(chunk_sections[i]),
+                'chunk_type': 'text'
+            }
+            chunk_metadata.update(source_metadata)
+            
+            # Create document chunk
+            chunks.append(DocumentChunk(
+                content=chunk_text.strip(),
+                page_number=page_number,
+                chunk_id=chunk_id,
+                metadata=chunk_metadata,
+                category=primary_category
+            ))
+        return chunks
+    
+    def _submit_batch(self, batch: List[tuple], source_metadata: Dict[str, Any], doc_id: str):
+        """Send the segments of a batch of pages to the pool (None if the pool is unavailable)."""
+        try:
+            return self._get_executor().submit(
+                _chunk_pages, [(page_number, segments) for _, page_number, segments in batch],
+                source_metadata, doc_id
+            )
         except Exception as e:
-            logger.error(f"Error chunking document: {str(e)}")
-            return chunks
+            logger.warning(f"Chunking pool unavailable, chunking serially: {str(e)}")
+            self.close()
+            return None
+    
+    def _drain_batch(self, batch: List[tuple], future, source_metadata: Dict[str, Any],
+                     doc_id: str) -> Iterator[DocumentChunk]:
+        """Yield the chunks of a batch in page order, chunking it here if its worker failed."""
+        results = None
+        if future is not None:
+            try:
+                results = future.result()
+            except Exception as e:
+                logger.warning(f"Parallel chunking failed at page {batch[0][1]}, "
+                               f"chunking serially: {str(e)}")
+                # A crashed worker leaves the pool unusable, so start fresh next time
+                self.close()
+        if results is None:
+            results = [self._segment_chunks(page_number, segments, source_metadata, doc_id)
+                       for _, page_number, segments in batch]
+        
+        for (page_tables, _, _), page_chunks in zip(batch, results):
+            yield from page_tables
+            yield from page_chunks
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Create the chunking process pool on first use."""
+        if self._executor is None:
+            # spawn avoids forking the API process after torch/chroma have started threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self._worker_options,)
+            )
+        return self._executor
+    
+    def close(self):
+        """Shut down the chunking process pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+    
+    def _iter_span_chunks(self, span_buffer: '_PageSpanBuffer', final: bool, source_metadata: Dict[str, Any],
+                          doc_id: str, section_index: SectionIndex) -> Iterator[DocumentChunk]:
+        """
+        Split the buffered running text and yield its chunks with their page spans.
+        
+        Unless final, the last chunk is kept in the buffer, since the next page
+        may continue it; it is split again together with that page's text.
+        """
+        if not span_buffer.length:
+            return
+        
+        text = span_buffer.text()
+        span_chunks = self.text_splitter.split_text(text)
+        
+        # Offsets of the chunks in the buffer (chunks are stripped and may overlap)
+        offsets = []
+        cursor = 0
+        for chunk_text in span_chunks:
+            start = text.find(chunk_text, cursor)
+            if start < 0:
+                start = cursor
+            offsets.append(start)
+            cursor = start + 1
+        
+        emit_count = len(span_chunks) if final else len(span_chunks) - 1
+        if emit_count <= 0:
+            return
+        emitted = span_chunks[:emit_count]
+        categories_batch = self.categorizer.categorize_batch(emitted)
+        
+        for chunk_text, start, categories in zip(emitted, offsets, categories_batch):
+            if len(chunk_text.strip()) < self.min_size:
+                continue
+            
+            page_start = span_buffer.page_at(start)
+            page_end = span_buffer.page_at(start + len(chunk_text) - 1)
+            span_buffer.chunk_count += 1
+            section_path = section_index.lookup(page_start)
+            primary_category = categories[0] if categories else "general"
+            
+            chunk_metadata = {
+                'page_number': page_start,
+                'page_start': page_start,
+                'page_end': page_end,
+                'chunk_index': span_buffer.chunk_count,
+                'char_count': len(chunk_text),
+                'word_count': len(chunk_text.split()),
+                'category': primary_category,
+                'all_categories': ', '.join(categories) if categories else '',
+                'document_id': doc_id,
+                **self._section_metadata(section_path),
+                'chunk_type': 'text'
+            }
+            chunk_metadata.update(source_metadata)
+            
+            yield DocumentChunk(
+                content=chunk_text.strip(),
+                page_number=page_start,
+                chunk_id=self._chunk_id(doc_id, page_start, f"to_{page_end}_chunk_{span_buffer.chunk_count}",
+                                        chunk_text),
+                metadata=chunk_metadata,
+                category=primary_category
+            )
+        
+        if final:
+            span_buffer.clear()
+        else:
+            span_buffer.keep_from(offsets[emit_count])
+    
+    def _section_segments(self, page_info: Dict[str, Any], page_text: str, page_number: int,
+                          section_index: SectionIndex, state: Dict[str, Any]) -> List[Tuple[str, List[str]]]:
+        """
+        Cut page text where sections start, for structure mode.
+        
+        Sections start at the titles of TOC entries for this page, found in the
+        text (an entry whose title is not found starts where the previous one
+        did), and at heading blocks of the blocks extraction mode; a heading that
+        is not a TOC title opens a sub-section of the TOC section around it. Text
+        before the first cut continues the section of the previous page. A
+        segment shorter than min_size (e.g. a heading directly followed by a
+        sub-heading) is joined to the next one.
+        
+        Returns:
+            (segment text, section path) pairs covering the page text in order
+        """
+        starting = section_index.starting_on(page_number)
+        toc_path = section_index.lookup(page_number - 1 if starting else page_number)
+        carried = state['path']
+        # A heading sub-section runs on into the next page while its TOC section does
+        path = carried if carried[:len(toc_path)] == toc_path and len(carried) <= len(toc_path) + 1 else toc_path
+        
+        cuts = []  # (offset, TOC section path or None, heading)
+        cursor = 0
+        for title, section_path in starting:
+            pattern = _title_pattern(title)
+            match = pattern.search(page_text, cursor) if pattern else None
+            if match:
+                cursor = match.start()
+            cuts.append((cursor, section_path, None))
+        
+        offset = 0
+        toc_offsets = [cut[0] for cut in cuts]
+        for block in page_info.get('blocks') or ():
+            block_text = block.get('text', '')
+            found = page_text.find(block_text, offset) if block_text else -1
+            if found < 0:
+                continue
+            offset = found
+            if block.get('is_heading') and not any(offset <= toc_offset < offset + len(block_text)
+                                                    for toc_offset in toc_offsets):
+                cuts.append((offset, None, " ".join(block_text.split())))
+            offset += len(block_text)
+        
+        segments = []
+        start = 0
+        toc_current = toc_path
+        # Stable sort keeps a TOC cut ahead of a heading at the same offset
+        for offset, section_path, heading in sorted(cuts, key=lambda cut: cut[0]):
+            if offset > start:
+                segments.append((page_text[start:offset], path))
+                start = offset
+            if section_path is not None:
+                toc_current = path = section_path
+            else:
+                path = toc_current + [heading]
+        segments.append((page_text[start:], path))
+        state['path'] = path
+        
+        merged = []
+        pending = ""
+        for i, (segment_text, section_path) in enumerate(segments):
+            segment_text = pending + segment_text
+            if len(segment_text.strip()) < self.min_size and i < len(segments) - 1:
+                pending = segment_text
+                continue
+            merged.append((segment_text, section_path))
+            pending = ""
+        return merged
+    
+    @staticmethod
+    def _section_metadata(section_path: List[str]) -> Dict[str, str]:
+        """Section fields of chunk metadata; 'chapter' is the top-level section."""
+        return {
+            'section': section_path[-1] if section_path else '',
+            'section_path': ' > '.join(section_path),
+            'chapter': section_path[0] if section_path else '',
+        }
+    
+    def iter_table_chunks(self, tables: Iterable[Dict[str, Any]], source_metadata: Dict[str, Any],
+                          doc_id: str, section_index: SectionIndex) -> Iterator[DocumentChunk]:
+        """
+        Turn table records into chunks of type 'table'.
+        
+        Rows are written one per line with cells separated by ' | '. A table
+        longer than chunk_size is split between rows, and every part repeats
+        the caption and the header row, so each part can be read on its own.
+        """
+        for table in tables:
+            rows = [self._format_table_row(row) for row in table.get('data') or []]
+            if not rows:
+                continue
+            
+            page_number = table.get('page_number', 0)
+            table_number = table.get('table_number', 1)
+            caption = f"Table {table_number}, page {page_number}"
+            parts = self._split_table_rows(rows, caption)
+            section_path = section_index.lookup(page_number)
+            
+            for i, part_rows in enumerate(parts):
+                part_caption = caption if len(parts) == 1 else f"{caption} (part {i + 1} of {len(parts)})"
+                chunk_text = "\n".join([part_caption] + part_rows)
+                categories = self._categorize_chunk(chunk_text)
+                primary_category = categories[0] if categories else "general"
+                
+                chunk_metadata = {
+                    'page_number': page_number,
+                    'chunk_index': i + 1,
+                    'total_chunks_on_page': len(parts),
+                    'char_count': len(chunk_text),
+                    'word_count': len(chunk_text.split()),
+                    'category': primary_category,
+                    'all_categories': ', '.join(categories) if categories else '',
+                    'document_id': doc_id,
+                    **self._section_metadata(section_path),
+                    'chunk_type': 'table',
+                    'table_number': table_number,
+                    'table_rows': table.get('rows', len(rows)),
+                    'table_columns': table.get('columns', 0)
+                }
+                chunk_metadata.update(source_metadata)
+                
+                yield DocumentChunk(
+                    content=chunk_text,
+                    page_number=page_number,
+                    chunk_id=self._chunk_id(doc_id, page_number, f"table_{table_number}_part_{i + 1}", chunk_text),
+                    metadata=chunk_metadata,
+                    category=primary_category
+                )
+    
+    @staticmethod
+    def document_id(pages: Iterable[Dict[str, Any]]) -> str:
+        """Short hash of the page numbers and text of a document."""
+        digest = hashlib.sha256()
+        for page_info in pages:
+            digest.update(f"{page_info.get('page_number', 0)}\n{page_info.get('text', '')}\n".encode('utf-8'))
+        return digest.hexdigest()[:16]
+    
+    @staticmethod
+    def _chunk_id(doc_id: str, page_number: int, position: str, chunk_text: str) -> str:
+        """
+        Deterministic chunk ID from the document, the chunk's position and its content.
+        
+        Re-chunking the same document gives the same IDs, so vector stores can
+        skip chunks they already hold; changed text gives a new ID.
+        """
+        content_digest = hashlib.md5(chunk_text.strip().encode('utf-8')).hexdigest()[:8]
+        return f"{doc_id}_page_{page_number}_{position}_{content_digest}"
+    
+    @staticmethod
+    def _format_table_row(row: List[Any]) -> str:
+        """One table row as 'cell | cell | cell'; multi-line cells are joined, empty cells become '-'."""
+        return " | ".join(" ".join(str(cell).split()) or "-" for cell in row)
+    
+    def _split_table_rows(self, rows: List[str], caption: str, size: Optional[int] = None) -> List[List[str]]:
+        """Group rows into parts of at most size (None = chunk_size), each starting with the header row."""
+        header, body = rows[0], rows[1:]
+        if not body:
+            return [[header]]
+        
+        # Caption (plus a part suffix) and header are repeated in every part
+        caption_length, header_length, *row_lengths = self._measure(
+            [caption + " (part 99 of 99)", header] + body)
+        budget = (size or self.chunk_size) - caption_length - header_length - 2
+        parts = []
+        current = []
+        current_length = 0
+        for row, row_length in zip(body, row_lengths):
+            # A single oversized row still gets a part of its own
+            if current and current_length + row_length + 1 > budget:
+                parts.append([header] + current)
+                current = []
+                current_length = 0
+            current.append(row)
+            current_length += row_length + 1
+        parts.append([header] + current)
+        return parts
+    
+    def _measure(self, texts: List[str]) -> List[int]:
+        """Lengths of texts under length_function, in one call when it measures batches."""
+        batch = getattr(self.length_function, 'batch', None)
+        if batch is not None:
+            return batch(texts)
+        return [self.length_function(text) for text in texts]
     
     def _categorize_chunk(self, text: str) -> List[str]:
-        """Categorize chunk based on keyword matching. Returns sorted list of categories."""
-        text_lower = text.lower()
-        category_scores = {}
-        
-        # Score each category based on keyword matches
-        for category, keywords in self.category_keywords.items():
-            score = 0
-            for keyword in keywords:
-                if keyword in text_lower:
-                    score += 1
-            category_scores[category] = score
-        
-        # Sort categories by score (highest first) and filter out zero scores
-        sorted_categories = [
-            cat for cat, score in sorted(category_scores.items(), key=lambda x: x[1], reverse=True)
-            if score > 0
-        ]
-        
-        # Return all categories with scores, or just "general" if none found
-        return sorted_categories if sorted_categories else ["general"]
+        """Categorize chunk based on whole-word keyword matching. Returns sorted list of categories."""
+        return self.categorizer.categorize(text)
     
     def get_chunk_stats(self, chunks: List[DocumentChunk]) -> Dict[str, Any]:
         """Get statistics about the chunks."""
@@ -228,67 +719,407 @@ class SemanticChunker:
         
         return stats
     
-    def merge_small_chunks(self, chunks: List[DocumentChunk], min_size: int = 200) -> List[DocumentChunk]:
-        """Merge chunks that are too small with adjacent chunks on the same page."""
-        if not chunks:
-            return chunks
+    def merge_small_chunks(self, chunks: List[DocumentChunk], min_size: Optional[int] = None) -> List[DocumentChunk]:
+        """
+        Fold small text chunks into their neighbours, in one pass.
         
-        merged_chunks = []
-        current_chunk = None
+        Page tails, short pages and heading-only segments leave fragments that
+        each cost an embedding and a vector slot while saying little on their
+        own. Neighbouring text chunks are grouped while the group or the next
+        chunk is shorter than min_size characters and the group stays within
+        merge_max_size; groups never cross a section (structure mode) or a table.
+        Merged chunks may span pages, so they get 'merged_pages' (comma-separated
+        page numbers) and 'page_start'/'page_end' covering every page of every
+        member; a partial re-index widens its page selection to that span
+        (VectorStore.expand_page_selection), so merging across pages loses no
+        text when pages are replaced. The overlap the splitter repeated at the
+        start of a chunk is not repeated in the merged text.
         
+        Args:
+            chunks: Chunks in document order (after deduplication, so repeated
+                notices are still recognized as duplicates)
+            min_size: Characters below which a chunk is merged (None = merge_min_size)
+            
+        Returns:
+            The chunks with small ones merged, in document order
+        """
+        min_size = self.merge_min_size if min_size is None else min_size
+        if not chunks or min_size <= 0:
+            return chunks
+        
+        # Each group holds (chunk, text it adds to the merged chunk) pairs
+        groups = []
+        group = []
+        group_chars = 0
+        group_length = None
         for chunk in chunks:
-            if len(chunk.content) < min_size:
-                # Small chunk, try to merge with previous if same page
-                if current_chunk is None:
-                    current_chunk = chunk
-                elif current_chunk.page_number == chunk.page_number:
-                    # Merge with current chunk (same page only)
-                    current_chunk.content += " " + chunk.content
-                    
-                    # Update metadata properly
-                    current_chunk.metadata['merged_chunks'] = current_chunk.metadata.get('merged_chunks', 0) + 1
-                    current_chunk.metadata['char_count'] = len(current_chunk.content)
-                    current_chunk.metadata['word_count'] = len(current_chunk.content.split())
-                    current_chunk.metadata['chunk_index'] = current_chunk.metadata.get('chunk_index', 1)
-                    
-                    # Update chunk ID to reflect merge
-                    current_chunk.chunk_id += f"_merged_{chunk.chunk_id}"
-                    
-                    # Merge categories
-                    if hasattr(chunk, 'all_categories') and chunk.all_categories:
-                        current_categories_str = current_chunk.metadata.get('all_categories', current_chunk.category)
-                        # Convert to list for merging, then back to string
-                        current_categories_list = current_categories_str.split(', ') if isinstance(current_categories_str, str) else [current_categories_str]
-                        
-                        chunk_categories_str = chunk.metadata.get('all_categories', chunk.category)
-                        chunk_categories_list = chunk_categories_str.split(', ') if isinstance(chunk_categories_str, str) else [chunk_categories_str]
-                        
-                        for cat in chunk_categories_list:
-                            if cat not in current_categories_list:
-                                current_categories_list.append(cat)
-                        
-                        # Convert back to string
-                        current_chunk.metadata['all_categories'] = ', '.join(current_categories_list)
-                        current_chunk.category = current_categories_list[0]  # Update primary category
-                else:
-                    # Different page, finalize current chunk and start new
-                    if current_chunk:
-                        merged_chunks.append(current_chunk)
-                    current_chunk = chunk
-            else:
-                # Normal sized chunk
-                if current_chunk:
-                    merged_chunks.append(current_chunk)
-                    current_chunk = None
-                merged_chunks.append(chunk)
+            # Table chunks are already self-contained and never merged into text
+            if chunk.metadata.get('chunk_type', 'text') != 'text':
+                if group:
+                    groups.append(group)
+                    group = []
+                groups.append([(chunk, chunk.content)])
+                continue
+            
+            chars = len(chunk.content)
+            if group and (group_chars < min_size or chars < min_size) \
+                    and chunk.metadata.get('section_path') == group[-1][0].metadata.get('section_path'):
+                added = self._added_text(group[-1][0], chunk)
+                # Measured only for candidates
+                if group_length is None:
+                    group_length = self.length_function(group[0][1])
+                added_length = self.length_function(added)
+                if group_length + added_length <= self.merge_max_size:
+                    group.append((chunk, added))
+                    group_chars += len(added)
+                    group_length += added_length
+                    continue
+            
+            if group:
+                groups.append(group)
+            group = [(chunk, chunk.content)]
+            group_chars = chars
+            group_length = None
+        if group:
+            groups.append(group)
         
-        # Don't forget the last chunk
-        if current_chunk:
-            merged_chunks.append(current_chunk)
+        merged_groups = [[chunk for chunk, _ in group] for group in groups if len(group) > 1]
+        contents = ["".join(added for _, added in group) for group in groups if len(group) > 1]
+        categories_batch = self.categorizer.categorize_batch(contents)
+        merged = {
+            id(group[0]): self._merged_chunk(group, content, categories)
+            for group, content, categories in zip(merged_groups, contents, categories_batch)
+        }
+        merged_chunks = [merged.get(id(group[0][0]), group[0][0]) for group in groups]
         
-        logger.info(f"Merged {len(chunks)} chunks into {len(merged_chunks)} chunks")
+        if len(merged_chunks) < len(chunks):
+            logger.info(f"Merged {len(chunks)} chunks into {len(merged_chunks)} chunks")
         return merged_chunks
     
+    @staticmethod
+    def _overlap(left: str, right: str, probe_size: int = 16) -> int:
+        """Length of the longest suffix of left that starts right (overlaps shorter than probe_size are ignored)."""
+        probe = right[:probe_size]
+        index = left.find(probe, max(len(left) - len(right), 0))
+        while index != -1:
+            if right.startswith(left[index:]):
+                return len(left) - index
+            index = left.find(probe, index + 1)
+        return 0
+    
+    def _added_text(self, previous: DocumentChunk, chunk: DocumentChunk) -> str:
+        """
+        What chunk appends to previous in a merged chunk: the text after the
+        splitter's overlap, which continues previous directly, or else the
+        whole chunk after a space.
+        """
+        # Only neighbours split from the same text share an overlap
+        if chunk.page_number <= previous.metadata.get('page_end', previous.page_number):
+            overlap = self._overlap(previous.content, chunk.content)
+            if overlap:
+                remainder = chunk.content[overlap:]
+                return remainder if remainder.strip() else ""
+        return " " + chunk.content
+    
+    def _merged_chunk(self, group: List[DocumentChunk], content: str, categories: List[str]) -> DocumentChunk:
+        """One chunk standing in for a group of neighbouring chunks."""
+        first = group[0]
+        pages = sorted({
+            page
+            for chunk in group
+            for page in range(chunk.page_number, chunk.metadata.get('page_end', chunk.page_number) + 1)
+        })
+        primary_category = categories[0] if categories else "general"
+        
+        chunk_metadata = dict(first.metadata)
+        chunk_metadata.update({
+            'char_count': len(content),
+            'word_count': len(content.split()),
+            'category': primary_category,
+            'all_categories': ', '.join(categories) if categories else '',
+            'merged_chunks': len(group) - 1,
+            'merged_pages': ', '.join(str(page) for page in pages),
+            # The full span, so re-indexing any page the group touched replaces it
+            'page_start': pages[0],
+            'page_end': pages[-1]
+        })
+        
+        # Copies that deduplication removed from any member now point at the merged chunk
+        duplicate_pages = {
+            int(page)
+            for chunk in group
+            for page in chunk.metadata.get('duplicate_pages', '').split(', ') if page
+        }
+        if duplicate_pages:
+            chunk_metadata['duplicate_count'] = sum(chunk.metadata.get('duplicate_count', 0) for chunk in group)
+            chunk_metadata['duplicate_pages'] = ', '.join(str(page) for page in sorted(duplicate_pages))
+        
+        position = f"chunk_{first.metadata.get('chunk_index', 1)}_merged_{len(group)}"
+        return DocumentChunk(
+            content=content,
+            page_number=first.page_number,
+            chunk_id=self._chunk_id(first.metadata.get('document_id', ''), first.page_number, position, content),
+            metadata=chunk_metadata,
+            category=primary_category
+        )
+    
+    def split_children(self, parents: List[DocumentChunk]) -> List[DocumentChunk]:
+        """
+        Cut chunks into child chunks of child_size for embedding and BM25.
+        
+        Small chunks match a query precisely, while the chunk they were cut
+        from gives the LLM enough context; retrieval matches children and
+        answers with their parents (see HybridSearcher). Each child keeps its
+        parent's metadata plus 'parent_id', 'child_index' and 'child_count';
+        table chunks are split between rows like tables are split into chunks,
+        every child repeating the parent's caption line and the header row.
+        
+        Args:
+            parents: Final chunks (deduplicated and merged), in document order
+            
+        Returns:
+            Child chunks in document order
+        """
+        if self.child_splitter is None:
+            raise ValueError("split_children needs a child_size")
+        
+        children = []
+        for parent in parents:
+            if parent.metadata.get('chunk_type', 'text') == 'text':
+                child_texts = self.child_splitter.split_text(parent.content) or [parent.content]
+            else:
+                caption, *rows = parent.content.split("\n")
+                child_texts = [
+                    "\n".join([caption] + part_rows)
+                    for part_rows in (self._split_table_rows(rows, caption, self.child_size) if rows else [[]])
+                ]
+            
+            for i, child_text in enumerate(child_texts):
+                child_metadata = dict(parent.metadata)
+                child_metadata.update({
+                    'parent_id': parent.chunk_id,
+                    'child_index': i + 1,
+                    'child_count': len(child_texts),
+                    'char_count': len(child_text),
+                    'word_count': len(child_text.split())
+                })
+                children.append(DocumentChunk(
+                    content=child_text,
+                    page_number=parent.page_number,
+                    # Child i of the same parent text is always the same text
+                    chunk_id=f"{parent.chunk_id}_child_{i + 1}",
+                    metadata=child_metadata,
+                    category=parent.category
+                ))
+        
+        logger.info(f"Split {len(parents)} chunks into {len(children)} child chunks")
+        return children
+    
     def filter_empty_chunks(self, chunks: List[DocumentChunk]) -> List[DocumentChunk]:
         """Filter out empty or whitespace-only chunks."""
         return [chunk for chunk in chunks if chunk.content.strip()]
+
+
+class RecursiveSplitter:
+    def __init__(self, chunk_size: int, chunk_overlap: int, separators: List[str],
+                 length_function: Callable[[str], int] = len):
+        """
+        Text splitter producing the same chunks as LangChain's
+        RecursiveCharacterTextSplitter (keep_separator=True, strip_whitespace=True)
+        with plain-string separators.
+        
+        Pieces are boundary offsets into the page text rather than strings.
+        Separator positions are found once per page and looked up by
+        bisection; under len() the boundaries double as the running length,
+        so where each chunk ends and where the next one starts (after the
+        overlap) are found by bisection too instead of adding up pieces one
+        at a time, and a chunk is a single slice of the page.
+        
+        Args:
+            chunk_size: Maximum chunk length under length_function
+            chunk_overlap: Length shared by neighbouring chunks
+            separators: Separators from coarsest to finest; "" splits into characters
+            length_function: Length of a piece of text; must give 0 for ""
+        """
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = list(separators)
+        self.length_function = length_function
+        # A separator that can overlap itself ("\n\n" in "\n\n\n") has range-dependent matches
+        self._self_overlapping = {
+            separator for separator in self.separators
+            if any(separator[:i] == separator[-i:] for i in range(1, len(separator)))
+        }
+    
+    def split_text(self, text: str) -> List[str]:
+        """Split text into chunks of at most chunk_size, neighbours overlapping by up to chunk_overlap."""
+        chunks: List[str] = []
+        self._split(text, 0, len(text), 0, {}, chunks)
+        return chunks
+    
+    def _positions(self, text: str, separator: str, positions: Dict[str, List[int]]) -> List[int]:
+        """Start offsets of every occurrence of a separator in the page, found on first use."""
+        found = positions.get(separator)
+        if found is None:
+            found = []
+            step = len(separator)
+            index = text.find(separator)
+            while index != -1:
+                found.append(index)
+                index = text.find(separator, index + step)
+            positions[separator] = found
+        return found
+    
+    def _matches(self, text: str, separator: str, start: int, end: int,
+                 positions: Dict[str, List[int]]) -> List[int]:
+        """Offsets where re.split would split text[start:end] on separator (leftmost, non-overlapping)."""
+        if separator in self._self_overlapping:
+            matches = []
+            index = text.find(separator, start, end)
+            while index != -1:
+                matches.append(index)
+                index = text.find(separator, index + len(separator), end)
+            return matches
+        found = self._positions(text, separator, positions)
+        return found[bisect_left(found, start):bisect_right(found, end - len(separator))]
+    
+    def _has_match(self, text: str, separator: str, start: int, end: int,
+                   positions: Dict[str, List[int]]) -> bool:
+        if separator in self._self_overlapping:
+            return text.find(separator, start, end) != -1
+        found = self._positions(text, separator, positions)
+        index = bisect_left(found, start)
+        return index < len(found) and found[index] + len(separator) <= end
+    
+    def _split(self, text: str, start: int, end: int, level: int,
+               positions: Dict[str, List[int]], chunks: List[str]):
+        """Split text[start:end] with the first separator from level on that occurs in it."""
+        separators = self.separators
+        separator = separators[-1]
+        next_level = None
+        for i in range(level, len(separators)):
+            if not separators[i]:
+                separator = separators[i]
+                break
+            if self._has_match(text, separators[i], start, end, positions):
+                separator = separators[i]
+                next_level = i + 1 if i + 1 < len(separators) else None
+                break
+        
+        # Piece i is text[bounds[i]:bounds[i + 1]]; every piece starts with the separator before it
+        if separator:
+            bounds = [start, *self._matches(text, separator, start, end, positions), end]
+            if bounds[1] == start:
+                del bounds[0]
+        else:
+            bounds = list(range(start, end + 1))
+        if len(bounds) < 2:
+            return
+        
+        # Running length at each boundary
+        if self.length_function is len:
+            lengths = bounds
+        else:
+            lengths = [0]
+            for a, b in zip(bounds, bounds[1:]):
+                lengths.append(lengths[-1] + self.length_function(text[a:b]))
+        
+        # Pieces of chunk_size or more are split further; the runs in between are merged
+        chunk_size = self.chunk_size
+        run_start = 0
+        for i in [i for i in range(len(bounds) - 1) if lengths[i + 1] - lengths[i] >= chunk_size]:
+            if i > run_start:
+                self._merge(text, bounds, lengths, run_start, i, chunks)
+            if next_level is None:
+                chunks.append(text[bounds[i]:bounds[i + 1]])
+            else:
+                self._split(text, bounds[i], bounds[i + 1], next_level, positions, chunks)
+            run_start = i + 1
+        if run_start < len(bounds) - 1:
+            self._merge(text, bounds, lengths, run_start, len(bounds) - 1, chunks)
+    
+    def _merge(self, text: str, bounds: List[int], lengths: List[int], first: int, last: int,
+               chunks: List[str]):
+        """
+        Merge pieces first..last-1 (each shorter than chunk_size) into chunks.
+        
+        A chunk takes pieces until the next one would not fit. The next chunk
+        starts at the earliest piece from which the rest of that chunk fits in
+        chunk_overlap and still leaves room for the piece that did not fit.
+        """
+        chunk_size = self.chunk_size
+        chunk_overlap = self.chunk_overlap
+        while True:
+            end = bisect_right(lengths, lengths[first] + chunk_size, first, last + 1) - 1
+            chunk = text[bounds[first]:bounds[end]].strip()
+            if chunk:
+                chunks.append(chunk)
+            if end >= last:
+                return
+            first = bisect_left(lengths, max(lengths[end] - chunk_overlap, lengths[end + 1] - chunk_size),
+                                first, end + 1)
+
+
+class _PageSpanBuffer:
+    """Running text of consecutive pages with the offset at which each page starts."""
+    
+    # Pages are joined like the words of a sentence, so text crossing a page break reads on
+    PAGE_JOINER = " "
+    
+    def __init__(self):
+        self.parts: List[str] = []
+        self.page_offsets: List[int] = []
+        self.page_numbers: List[int] = []
+        self.length = 0
+        self.chunk_count = 0
+    
+    def continues_with(self, page_number: int) -> bool:
+        return not self.page_numbers or page_number == self.page_numbers[-1] + 1
+    
+    def add(self, page_number: int, text: str):
+        if self.parts:
+            self.parts.append(self.PAGE_JOINER)
+            self.length += len(self.PAGE_JOINER)
+        self.page_offsets.append(self.length)
+        self.page_numbers.append(page_number)
+        self.parts.append(text)
+        self.length += len(text)
+    
+    def text(self) -> str:
+        text = "".join(self.parts)
+        self.parts = [text]
+        return text
+    
+    def page_at(self, offset: int) -> int:
+        """Page number of the character at offset."""
+        return self.page_numbers[max(bisect_right(self.page_offsets, offset) - 1, 0)]
+    
+    def keep_from(self, offset: int):
+        """Drop the text before offset; the pages still covered keep their numbers."""
+        text = self.text()[offset:]
+        first = max(bisect_right(self.page_offsets, offset) - 1, 0)
+        self.page_offsets = [0] + [page_offset - offset for page_offset in self.page_offsets[first + 1:]]
+        self.page_numbers = self.page_numbers[first:]
+        self.parts = [text]
+        self.length = len(text)
+    
+    def clear(self):
+        self.parts = []
+        self.page_offsets = []
+        self.page_numbers = []
+        self.length = 0
+
+
+def _init_worker(options: Dict[str, Any]):
+    """Build the chunker used by a chunking worker process."""
+    global _worker_chunker
+    _worker_chunker = SemanticChunker(**options)
+
+
+def _chunk_pages(pages: List[Tuple[int, List[Tuple[str, List[str]]]]], source_metadata: Dict[str, Any],
+                 doc_id: str) -> List[List[DocumentChunk]]:
+    """Chunk the section segments of each (page number, segments) pair (runs in a chunking worker)."""
+    return [
+        _worker_chunker._segment_chunks(page_number, segments, source_metadata, doc_id)
+        for page_number, segments in pages
+    ]
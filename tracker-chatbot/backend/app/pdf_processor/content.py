@@ -0,0 +1,132 @@
+from array import array
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+
+from .toc import SectionIndex
+
+# Page keys stored in their own columns; anything else goes to the per-page extras
+_COLUMN_KEYS = frozenset(('text', 'page_number', 'char_count', 'bbox', 'tables', 'toc_entries'))
+
+
+def page_bbox(rect) -> Tuple[float, float, float, float]:
+    """Plain float tuple for a fitz.Rect (or any 4-sequence), so no PyMuPDF object is kept."""
+    x0, y0, x1, y1 = rect
+    return (float(x0), float(y0), float(x1), float(y1))
+
+
+@dataclass
+class CompactPDFContent:
+    """
+    Memory-lean PDFContent for very large documents.
+
+    All page text lives in one string, each page followed by a newline, with
+    page boundaries in an array('I') offset table. Page numbers and bboxes are
+    stored in typed arrays. Only pages with tables, layout blocks or flags like
+    'needs_ocr' keep a small dict of extras. `pages` is a read-only sequence
+    that builds the usual page dicts on access, so code written for
+    PDFContent.pages keeps working.
+    """
+    # Declared by hand: dataclass(slots=True) needs Python 3.10
+    __slots__ = ('text', 'offsets', 'page_numbers', 'bboxes', 'extras', 'metadata', 'tables', 'toc', 'pages')
+
+    text: str
+    offsets: array  # array('I'): start of page i in text; offsets[-1] == len(text)
+    page_numbers: array  # array('I'), 1-based
+    bboxes: array  # array('d'), four values per page
+    extras: List[Optional[Dict[str, Any]]]
+    metadata: Dict[str, Any]
+    tables: List[Dict[str, Any]]
+    toc: List[Dict[str, Any]]
+
+    def __post_init__(self):
+        # Not a field: built from the others, and left out of repr and comparisons
+        self.pages = PageList(self)
+
+    @classmethod
+    def from_pages(cls, pages: Iterable[Dict[str, Any]], metadata: Dict[str, Any],
+                   toc: Optional[List[Dict[str, Any]]] = None,
+                   tables: Optional[List[Dict[str, Any]]] = None) -> 'CompactPDFContent':
+        """
+        Build from a stream of page dicts (e.g. PDFParser.iter_pages).
+
+        Args:
+            pages: Page dicts; each one can be dropped as soon as it is consumed
+            metadata: Document metadata
+            toc: TOC entries; printed TOC entries on the pages ('toc_entries') are not kept
+            tables: Document tables (defaults to the tables carried by the pages)
+        """
+        parts = []
+        offsets = array('I', [0])
+        page_numbers = array('I')
+        bboxes = array('d')
+        extras = []
+        page_tables = []
+        position = 0
+
+        for page_info in pages:
+            text = page_info['text']
+            parts.append(text)
+            parts.append("\n")
+            position += len(text) + 1
+            offsets.append(position)
+            page_numbers.append(page_info['page_number'])
+            bboxes.extend(page_bbox(page_info.get('bbox') or (0, 0, 0, 0)))
+
+            extra = {key: value for key, value in page_info.items() if key not in _COLUMN_KEYS}
+            if page_info.get('tables'):
+                extra['tables'] = page_info['tables']
+                page_tables.extend(page_info['tables'])
+            extras.append(extra or None)
+
+        return cls(
+            text="".join(parts),
+            offsets=offsets,
+            page_numbers=page_numbers,
+            bboxes=bboxes,
+            extras=extras,
+            metadata=metadata,
+            tables=page_tables if tables is None else tables,
+            toc=toc or [],
+        )
+
+    @property
+    def section_index(self) -> SectionIndex:
+        """Page-to-section lookup built from the TOC."""
+        return SectionIndex(self.toc)
+
+    def page_text(self, index: int) -> str:
+        """Text of the page at a 0-based position, without copying any other page."""
+        return self.text[self.offsets[index]:self.offsets[index + 1] - 1]
+
+
+class PageList(Sequence):
+    """Read-only list of page dicts over a CompactPDFContent."""
+    __slots__ = ('_content',)
+
+    def __init__(self, content: CompactPDFContent):
+        self._content = content
+
+    def __len__(self) -> int:
+        return len(self._content.page_numbers)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("page index out of range")
+
+        content = self._content
+        text = content.page_text(index)
+        page_info = {
+            'text': text,
+            'page_number': content.page_numbers[index],
+            'char_count': len(text),
+            'bbox': tuple(content.bboxes[index * 4:index * 4 + 4]),
+            'tables': [],
+        }
+        if content.extras[index]:
+            page_info.update(content.extras[index])
+        return page_info
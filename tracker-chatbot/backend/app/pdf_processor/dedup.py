@@ -0,0 +1,148 @@
+import zlib
+from typing import Dict, List, Tuple
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Prime just above 2**32 for the (a * x + b) mod p permutations of 32-bit shingle hashes
+_HASH_PRIME = np.uint64((1 << 32) + 15)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+# Fixed seed, so signatures (and which copy is kept) are the same on every run
+_PERMUTATION_SEED = 1
+
+
+def _lsh_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    Bands and rows per band for MinHash LSH.
+
+    Pairs at similarity s share at least one band with probability
+    1 - (1 - s**rows)**bands; the split whose S-curve midpoint
+    (1/bands)**(1/rows) is closest to threshold, without going above it, is used.
+    """
+    best = (num_perm, 1)
+    best_gap = float('inf')
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        midpoint = (1.0 / bands) ** (1.0 / rows)
+        if midpoint <= threshold and threshold - midpoint < best_gap:
+            best = (bands, rows)
+            best_gap = threshold - midpoint
+    return best
+
+
+class ChunkDeduplicator:
+    def __init__(self, threshold: float = 0.9, num_perm: int = 64, shingle_size: int = 3):
+        """
+        Near-duplicate chunk removal with MinHash signatures.
+
+        Manuals repeat headers, footers, notices and warnings on many pages;
+        every copy would otherwise be embedded, stored and compete for top-k.
+        The first copy of a chunk is kept and lists the pages of the copies
+        it replaces, so citations can still point at every page.
+
+        Args:
+            threshold: Estimated Jaccard similarity of word shingles at which
+                two chunks count as duplicates
+            num_perm: MinHash signature length (more = more precise, slower)
+            shingle_size: Words per shingle
+        """
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+        if num_perm <= 0:
+            raise ValueError("num_perm must be positive")
+        if shingle_size <= 0:
+            raise ValueError("shingle_size must be positive")
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = _lsh_bands(num_perm, threshold)
+
+        rng = np.random.default_rng(_PERMUTATION_SEED)
+        # a, b < 2**31 and shingle hashes < 2**32, so a * x + b never overflows uint64
+        self._a = rng.integers(1, 1 << 31, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 31, num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature of the word shingles of a text."""
+        words = text.lower().split()
+        size = self.shingle_size
+        if len(words) <= size:
+            shingles = {" ".join(words)}
+        else:
+            shingles = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+            dtype=np.uint64, count=len(shingles)
+        )
+        # One row per shingle, one column per permutation; the signature is the column minimum
+        permuted = (np.outer(hashes, self._a) + self._b) % _HASH_PRIME & _MAX_HASH
+        return permuted.min(axis=0)
+
+    def deduplicate(self, chunks: List) -> List:
+        """
+        Drop near-duplicate chunks, keeping the first copy.
+
+        Only chunks of the same chunk_type are compared. The kept chunk gets
+        'duplicate_count' and 'duplicate_pages' (comma-separated page numbers
+        of the removed copies) in its metadata.
+
+        Args:
+            chunks: DocumentChunks in document order
+
+        Returns:
+            The chunks without near-duplicates, in document order
+        """
+        kept = []
+        signatures: List[np.ndarray] = []
+        buckets: Dict[Tuple[str, int, bytes], List[int]] = {}
+        duplicate_pages: Dict[int, set] = {}
+        duplicate_counts: Dict[int, int] = {}
+
+        for chunk in chunks:
+            chunk_type = chunk.metadata.get('chunk_type', 'text')
+            signature = self.signature(chunk.content)
+            band_keys = [
+                (chunk_type, band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+                for band in range(self.bands)
+            ]
+
+            # Candidates share at least one band; the signature comparison confirms them
+            match = None
+            seen = set()
+            for key in band_keys:
+                for index in buckets.get(key, ()):
+                    if index in seen:
+                        continue
+                    seen.add(index)
+                    if np.count_nonzero(signatures[index] == signature) >= self.threshold * self.num_perm:
+                        match = index
+                        break
+                if match is not None:
+                    break
+
+            if match is None:
+                for key in band_keys:
+                    buckets.setdefault(key, []).append(len(kept))
+                kept.append(chunk)
+                signatures.append(signature)
+            else:
+                duplicate_counts[match] = duplicate_counts.get(match, 0) + 1
+                pages = duplicate_pages.setdefault(match, set())
+                pages.update(range(chunk.page_number, chunk.metadata.get('page_end', chunk.page_number) + 1))
+
+        for index, pages in duplicate_pages.items():
+            chunk = kept[index]
+            pages.discard(chunk.page_number)
+            chunk.metadata['duplicate_count'] = duplicate_counts[index]
+            chunk.metadata['duplicate_pages'] = ', '.join(str(page) for page in sorted(pages))
+
+        removed = len(chunks) - len(kept)
+        if removed:
+            logger.info(f"Removed {removed} near-duplicate chunks of {len(chunks)}")
+        return kept
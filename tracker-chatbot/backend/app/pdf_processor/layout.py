@@ -0,0 +1,75 @@
+import fitz  # PyMuPDF
+import re
+from collections import Counter
+from typing import Dict, List, Any
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Text only (no images), ligatures and whitespace preserved
+_TEXT_FLAGS = getattr(fitz, 'TEXTFLAGS_TEXT', 0)
+
+# Word split by a hyphen at a line break ("connec-\ntor")
+_HYPHEN_BREAK_RE = re.compile(r'-\n(?=[a-z])')
+
+# A block whose text is set this much larger than body text is a heading
+HEADING_SIZE_RATIO = 1.15
+# Headings are short; longer blocks are never flagged
+HEADING_MAX_CHARS = 120
+
+
+def extract_text_blocks(page) -> List[Dict[str, Any]]:
+    """
+    Extract text blocks in content-stream order with layout hints.
+
+    Uses PyMuPDF's "dict" output, whose spans carry their font size. The
+    line pitch of the cheaper "blocks" output is no stand-in: a multi-line
+    block with loose leading (a printed TOC, say) would read as a heading.
+
+    Args:
+        page: PyMuPDF page
+
+    Returns:
+        List of blocks with 'text' (lines still newline-separated), 'bbox'
+        (float tuple), 'font_size' (the size most of its characters are set
+        in) and 'is_heading'
+    """
+    blocks = []
+    size_weights = Counter()
+
+    for block in page.get_text("dict", flags=_TEXT_FLAGS, sort=False)['blocks']:
+        if block.get('type', 0) != 0:  # Skip image blocks
+            continue
+
+        block_sizes = Counter()
+        lines = []
+        for line in block['lines']:
+            for span in line['spans']:
+                block_sizes[round(span['size'], 1)] += len(span['text'])
+            lines.append("".join(span['text'] for span in line['spans']))
+
+        text = "\n".join(lines).strip()
+        if not text:
+            continue
+
+        text = _HYPHEN_BREAK_RE.sub('', text)
+        font_size = block_sizes.most_common(1)[0][0]
+        size_weights[font_size] += len(text)
+
+        x0, y0, x1, y1 = block['bbox']
+        blocks.append({
+            'text': text,
+            'bbox': (float(x0), float(y0), float(x1), float(y1)),
+            'font_size': font_size,
+        })
+
+    # The most common font size by character count is the body text
+    body_size = size_weights.most_common(1)[0][0] if size_weights else 0.0
+    for block in blocks:
+        block['is_heading'] = (
+            body_size > 0
+            and block['font_size'] >= body_size * HEADING_SIZE_RATIO
+            and len(block['text']) <= HEADING_MAX_CHARS
+        )
+
+    return blocks
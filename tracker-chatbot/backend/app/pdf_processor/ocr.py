@@ -0,0 +1,192 @@
+import fitz  # PyMuPDF
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Optional, Iterable, Iterator
+import logging
+
+from .text_cleaner import TextCleaner
+
+logger = logging.getLogger(__name__)
+
+# Extra seconds the parent waits beyond the Tesseract timeout (covers page rendering)
+RESULT_TIMEOUT_MARGIN = 30.0
+
+
+def is_ocr_available() -> bool:
+    """Check that pytesseract is installed and the tesseract binary can be run."""
+    try:
+        import pytesseract
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        return False
+
+
+class OCRProcessor:
+    def __init__(self, workers: int = 1, dpi: int = 300, language: str = "eng",
+                 page_timeout: float = 60.0, text_cleaner: Optional[TextCleaner] = None):
+        """
+        OCR for pages without a text layer, run in its own bounded process pool.
+
+        The pool is separate from the extraction pool, so OCR can never take
+        more than `workers` cores. Tesseract runs are killed after
+        page_timeout seconds; a page whose result still does not arrive takes
+        the pool down with it, so a stuck worker never holds up later pages.
+
+        Args:
+            workers: Number of OCR processes
+            dpi: Resolution pages are rendered at before OCR
+            language: Tesseract language code(s), e.g. "eng" or "eng+deu"
+            page_timeout: Seconds after which OCR of a single page is abandoned
+            text_cleaner: Cleaner applied to the OCR output (defaults to TextCleaner())
+        """
+        self.workers = max(1, workers)
+        self.dpi = dpi
+        self.language = language
+        self.page_timeout = page_timeout
+        self.text_cleaner = text_cleaner or TextCleaner()
+        self.available = is_ocr_available()
+        self._executor = None
+        self._counters = {
+            'pages_completed': 0,
+            'pages_failed': 0,
+            'pages_timed_out': 0,
+        }
+
+        if not self.available:
+            logger.warning("OCR requested but pytesseract/tesseract is not installed; image-only pages stay empty")
+
+    def ocr_pages(self, file_path: str, page_numbers: Iterable[int]) -> Iterator[Dict[str, Any]]:
+        """
+        OCR pages of a PDF.
+
+        Blocks the calling thread, so callers run it outside the request path.
+
+        Args:
+            file_path: Path to PDF file
+            page_numbers: 1-based numbers of the pages to OCR
+
+        Yields:
+            Page dicts ('text', 'page_number', 'char_count', 'extraction') in the
+            order requested; pages that fail or time out are skipped
+        """
+        if not self.available:
+            return
+
+        queue = deque(page_numbers)
+        pending = deque()
+        # Bounded submission, so a long document never queues every rendered page at once
+        max_in_flight = self.workers * 2
+
+        while queue or pending:
+            executor = self._get_executor()
+            while queue and len(pending) < max_in_flight:
+                page_number = queue.popleft()
+                pending.append((page_number, executor.submit(
+                    _ocr_page, file_path, page_number - 1, self.dpi, self.language, self.page_timeout
+                )))
+
+            page_info = self._collect(*pending.popleft(), queue, pending)
+            if page_info:
+                yield page_info
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get OCR availability and page counters."""
+        return {
+            'available': self.available,
+            'workers': self.workers,
+            **self._counters
+        }
+
+    def close(self):
+        """Shut down the OCR process pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _collect(self, page_number: int, future, queue: deque, pending: deque) -> Optional[Dict[str, Any]]:
+        """
+        Wait for one OCR result and turn it into a page dict.
+
+        When the pool has to be replaced, the pages still in pending are moved
+        back to the front of queue, to be resubmitted to the new pool.
+        """
+        try:
+            raw_text = future.result(timeout=self.page_timeout + RESULT_TIMEOUT_MARGIN)
+        except FutureTimeoutError:
+            self._counters['pages_timed_out'] += 1
+            logger.warning(f"OCR of page {page_number} did not finish in time, skipping")
+            # The stuck worker takes the pool down; pages still in flight are resubmitted
+            self._restart(queue, pending)
+            return None
+        except BrokenProcessPool as e:
+            self._counters['pages_failed'] += 1
+            logger.warning(f"OCR worker died on page {page_number}, skipping: {str(e)}")
+            self._restart(queue, pending)
+            return None
+        except RuntimeError as e:
+            # pytesseract reports a killed Tesseract run as RuntimeError('Tesseract process timeout')
+            if 'timeout' in str(e).lower():
+                self._counters['pages_timed_out'] += 1
+                logger.warning(f"OCR of page {page_number} timed out after {self.page_timeout}s")
+            else:
+                self._counters['pages_failed'] += 1
+                logger.warning(f"OCR of page {page_number} failed: {str(e)}")
+            return None
+        except Exception as e:
+            self._counters['pages_failed'] += 1
+            logger.warning(f"OCR of page {page_number} failed: {str(e)}")
+            return None
+
+        self._counters['pages_completed'] += 1
+        text = self.text_cleaner.clean(raw_text)
+        return {
+            'text': text,
+            'page_number': page_number,
+            'char_count': len(text),
+            'extraction': 'ocr'
+        }
+
+    def _restart(self, queue: deque, pending: deque):
+        """Put pages still in flight back at the front of the queue and drop the pool."""
+        queue.extendleft(reversed([page_number for page_number, _ in pending]))
+        pending.clear()
+        self._terminate()
+
+    def _terminate(self):
+        """Kill the pool, including workers stuck on a page."""
+        executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        # ProcessPoolExecutor cannot cancel a running call, so its processes are terminated
+        for process in list((getattr(executor, '_processes', None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Create the OCR process pool on first use."""
+        if self._executor is None:
+            # spawn avoids forking the API process after torch/chroma have started threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+
+def _ocr_page(file_path: str, page_num: int, dpi: int, language: str, timeout: float) -> str:
+    """Render one page to a grayscale image and OCR it (runs in an OCR worker)."""
+    import pytesseract
+    from PIL import Image
+
+    doc = fitz.open(file_path)
+    try:
+        pixmap = doc[page_num].get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+        image = Image.frombytes("L", (pixmap.width, pixmap.height), pixmap.samples)
+    finally:
+        doc.close()
+
+    return pytesseract.image_to_string(image, lang=language, timeout=timeout)
+
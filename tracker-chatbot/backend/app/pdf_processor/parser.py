@@ -1,28 +1,156 @@
 import fitz  # PyMuPDF
-import pdfplumber
-import re
-from typing import Dict, List, Any, Optional
+import os
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Union
 from dataclasses import dataclass
 import logging
 
+from .tables import TableExtractor, extract_page_tables, extract_plumber_page_tables
+from .text_cleaner import TextCleaner
+from .layout import extract_text_blocks
+from .toc import TocScanner, SectionIndex, scan_toc_lines, TOC_SCAN_PAGES
+from .content import CompactPDFContent, page_bbox
+from .boilerplate import BoilerplateFilter, text_edge_lines, block_edge_lines, DETECT_SAMPLE_PAGES
+
 logger = logging.getLogger(__name__)
 
+TABLE_BACKENDS = ('pymupdf', 'pdfplumber')
+EXTRACTION_MODES = ('text', 'blocks')
+
+# Upper bound on pages per parallel work unit, so streamed pages arrive steadily
+MAX_PAGES_PER_RANGE = 32
+
+# Parser instance owned by each parallel extraction worker process
+_worker_parser = None
+
+
+def parse_page_ranges(spec: str, page_count: int) -> List[int]:
+    """
+    Parse a page selection such as "1-5, 9, 120-" into page numbers.
+    
+    Args:
+        spec: Comma-separated 1-based pages and inclusive ranges; an open end runs to the last page
+        page_count: Number of pages in the document
+        
+    Returns:
+        Sorted, de-duplicated 1-based page numbers
+    """
+    selected = set()
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            if '-' in part:
+                first, last = part.split('-', 1)
+                first = int(first) if first.strip() else 1
+                last = int(last) if last.strip() else page_count
+            else:
+                first = last = int(part)
+        except ValueError:
+            raise ValueError(f"Invalid page range: '{part}'")
+        
+        if first < 1 or last > page_count or first > last:
+            raise ValueError(f"Page range '{part}' is outside 1-{page_count}")
+        selected.update(range(first, last + 1))
+    
+    if not selected:
+        raise ValueError("Page selection is empty")
+    return sorted(selected)
+
 
 @dataclass
 class PDFContent:
-    text: str
     pages: List[Dict[str, Any]]
     metadata: Dict[str, Any]
     tables: List[Dict[str, Any]]
     toc: List[Dict[str, Any]]
+    
+    @cached_property
+    def text(self) -> str:
+        """Full document text, only built when a caller asks for it."""
+        return "".join(page_info['text'] + "\n" for page_info in self.pages)
+    
+    @cached_property
+    def section_index(self) -> SectionIndex:
+        """Page-to-section lookup built from the TOC."""
+        return SectionIndex(self.toc)
 
 
 class PDFParser:
-    def __init__(self):
+    def __init__(self, workers: int = 1, parallel_min_pages: int = 64,
+                 table_backend: str = "pymupdf", protected_terms: Optional[Iterable[str]] = None,
+                 extraction_mode: str = "text", table_workers: int = 0,
+                 table_page_timeout: float = 10.0, strip_boilerplate: bool = False,
+                 boilerplate_min_fraction: float = 0.5):
+        """
+        Initialize the PDF parser.
+        
+        Args:
+            workers: Number of processes used for page extraction (1 = serial, 0 = one per CPU core)
+            parallel_min_pages: Documents with fewer pages are always parsed serially
+            table_backend: 'pymupdf' extracts tables in the same pass as text,
+                'pdfplumber' reopens the file and scans every page
+            protected_terms: Acronyms kept intact by text cleaning (None = built-in list)
+            extraction_mode: 'text' cleans plain page text with regexes, 'blocks' keeps
+                layout blocks (order, bounding boxes, heading hints) in page_info['blocks']
+            table_workers: Processes for table extraction with a per-page time budget
+                (0 = no pool; tables are found in the text pass or the pdfplumber pass)
+            table_page_timeout: Seconds a page may spend in table extraction before
+                it is skipped (only with table_workers)
+            strip_boilerplate: Remove running headers, footers and page-number
+                lines (see BoilerplateFilter) before the text is cleaned
+            boilerplate_min_fraction: Share of pages an edge line must repeat on
+                to count as boilerplate
+        """
+        if workers < 0:
+            raise ValueError("workers must be non-negative")
+        if table_backend not in TABLE_BACKENDS:
+            raise ValueError(f"table_backend must be one of {TABLE_BACKENDS}")
+        if extraction_mode not in EXTRACTION_MODES:
+            raise ValueError(f"extraction_mode must be one of {EXTRACTION_MODES}")
+        if table_workers < 0:
+            raise ValueError("table_workers must be non-negative")
+        if not 0.0 < boilerplate_min_fraction < 1.0:
+            raise ValueError("boilerplate_min_fraction must be between 0 and 1")
+        
         self.supported_formats = ['.pdf']
+        self.workers = workers or os.cpu_count() or 1
+        self.parallel_min_pages = parallel_min_pages
+        self.table_backend = table_backend
+        self.extraction_mode = extraction_mode
+        self.strip_boilerplate = strip_boilerplate
+        self.boilerplate_min_fraction = boilerplate_min_fraction
+        self.table_extractor = (
+            TableExtractor(table_workers, table_page_timeout, table_backend) if table_workers else None
+        )
+        # Compiled once here instead of on every page
+        self.text_cleaner = TextCleaner(protected_terms)
+        
+        # Constructor arguments replayed in worker processes (workers always parse serially)
+        self._worker_options: Dict[str, Any] = {
+            'table_backend': table_backend,
+            'protected_terms': self.text_cleaner.protected_terms,
+            'extraction_mode': extraction_mode,
+            'table_workers': table_workers,
+        }
+        self._executor = None
     
-    def parse_pdf(self, file_path: str) -> PDFContent:
-        """Parse PDF file and extract text, tables, and metadata."""
+    def parse_pdf(self, file_path: str, pages: Optional[Iterable[int]] = None,
+                  compact: bool = False) -> Union[PDFContent, CompactPDFContent]:
+        """
+        Parse PDF file and extract text, tables, and metadata.
+        
+        Args:
+            file_path: Path to the PDF file
+            pages: 1-based page numbers to extract (all pages if None); metadata
+                and TOC always describe the whole document
+            compact: Return a CompactPDFContent, which keeps all page text in one
+                buffer instead of a dict per page (for very large documents)
+        """
         doc = None
         try:
             # Extract with PyMuPDF for text and metadata
@@ -31,35 +159,29 @@ class PDFParser:
             # Get document metadata safely
             metadata = self._extract_metadata(doc)
             
-            # Extract text and page info
-            pages = []
-            full_text = ""
+            # The outline is cheap; the printed TOC is only searched for without one
+            toc = self._extract_toc(doc)
+            toc_scanner = TocScanner(0 if toc else TOC_SCAN_PAGES)
             
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                page_text = page.get_text()
-                
-                # Clean text artifacts
-                cleaned_text = self._clean_text(page_text)
-                
-                page_info = {
-                    'page_number': page_num + 1,
-                    'text': cleaned_text,
-                    'char_count': len(cleaned_text),
-                    'bbox': page.rect,
-                }
-                
-                pages.append(page_info)
-                full_text += cleaned_text + "\n"
+            # Extract text, page info and tables in one pass (in parallel for large documents)
+            page_nums = self._resolve_pages(pages, len(doc))
+            if compact:
+                return self._build_compact(doc, file_path, metadata, toc, toc_scanner, page_nums)
+            pages = list(self._iter_doc_pages(doc, file_path, toc_scanner, page_nums, metadata))
             
-            # Extract tables with pdfplumber (streaming for memory efficiency)
-            tables = self._extract_tables(file_path)
+            if not toc:
+                toc = toc_scanner.entries
+                # Now part of toc, so consumers of PDFContent do not see them twice
+                for page_info in pages[:TOC_SCAN_PAGES]:
+                    page_info.pop('toc_entries', None)
+                logger.info(f"Found {len(toc)} TOC entries in page text")
             
-            # Extract table of contents with better error handling
-            toc = self._extract_toc(doc)
+            if self.tables_in_text_pass:
+                tables = [table for page_info in pages for table in page_info['tables']]
+            else:
+                tables = self._extract_tables(file_path, page_nums, metadata)
             
             return PDFContent(
-                text=full_text,
                 pages=pages,
                 metadata=metadata,
                 tables=tables,
@@ -74,6 +196,282 @@ class PDFParser:
             if doc is not None:
                 doc.close()
     
+    def _build_compact(self, doc, file_path: str, metadata: Dict[str, Any], toc: List[Dict[str, Any]],
+                       toc_scanner: TocScanner, page_nums: List[int]) -> CompactPDFContent:
+        """Stream extracted pages straight into a CompactPDFContent."""
+        content = CompactPDFContent.from_pages(
+            self._iter_doc_pages(doc, file_path, toc_scanner, page_nums, metadata), metadata, toc
+        )
+        if not toc:
+            content.toc = toc_scanner.entries
+            logger.info(f"Found {len(content.toc)} TOC entries in page text")
+        if not self.tables_in_text_pass:
+            content.tables = self._extract_tables(file_path, page_nums, metadata)
+        return content
+    
+    def iter_pages(self, file_path: str, pages: Optional[Iterable[int]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield cleaned pages one at a time for bounded-memory ingestion.
+        
+        Args:
+            file_path: Path to the PDF file
+            pages: 1-based page numbers to extract (all pages if None)
+            
+        Yields:
+            Page dicts in document order, as found in PDFContent.pages. When the
+            document has no outline, pages holding a printed TOC also carry
+            'toc_entries'.
+        """
+        doc = fitz.open(file_path)
+        try:
+            page_nums = self._resolve_pages(pages, len(doc))
+            toc_scanner = TocScanner(0 if doc.get_toc() else TOC_SCAN_PAGES)
+            yield from self._iter_doc_pages(doc, file_path, toc_scanner, page_nums)
+        finally:
+            doc.close()
+    
+    def get_toc(self, file_path: str, scan_text: bool = False) -> List[Dict[str, Any]]:
+        """
+        Read the TOC without extracting page content.
+        
+        Args:
+            file_path: Path to the PDF file
+            scan_text: Without an outline, also look for a printed TOC in the
+                first pages (for partial parses that do not extract those pages)
+        """
+        doc = fitz.open(file_path)
+        try:
+            toc = self._extract_toc(doc)
+            if toc or not scan_text:
+                return toc
+            
+            toc_scanner = TocScanner(TOC_SCAN_PAGES)
+            for page_num in range(min(TOC_SCAN_PAGES, len(doc))):
+                if not toc_scanner.wants(page_num):
+                    break
+                toc_scanner.accept({
+                    'page_number': page_num + 1,
+                    'toc_entries': scan_toc_lines(doc[page_num].get_text())
+                })
+            return toc_scanner.entries
+        finally:
+            doc.close()
+    
+    def get_tables(self, file_path: str, pages: Optional[Iterable[int]] = None,
+                   metadata: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Extract tables without extracting page text.
+        
+        Args:
+            file_path: Path to the PDF file
+            pages: 1-based page numbers to scan (all pages if None)
+            metadata: Receives 'table_timeout_pages' when pages ran out of time
+        """
+        if not self.tables_in_text_pass:
+            page_nums = None if pages is None else self._resolve_pages(pages, self.get_page_count(file_path))
+            return self._extract_tables(file_path, page_nums, metadata)
+        
+        doc = fitz.open(file_path)
+        try:
+            page_nums = self._resolve_pages(pages, len(doc))
+            return [table for page_num in page_nums for table in extract_page_tables(doc[page_num])]
+        finally:
+            doc.close()
+    
+    def get_metadata(self, file_path: str) -> Dict[str, Any]:
+        """Read document metadata without extracting any page content."""
+        doc = fitz.open(file_path)
+        try:
+            return self._extract_metadata(doc)
+        finally:
+            doc.close()
+    
+    def _extract_page(self, page, page_num: int, scan_toc: bool = False,
+                      boilerplate: Optional[BoilerplateFilter] = None) -> Dict[str, Any]:
+        """Extract and clean the text (and tables, with the pymupdf backend) of a single page."""
+        removed = 0
+        if self.extraction_mode == 'blocks':
+            page_info = self._extract_page_blocks(page, scan_toc, boilerplate)
+            removed = page_info.pop('boilerplate_chars')
+        else:
+            raw_text = page.get_text()
+            if boilerplate:
+                raw_text, removed = boilerplate.strip_text(raw_text)
+            page_info = {'text': self._clean_text(raw_text)}
+            if scan_toc:
+                # Cleaning removes line breaks, so the TOC is matched on the raw text
+                page_info['toc_entries'] = scan_toc_lines(raw_text)
+        
+        page_info.update({
+            'page_number': page_num + 1,
+            'char_count': len(page_info['text']),
+            'bbox': page_bbox(page.rect),
+            'tables': extract_page_tables(page) if self.tables_in_text_pass else [],
+        })
+        # Scanned pages have no text layer, only images; OCRProcessor picks them up
+        if not page_info['text'] and page.get_images():
+            page_info['needs_ocr'] = True
+        if removed:
+            page_info['boilerplate_chars'] = removed
+        return page_info
+    
+    def _extract_page_blocks(self, page, scan_toc: bool = False,
+                             boilerplate: Optional[BoilerplateFilter] = None) -> Dict[str, Any]:
+        """Build page text from layout blocks, one paragraph per block."""
+        blocks = []
+        raw_lines = []
+        removed = 0
+        page_blocks = extract_text_blocks(page)
+        if boilerplate:
+            page_blocks, removed = boilerplate.strip_blocks(page_blocks, page.rect.height)
+        for block in page_blocks:
+            if scan_toc:
+                raw_lines.append(block['text'])
+            block['text'] = self.text_cleaner.clean_block(block['text'])
+            if block['text']:
+                blocks.append(block)
+        
+        # Blank lines between blocks let the chunker split on real block boundaries
+        page_info = {
+            'text': "\n\n".join(block['text'] for block in blocks),
+            'blocks': blocks,
+            'boilerplate_chars': removed,
+        }
+        if scan_toc:
+            page_info['toc_entries'] = scan_toc_lines("\n".join(raw_lines))
+        return page_info
+    
+    @staticmethod
+    def _resolve_pages(pages: Optional[Iterable[int]], page_count: int) -> List[int]:
+        """Turn an optional 1-based page selection into sorted 0-based page indexes."""
+        if pages is None:
+            return list(range(page_count))
+        
+        page_nums = sorted(set(page_number - 1 for page_number in pages))
+        if page_nums and (page_nums[0] < 0 or page_nums[-1] >= page_count):
+            raise ValueError(f"Page selection is outside 1-{page_count}")
+        return page_nums
+    
+    def _iter_doc_pages(self, doc, file_path: str, toc_scanner: Optional[TocScanner] = None,
+                        page_nums: Optional[List[int]] = None,
+                        metadata: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield pages in order, fanning page ranges out to worker processes when enabled.
+        
+        With strip_boilerplate, metadata receives 'boilerplate_lines' and
+        'boilerplate_chars_removed' once the last page is out.
+        """
+        if page_nums is None:
+            page_nums = list(range(len(doc)))
+        page_count = len(page_nums)
+        next_page = 0
+        if toc_scanner is None:
+            toc_scanner = TocScanner(0)
+        boilerplate = self._detect_boilerplate(doc)
+        removed = 0
+        
+        if self.workers > 1 and page_count >= self.parallel_min_pages:
+            try:
+                pages = self._iter_pages_parallel(file_path, page_nums, toc_scanner.max_pages, boilerplate)
+                for page_info in pages:
+                    toc_scanner.accept(page_info)
+                    removed += page_info.pop('boilerplate_chars', 0)
+                    yield page_info
+                    next_page += 1
+                self._record_boilerplate(boilerplate, removed, metadata)
+                return
+            except Exception as e:
+                failed_page = page_nums[min(next_page, page_count - 1)] + 1
+                logger.warning(f"Parallel extraction failed at page {failed_page}, "
+                               f"continuing serially: {str(e)}")
+                # A crashed worker leaves the pool unusable, so start fresh next time
+                self.close()
+        
+        for page_num in page_nums[next_page:]:
+            page_info = self._extract_page(doc[page_num], page_num, toc_scanner.wants(page_num), boilerplate)
+            toc_scanner.accept(page_info)
+            removed += page_info.pop('boilerplate_chars', 0)
+            yield page_info
+        self._record_boilerplate(boilerplate, removed, metadata)
+    
+    def _detect_boilerplate(self, doc) -> Optional[BoilerplateFilter]:
+        """
+        Find the document's running headers and footers on a sample of its pages.
+        
+        The whole document is sampled, not just the selected pages, so a
+        partial parse strips the same lines as a full one.
+        """
+        if not self.strip_boilerplate:
+            return None
+        
+        page_count = len(doc)
+        step = max(1, page_count // DETECT_SAMPLE_PAGES)
+        sample = range(0, page_count, step)[:DETECT_SAMPLE_PAGES]
+        if self.extraction_mode == 'blocks':
+            page_lines = (block_edge_lines(extract_text_blocks(doc[page_num]), doc[page_num].rect.height)
+                          for page_num in sample)
+        else:
+            page_lines = (text_edge_lines(doc[page_num].get_text()) for page_num in sample)
+        
+        boilerplate = BoilerplateFilter.from_pages(page_lines, self.boilerplate_min_fraction)
+        logger.debug(f"Boilerplate lines: {sorted(boilerplate.lines)}")
+        return boilerplate or None
+    
+    @staticmethod
+    def _record_boilerplate(boilerplate: Optional[BoilerplateFilter], removed: int,
+                            metadata: Optional[Dict[str, Any]]):
+        """Log (and record in metadata) what the boilerplate filter removed."""
+        if boilerplate is None:
+            return
+        logger.info(f"Stripped {removed} characters of {len(boilerplate.lines)} repeating header/footer lines")
+        if metadata is not None:
+            metadata['boilerplate_lines'] = len(boilerplate.lines)
+            metadata['boilerplate_chars_removed'] = removed
+    
+    def _iter_pages_parallel(self, file_path: str, page_nums: List[int], toc_scan_pages: int = 0,
+                             boilerplate: Optional[BoilerplateFilter] = None) -> Iterator[Dict[str, Any]]:
+        """Split the selected pages into ranges and extract them across the process pool."""
+        page_count = len(page_nums)
+        # Several ranges per worker keeps the pool busy when page costs are uneven
+        range_size = min(max(1, -(-page_count // (self.workers * 4))), MAX_PAGES_PER_RANGE)
+        
+        executor = self._get_executor()
+        # Only a couple of ranges per worker are in flight, so a slow consumer
+        # never has the whole document buffered in finished futures
+        max_in_flight = self.workers * 2
+        pending = deque()
+        
+        for start in range(0, page_count, range_size):
+            page_range = page_nums[start:start + range_size]
+            pending.append(executor.submit(_parse_pages, file_path, page_range, toc_scan_pages, boilerplate))
+            if len(pending) >= max_in_flight:
+                yield from pending.popleft().result()
+        
+        while pending:
+            yield from pending.popleft().result()
+        
+        logger.info(f"Extracted {page_count} pages in ranges of {range_size} across {self.workers} workers")
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Create the extraction process pool on first use."""
+        if self._executor is None:
+            # spawn avoids forking the API process after torch/chroma have started threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self._worker_options,)
+            )
+        return self._executor
+    
+    def close(self):
+        """Shut down the extraction and table process pools."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self.table_extractor is not None:
+            self.table_extractor.close()
+    
     def _extract_metadata(self, doc) -> Dict[str, Any]:
         """Extract PDF metadata safely."""
         try:
@@ -103,106 +501,43 @@ class PDFParser:
     
     def _clean_text(self, text: str) -> str:
         """Clean text artifacts from PDF extraction."""
-        if not text:
-            return ""
-        
-        # Handle character encoding issues
-        try:
-            # Try to fix common encoding issues
-            text = text.encode('utf-8', errors='ignore').decode('utf-8')
-        except UnicodeError:
-            logger.warning("Text encoding issue, using original text")
-        
-        # Remove excessive whitespace but preserve structure
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Less aggressive character cleaning - preserve technical characters
-        # Keep: letters, numbers, spaces, punctuation, technical symbols
-        # Remove: control characters and random artifacts
-        text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', text)
-        
-        # Fix common OCR/extraction issues but preserve technical terms
-        # List of common technical acronyms to preserve
-        technical_terms = {
-            'WiFi', 'IoT', 'USB', 'API', 'HTTP', 'HTTPS', 'URL', 'JSON', 'XML', 'HTML',
-            'CSS', 'SQL', 'NoSQL', 'CPU', 'GPU', 'RAM', 'ROM', 'BIOS', 'UEFI', 'PDF',
-            'LTE', '5G', '4G', '3G', '2G', 'GPS', 'GPRS', 'EDGE', 'HSPA', 'WCDMA',
-            'CDMA', 'TDMA', 'FDMA', 'VoIP', 'SIP', 'RTP', 'TCP', 'UDP', 'IP', 'IPv4',
-            'IPv6', 'DNS', 'DHCP', 'NAT', 'VPN', 'SSH', 'SSL', 'TLS', 'FTP', 'SMTP',
-            'POP3', 'IMAP', 'LDAP', 'Kerberos', 'OAuth', 'JWT', 'REST', 'SOAP',
-            'XML', 'XSLT', 'XPATH', 'XQuery', 'DOM', 'SAX', 'AJAX', 'XHR', 'WSDL',
-            'UML', 'ERD', 'BPMN', 'IDE', 'SDK', 'API', 'CLI', 'GUI', 'UI', 'UX',
-            'AI', 'ML', 'DL', 'NLP', 'CV', 'OCR', 'RPA', 'BI', 'CRM', 'ERP', 'SCM'
-        }
-        
-        # Create pattern to preserve technical terms
-        term_pattern = '|'.join(re.escape(term) for term in technical_terms)
-        
-        # Protect technical terms from camelCase splitting
-        for term in technical_terms:
-            text = text.replace(term, f'__PROTECTED_{term}__')
-        
-        # Fix camelCase but be more conservative
-        text = re.sub(r'([a-z])([A-Z])([a-z])', r'\1 \2\3', text)  # Only split if followed by lowercase
-        
-        # Restore protected terms
-        for term in technical_terms:
-            text = text.replace(f'__PROTECTED_{term}__', term)
-        
-        # Fix spacing around punctuation
-        text = re.sub(r'\s*([.,;:!?])\s*', r'\1 ', text)
-        text = re.sub(r'\s*([()\[\]{}])\s*', r' \1 ', text)
-        
-        # Remove line breaks within sentences but preserve list structure
-        # Don't merge lines that start with list markers or numbers
-        text = re.sub(r'(?<=[.!?])\s*\n\s*', ' ', text)
-        text = re.sub(r'(?<=[a-z])\s*\n\s*(?=[a-z])', ' ', text)
-        # Preserve line breaks that start list items
-        text = re.sub(r'\n(?=\s*[-•*]\s|\s*\d+\.\s)', '\n', text)
+        return self.text_cleaner.clean(text)
+    
+    @property
+    def tables_in_text_pass(self) -> bool:
+        """Whether pages get their tables while their text is extracted."""
+        return self.table_backend == 'pymupdf' and self.table_extractor is None
+    
+    def _extract_tables(self, file_path: str, page_nums: Optional[List[int]] = None,
+                        metadata: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Extract tables in a separate pass over the file.
         
-        # Clean up extra spaces but preserve single spaces
-        text = re.sub(r' {2,}', ' ', text)
-        text = re.sub(r'\n\s*\n', '\n\n', text)  # Preserve paragraph breaks
+        With table_workers the pages go through the TableExtractor pool, and the
+        numbers of pages that ran out of time are recorded in
+        metadata['table_timeout_pages']. Otherwise pdfplumber scans the pages serially.
+        """
+        if self.table_extractor is not None:
+            if page_nums is None:
+                page_nums = range(self.get_page_count(file_path))
+            timed_out = []
+            tables = list(self.table_extractor.iter_tables(file_path, page_nums, timed_out))
+            if timed_out and metadata is not None:
+                metadata['table_timeout_pages'] = timed_out
+            return tables
         
-        return text.strip()
-    
-    def _extract_tables(self, file_path: str) -> List[Dict[str, Any]]:
-        """Extract tables from PDF using pdfplumber with memory management."""
         tables = []
         
         try:
+            # Only needed for the legacy backend, so keep it off the import path
+            import pdfplumber
+            
             with pdfplumber.open(file_path) as pdf:
-                for page_num, page in enumerate(pdf.pages):
+                if page_nums is None:
+                    page_nums = range(len(pdf.pages))
+                for page_num in page_nums:
                     try:
-                        page_tables = page.extract_tables()
-                        if page_tables:
-                            for table_num, table in enumerate(page_tables):
-                                # Clean table data and filter empty rows
-                                cleaned_table = []
-                                for row in table:
-                                    if row:  # Skip None rows
-                                        cleaned_row = []
-                                        for cell in row:
-                                            if cell is not None:
-                                                cleaned_cell = str(cell).strip()
-                                                cleaned_row.append(cleaned_cell)
-                                            else:
-                                                cleaned_row.append("")
-                                        if any(cleaned_row):  # Only add non-empty rows
-                                            cleaned_table.append(cleaned_row)
-                                
-                                if cleaned_table:
-                                    tables.append({
-                                        'page_number': page_num + 1,
-                                        'table_number': table_num + 1,
-                                        'data': cleaned_table,
-                                        'rows': len(cleaned_table),
-                                        'columns': len(cleaned_table[0]) if cleaned_table else 0
-                                    })
-                        
-                        # Note: page.close() not needed with PyMuPDF
-                        # Document will be closed at the end of _extract_tables
-                        
+                        tables.extend(extract_plumber_page_tables(pdf.pages[page_num], page_num + 1))
                     except Exception as e:
                         logger.warning(f"Error extracting tables from page {page_num + 1}: {str(e)}")
                         continue
@@ -213,7 +548,12 @@ class PDFParser:
         return tables
     
     def _extract_toc(self, doc) -> List[Dict[str, Any]]:
-        """Extract table of contents from PDF with multiple format support."""
+        """
+        Extract the table of contents from the PDF outline.
+        
+        Printed TOCs in the page text are detected by TocScanner while
+        pages are extracted.
+        """
         toc = []
         
         try:
@@ -239,11 +579,7 @@ class PDFParser:
                 except:
                     logger.debug("No outlines found in PDF")
             
-            # If still no TOC, try to find it in the first few pages
-            if not toc:
-                toc = self._extract_toc_from_text(doc)
-            
-            logger.info(f"Extracted {len(toc)} TOC entries")
+            logger.info(f"Extracted {len(toc)} TOC entries from outline")
             
         except Exception as e:
             logger.warning(f"Error extracting TOC: {str(e)}")
@@ -272,53 +608,6 @@ class PDFParser:
                 logger.debug(f"Error processing outline item: {str(e)}")
                 continue
     
-    def _extract_toc_from_text(self, doc) -> List[Dict[str, Any]]:
-        """Extract TOC by searching for patterns in first few pages."""
-        toc = []
-        
-        # Only check first 5 pages for TOC
-        max_pages = min(5, len(doc))
-        
-        toc_patterns = [
-            r'^(\d+)\.\s+(.+?)\s+(\d+)$',  # "1. Chapter Title 123"
-            r'^([A-Za-z]+)\s+(\d+)$',       # "Contents 123"
-            r'^(\.{3,})\s+(\d+)$',          # "......... 123"
-        ]
-        
-        for page_num in range(max_pages):
-            try:
-                page = doc[page_num]
-                text = page.get_text()
-                lines = text.split('\n')
-                
-                for line in lines:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    # Try to match TOC patterns
-                    for pattern in toc_patterns:
-                        match = re.match(pattern, line)
-                        if match:
-                            groups = match.groups()
-                            if len(groups) >= 2:
-                                title = groups[0] if len(groups) == 2 else groups[1]
-                                page_num_toc = int(groups[-1])
-                                
-                                if len(title) > 3:  # Filter out very short titles
-                                    toc.append({
-                                        'level': 1,
-                                        'title': title,
-                                        'page_number': page_num_toc
-                                    })
-                                    break
-                
-            except Exception as e:
-                logger.debug(f"Error extracting TOC from page {page_num + 1}: {str(e)}")
-                continue
-        
-        return toc
-    
     def validate_file(self, file_path: str) -> bool:
         """Validate if file is a supported PDF."""
         try:
@@ -338,3 +627,104 @@ class PDFParser:
             return count
         except:
             return 0
+    
+    def preflight(self, file_path: str, sample_pages: int = 3, chunk_size: int = 800,
+                  chunk_overlap: int = 150, pages_per_second: float = 40.0,
+                  chunks_per_second: float = 60.0) -> Dict[str, Any]:
+        """
+        Inspect a PDF cheaply before committing to a full parse.
+        
+        Opening a document only reads the trailer, xref and page tree. Beyond
+        that, only the fonts and text of a few sampled pages are touched.
+        
+        Args:
+            file_path: Path to the PDF file
+            sample_pages: Number of pages, spread across the document, to sample
+            chunk_size: Chunk size used to estimate the chunk count
+            chunk_overlap: Chunk overlap used to estimate the chunk count
+            pages_per_second: Parse throughput used for the time estimate
+            chunks_per_second: Embedding throughput used for the time estimate
+            
+        Returns:
+            Dictionary with page count, encryption state, text layer presence
+            and the estimated ingest cost
+        """
+        result = {
+            'valid': False,
+            'page_count': 0,
+            'encrypted': False,
+            'needs_password': False,
+            'has_text_layer': False,
+            'sampled_pages': 0,
+            'image_only_sampled_pages': 0,
+            'estimated_chars': 0,
+            'estimated_chunks': 0,
+            'estimated_seconds': 0.0,
+        }
+        
+        doc = None
+        try:
+            doc = fitz.open(file_path)
+            page_count = doc.page_count
+            result.update({
+                'valid': page_count > 0,
+                'page_count': page_count,
+                'encrypted': bool(doc.is_encrypted),
+                'needs_password': bool(doc.needs_pass),
+            })
+            if doc.needs_pass or page_count == 0:
+                return result
+            
+            # Evenly spread sample, always including the first page
+            sample_count = max(1, min(sample_pages, page_count))
+            sample = sorted({i * page_count // sample_count for i in range(sample_count)})
+            
+            sampled_chars = 0
+            for page_num in sample:
+                # A page without fonts cannot have a text layer, so skip its content stream
+                has_fonts = bool(doc.get_page_fonts(page_num))
+                chars = len(doc[page_num].get_text().strip()) if has_fonts else 0
+                if chars:
+                    result['has_text_layer'] = True
+                elif doc.get_page_images(page_num):
+                    result['image_only_sampled_pages'] += 1
+                sampled_chars += chars
+            
+            estimated_chars = sampled_chars * page_count // len(sample)
+            estimated_chunks = -(-estimated_chars // max(1, chunk_size - chunk_overlap))
+            result.update({
+                'sampled_pages': len(sample),
+                'estimated_chars': estimated_chars,
+                'estimated_chunks': estimated_chunks,
+                'estimated_seconds': round(
+                    page_count / pages_per_second + estimated_chunks / chunks_per_second, 1
+                ),
+            })
+            return result
+            
+        except Exception as e:
+            logger.warning(f"Preflight failed for {file_path}: {str(e)}")
+            return result
+        finally:
+            if doc is not None:
+                doc.close()
+
+
+def _init_worker(options: Dict[str, Any]):
+    """Build the parser used by a parallel extraction worker process."""
+    global _worker_parser
+    _worker_parser = PDFParser(**options)
+
+
+def _parse_pages(file_path: str, page_nums: List[int], toc_scan_pages: int = 0,
+                 boilerplate: Optional[BoilerplateFilter] = None) -> List[Dict[str, Any]]:
+    """Extract the given 0-based pages with a fitz handle private to this worker."""
+    doc = fitz.open(file_path)
+    try:
+        # The parent's TocScanner applies the early exit across ranges
+        return [
+            _worker_parser._extract_page(doc[page_num], page_num, page_num < toc_scan_pages, boilerplate)
+            for page_num in page_nums
+        ]
+    finally:
+        doc.close()
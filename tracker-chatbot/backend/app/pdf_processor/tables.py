@@ -0,0 +1,345 @@
+import fitz  # PyMuPDF
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from threading import BrokenBarrierError
+from typing import Dict, List, Any, Optional, Iterable, Iterator
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Tolerance (in points) for treating a vector segment as horizontal or vertical
+_AXIS_TOLERANCE = 1.0
+
+# Seconds a new table pool may take to start its workers (spawn + imports)
+WORKER_STARTUP_TIMEOUT = 60.0
+
+# Seconds the workers may take to close their documents after a batch
+WORKER_RELEASE_TIMEOUT = 10.0
+
+# Document kept open by each table worker process: (key, handle)
+_worker_doc = None
+# Barrier shared by the workers of a pool, so each takes exactly one release task
+_worker_barrier = None
+
+
+def has_table_hints(page, min_rulings: int = 2) -> bool:
+    """
+    Cheap pre-check for pages that may contain a ruled table.
+
+    Both PyMuPDF's and pdfplumber's default table finders build tables from
+    ruling lines, so a page needs at least a few horizontal and vertical
+    segments (drawn lines or rectangle edges) before the finder is worth running.
+
+    Args:
+        page: PyMuPDF page
+        min_rulings: Minimum number of horizontal and of vertical rulings
+
+    Returns:
+        True if the page has enough rulings to form a grid
+    """
+    horizontal = 0
+    vertical = 0
+
+    try:
+        for drawing in page.get_drawings():
+            for item in drawing.get('items', ()):
+                kind = item[0]
+                if kind == 'l':
+                    p1, p2 = item[1], item[2]
+                    if abs(p1.y - p2.y) <= _AXIS_TOLERANCE:
+                        horizontal += 1
+                    elif abs(p1.x - p2.x) <= _AXIS_TOLERANCE:
+                        vertical += 1
+                elif kind == 're':
+                    # Every rectangle contributes two edges in each direction
+                    horizontal += 2
+                    vertical += 2
+
+                if horizontal >= min_rulings and vertical >= min_rulings:
+                    return True
+    except Exception as e:
+        logger.debug(f"Error inspecting drawings on page {page.number + 1}: {str(e)}")
+
+    return False
+
+
+def clean_table(table: List[Optional[List[Any]]]) -> List[List[str]]:
+    """Normalize table cells to stripped strings and drop empty rows."""
+    cleaned_table = []
+    for row in table:
+        if row:  # Skip None rows
+            cleaned_row = [str(cell).strip() if cell is not None else "" for cell in row]
+            if any(cleaned_row):  # Only add non-empty rows
+                cleaned_table.append(cleaned_row)
+    return cleaned_table
+
+
+def build_table_entry(page_number: int, table_number: int,
+                      cleaned_table: List[List[str]]) -> Dict[str, Any]:
+    """Build the table record stored in PDFContent.tables."""
+    return {
+        'page_number': page_number,
+        'table_number': table_number,
+        'data': cleaned_table,
+        'rows': len(cleaned_table),
+        'columns': len(cleaned_table[0]) if cleaned_table else 0
+    }
+
+
+def extract_plumber_page_tables(page, page_number: int) -> List[Dict[str, Any]]:
+    """Extract tables from a pdfplumber page."""
+    tables = []
+    for table_num, table in enumerate(page.extract_tables() or []):
+        # Clean table data and filter empty rows
+        cleaned_table = clean_table(table)
+        if cleaned_table:
+            tables.append(build_table_entry(page_number, table_num + 1, cleaned_table))
+    return tables
+
+
+def extract_page_tables(page) -> List[Dict[str, Any]]:
+    """
+    Extract tables from an already-open PyMuPDF page.
+
+    The table finder only runs on pages flagged by has_table_hints.
+
+    Args:
+        page: PyMuPDF page
+
+    Returns:
+        List of table records for the page
+    """
+    if not has_table_hints(page):
+        return []
+
+    tables = []
+    page_number = page.number + 1
+
+    try:
+        finder = page.find_tables()
+        for table_num, table in enumerate(finder.tables):
+            cleaned_table = clean_table(table.extract())
+            if cleaned_table:
+                tables.append(build_table_entry(page_number, table_num + 1, cleaned_table))
+    except Exception as e:
+        logger.warning(f"Error extracting tables from page {page_number}: {str(e)}")
+
+    return tables
+
+
+class TableExtractor:
+    def __init__(self, workers: int = 1, page_timeout: float = 10.0, backend: str = "pymupdf"):
+        """
+        Table extraction in its own process pool with a time budget per page.
+
+        Table finders can spend minutes on a page with thousands of vector
+        lines. A page that is not done within page_timeout is skipped and its
+        worker is terminated, so extraction time is bounded by the budget
+        rather than by the worst page. Workers keep the file open across the
+        pages of a batch and close it once the batch is done.
+
+        Args:
+            workers: Number of table extraction processes
+            page_timeout: Seconds a page may take before it is skipped
+            backend: 'pymupdf' or 'pdfplumber'
+        """
+        self.workers = max(1, workers)
+        self.page_timeout = page_timeout
+        self.backend = backend
+        self._executor = None
+        self._barrier = None
+        self._counters = {
+            'pages_completed': 0,
+            'pages_failed': 0,
+            'pages_timed_out': 0,
+        }
+
+    def iter_tables(self, file_path: str, page_nums: Iterable[int],
+                    timed_out: Optional[List[int]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Extract the tables of the given pages.
+
+        Args:
+            file_path: Path to the PDF file
+            page_nums: 0-based page indexes
+            timed_out: Receives the 1-based numbers of pages skipped for exceeding the budget
+
+        Yields:
+            Table records in page order, as soon as each page is done
+        """
+        queue = deque(page_nums)
+        pending = deque()
+        # Bounded submission, so a long document never queues every page at once
+        max_in_flight = self.workers * 2
+
+        try:
+            while queue or pending:
+                executor = self._get_executor()
+                while queue and len(pending) < max_in_flight:
+                    page_num = queue.popleft()
+                    pending.append((page_num, executor.submit(_page_tables, file_path, page_num, self.backend)))
+
+                page_num, future = pending.popleft()
+                try:
+                    # Waiting starts at the earliest when the page started, so no page gets less than the budget
+                    tables = future.result(timeout=self.page_timeout)
+                except FutureTimeoutError:
+                    self._counters['pages_timed_out'] += 1
+                    logger.warning(f"Table extraction on page {page_num + 1} exceeded {self.page_timeout}s, skipping")
+                    if timed_out is not None:
+                        timed_out.append(page_num + 1)
+                    # The stuck worker takes the pool down; pages still in flight are resubmitted
+                    self._restart(queue, pending)
+                    continue
+                except BrokenProcessPool as e:
+                    self._counters['pages_failed'] += 1
+                    logger.warning(f"Table worker died on page {page_num + 1}, skipping: {str(e)}")
+                    self._restart(queue, pending)
+                    continue
+                except Exception as e:
+                    self._counters['pages_failed'] += 1
+                    logger.warning(f"Error extracting tables from page {page_num + 1}: {str(e)}")
+                    continue
+
+                self._counters['pages_completed'] += 1
+                yield from tables
+        finally:
+            if pending:
+                # Abandoned part-way: nothing is waiting for the pages still in flight
+                self._terminate()
+            else:
+                self._release_documents()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get table extraction page counters."""
+        return {
+            'workers': self.workers,
+            'page_timeout': self.page_timeout,
+            **self._counters
+        }
+
+    def close(self):
+        """Shut down the table extraction process pool."""
+        if self._executor is not None:
+            self._release_documents()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _release_documents(self):
+        """
+        Have every worker close the document it kept open for the last batch,
+        so no file handle (or, on Windows, file lock) outlives the batch.
+        """
+        if self._executor is None:
+            return
+        try:
+            releases = [self._executor.submit(_release_worker_doc) for _ in range(self.workers)]
+            # A broken barrier means some worker may have missed its release task
+            if all(future.result(timeout=WORKER_RELEASE_TIMEOUT * 2) for future in releases):
+                return
+            error = "barrier broken"
+        except Exception as e:
+            error = str(e)
+        # A pool whose workers cannot close their documents is not worth keeping
+        logger.warning(f"Table workers did not release their documents, restarting the pool: {error}")
+        self._terminate()
+
+    def _restart(self, queue: deque, pending: deque):
+        """Put pages still in flight back at the front of the queue and drop the pool."""
+        queue.extendleft(reversed([page_num for page_num, _ in pending]))
+        pending.clear()
+        self._terminate()
+
+    def _terminate(self):
+        """Kill the pool, including workers stuck on a page."""
+        executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        # ProcessPoolExecutor cannot cancel a running call, so its processes are terminated
+        for process in list((getattr(executor, '_processes', None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Create the table extraction process pool on first use."""
+        if self._executor is None:
+            # spawn avoids forking the API process after torch/chroma have started threads
+            context = multiprocessing.get_context("spawn")
+            self._barrier = context.Barrier(self.workers)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(self._barrier,)
+            )
+            # Worker start-up must not count against the budget of the first pages
+            ready = [self._executor.submit(_worker_ready) for _ in range(self.workers)]
+            for future in ready:
+                future.result(timeout=WORKER_STARTUP_TIMEOUT)
+        return self._executor
+
+
+def _init_worker(barrier):
+    """Set up a new table worker process."""
+    global _worker_barrier
+    _worker_barrier = barrier
+
+
+def _worker_ready() -> bool:
+    """No-op run once per new table worker; returns when the worker is up."""
+    return True
+
+
+def _release_worker_doc() -> bool:
+    """
+    Close the document this table worker kept open.
+
+    One release task is submitted per worker; waiting on the shared barrier
+    keeps a worker from taking a second one while another worker has none.
+    """
+    global _worker_doc
+    if _worker_doc is not None:
+        _worker_doc[1].close()
+        _worker_doc = None
+    try:
+        _worker_barrier.wait(timeout=WORKER_RELEASE_TIMEOUT)
+    except BrokenBarrierError:
+        return False
+    return True
+
+
+def _open_worker_doc(file_path: str, backend: str):
+    """Reuse the open document across pages of the same file in a table worker."""
+    global _worker_doc
+    stat = os.stat(file_path)
+    key = (file_path, backend, stat.st_mtime_ns, stat.st_size)
+    if _worker_doc is not None and _worker_doc[0] == key:
+        return _worker_doc[1]
+
+    if _worker_doc is not None:
+        _worker_doc[1].close()
+        _worker_doc = None
+    if backend == 'pdfplumber':
+        import pdfplumber
+        handle = pdfplumber.open(file_path)
+    else:
+        handle = fitz.open(file_path)
+    _worker_doc = (key, handle)
+    return handle
+
+
+def _page_tables(file_path: str, page_num: int, backend: str) -> List[Dict[str, Any]]:
+    """Extract the tables of one 0-based page (runs in a table worker)."""
+    doc = _open_worker_doc(file_path, backend)
+    if backend == 'pdfplumber':
+        page = doc.pages[page_num]
+        try:
+            return extract_plumber_page_tables(page, page_num + 1)
+        finally:
+            # pdfplumber caches parsed page objects; drop them once the page is done
+            page.flush_cache()
+    return extract_page_tables(doc[page_num])
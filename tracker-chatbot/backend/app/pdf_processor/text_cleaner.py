@@ -0,0 +1,129 @@
+import re
+from typing import Iterable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Common technical acronyms that must survive camelCase splitting
+DEFAULT_PROTECTED_TERMS = (
+    'WiFi', 'IoT', 'USB', 'API', 'HTTP', 'HTTPS', 'URL', 'JSON', 'XML', 'HTML',
+    'CSS', 'SQL', 'NoSQL', 'CPU', 'GPU', 'RAM', 'ROM', 'BIOS', 'UEFI', 'PDF',
+    'LTE', '5G', '4G', '3G', '2G', 'GPS', 'GPRS', 'EDGE', 'HSPA', 'WCDMA',
+    'CDMA', 'TDMA', 'FDMA', 'VoIP', 'SIP', 'RTP', 'TCP', 'UDP', 'IP', 'IPv4',
+    'IPv6', 'DNS', 'DHCP', 'NAT', 'VPN', 'SSH', 'SSL', 'TLS', 'FTP', 'SMTP',
+    'POP3', 'IMAP', 'LDAP', 'Kerberos', 'OAuth', 'JWT', 'REST', 'SOAP',
+    'XSLT', 'XPATH', 'XQuery', 'DOM', 'SAX', 'AJAX', 'XHR', 'WSDL',
+    'UML', 'ERD', 'BPMN', 'IDE', 'SDK', 'CLI', 'GUI', 'UI', 'UX',
+    'AI', 'ML', 'DL', 'NLP', 'CV', 'OCR', 'RPA', 'BI', 'CRM', 'ERP', 'SCM'
+)
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_CAMEL_RE = re.compile(r'[a-z][A-Z][a-z]')
+# Control characters and random artifacts (technical symbols are kept)
+_CONTROL_CHARS_RE = re.compile(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]')
+_SENTENCE_PUNCT_RE = re.compile(r'\s*([.,;:!?])\s*')
+_BRACKET_RE = re.compile(r'\s*([()\[\]{}])\s*')
+_MULTI_SPACE_RE = re.compile(r' {2,}')
+
+
+class TextCleaner:
+    def __init__(self, protected_terms: Optional[Iterable[str]] = None):
+        """
+        Build the cleaning pipeline once so it can be reused for every page.
+
+        Args:
+            protected_terms: Terms kept intact by camelCase splitting
+                (defaults to DEFAULT_PROTECTED_TERMS)
+        """
+        terms = DEFAULT_PROTECTED_TERMS if protected_terms is None else protected_terms
+        # Longest first, so 'IPv4' wins over 'IP' and 'HTTPS' over 'HTTP'
+        self.protected_terms = tuple(sorted(set(t for t in terms if t), key=len, reverse=True))
+        self._max_term_len = len(self.protected_terms[0]) if self.protected_terms else 0
+        # Zero-width lookahead, so overlapping occurrences (BI / IoT in 'BIoT') are all reported
+        self._term_re = (
+            re.compile('(?=(' + '|'.join(re.escape(term) for term in self.protected_terms) + '))')
+            if self.protected_terms else None
+        )
+
+    def clean(self, text: str) -> str:
+        """Clean text artifacts from PDF extraction."""
+        if not text:
+            return ""
+
+        text = self._normalize(text)
+
+        # Fix spacing around punctuation
+        text = _SENTENCE_PUNCT_RE.sub(r'\1 ', text)
+        text = _BRACKET_RE.sub(r' \1 ', text)
+
+        # Clean up extra spaces but preserve single spaces
+        text = _MULTI_SPACE_RE.sub(' ', text)
+
+        return text.strip()
+
+    def clean_block(self, text: str) -> str:
+        """
+        Light cleaning for layout blocks from PyMuPDF's dict output.
+
+        Block text is already assembled from span geometry, so the global
+        punctuation and bracket respacing of clean() is skipped (it would also
+        turn values like '3.3V' into '3. 3V').
+        """
+        if not text:
+            return ""
+        return self._normalize(text).strip()
+
+    def _normalize(self, text: str) -> str:
+        """Encoding repair, whitespace collapse, control character removal and camelCase fixes."""
+        # Handle character encoding issues
+        try:
+            text = text.encode('utf-8', errors='ignore').decode('utf-8')
+        except UnicodeError:
+            logger.warning("Text encoding issue, using original text")
+
+        # Collapse whitespace (this also removes all line breaks)
+        text = _WHITESPACE_RE.sub(' ', text)
+        text = _CONTROL_CHARS_RE.sub('', text)
+
+        # Fix camelCase conservatively while keeping technical terms intact
+        return self._split_camel_case(text)
+
+    def _split_camel_case(self, text: str) -> str:
+        """Insert a space at lower/Upper/lower boundaries that are not inside a protected term."""
+        match = _CAMEL_RE.search(text)
+        if match is None:
+            return text
+
+        parts = []
+        last = 0
+        while match is not None:
+            start = match.start()
+            if self._overlaps_protected_term(text, start):
+                # Retry one character later, as the original placeholder-based cleaner would
+                match = _CAMEL_RE.search(text, start + 1)
+                continue
+
+            parts.append(text[last:start + 1])
+            parts.append(' ')
+            last = start + 1
+            match = _CAMEL_RE.search(text, start + 3)
+
+        parts.append(text[last:])
+        return ''.join(parts)
+
+    def _overlaps_protected_term(self, text: str, start: int) -> bool:
+        """Check whether a protected term covers any of the three characters at start."""
+        if self._term_re is None:
+            return False
+
+        # Only terms starting in this window can reach the candidate, so the
+        # term pattern never has to scan the whole page
+        window_start = max(0, start - self._max_term_len + 1)
+        window_end = min(len(text), start + 3 + self._max_term_len)
+        for term_match in self._term_re.finditer(text, window_start, window_end):
+            term_start = term_match.start()
+            if term_start >= start + 3:
+                break
+            if term_start + len(term_match.group(1)) > start:
+                return True
+        return False
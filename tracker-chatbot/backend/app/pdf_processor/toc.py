@@ -0,0 +1,206 @@
+import re
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Any, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Only the first pages of a document are searched for a printed TOC
+TOC_SCAN_PAGES = 5
+# TOC lines are short, and a TOC page has a bounded number of them
+MAX_TOC_LINE_CHARS = 200
+MAX_TOC_LINES_PER_PAGE = 400
+# A TOC region is a run of entry lines in which at most this many other lines
+# (wrapped titles, part headings) follow each other, entry lines make up at least
+# TOC_LINE_RATIO of the lines, there are at least MIN_TOC_ENTRIES entries, and
+# page numbers do not decrease (a last entry out of order, such as a "Page 2"
+# footer, is dropped). Table cells such as "Voltage 12" also look like entries,
+# but their numbers are not in order.
+MAX_TOC_GAP_LINES = 2
+TOC_LINE_RATIO = 0.5
+MIN_TOC_ENTRIES = 3
+
+_TOC_LINE_PATTERNS = (
+    re.compile(r'^(\d+)\.\s+(.+?)\s+(\d+)$'),  # "1. Chapter Title 123"
+    re.compile(r'^([A-Za-z]+)\s+(\d+)$'),       # "Contents 123"
+    re.compile(r'^(\.{3,})\s+(\d+)$'),          # "......... 123"
+)
+
+
+def _match_toc_line(line: str) -> Optional[Dict[str, Any]]:
+    """The TOC entry a stripped line reads as, if any."""
+    # Every pattern ends with a page number, so anything else is skipped cheaply
+    if len(line) > MAX_TOC_LINE_CHARS or not line[-1].isdigit():
+        return None
+
+    for pattern in _TOC_LINE_PATTERNS:
+        match = pattern.match(line)
+        if match:
+            groups = match.groups()
+            title = groups[0] if len(groups) == 2 else groups[1]
+            if len(title) > 3:  # Filter out very short titles
+                return {
+                    'level': 1,
+                    'title': title,
+                    'page_number': int(groups[-1])
+                }
+            return None
+    return None
+
+
+def _region_entries(entries: List[Dict[str, Any]], line_count: int) -> List[Dict[str, Any]]:
+    """The entries of a run of entry lines spanning line_count lines, if it is a TOC region."""
+    ordered = len(entries)
+    for i in range(1, len(entries)):
+        if entries[i]['page_number'] < entries[i - 1]['page_number']:
+            ordered = i
+            break
+    if ordered < len(entries) - 1 or ordered < MIN_TOC_ENTRIES or len(entries) < TOC_LINE_RATIO * line_count:
+        return []
+    return entries[:ordered]
+
+
+def scan_toc_lines(text: str) -> List[Dict[str, Any]]:
+    """
+    Find the printed TOC entries in the raw (uncleaned, line-structured) text of a page.
+
+    Only entries inside TOC regions count (see MAX_TOC_GAP_LINES), so a page of
+    body text or tables with the odd entry-like line yields nothing. A region
+    that does not continue the page numbers of the one before it is ignored.
+
+    Args:
+        text: Page text with its original line breaks
+
+    Returns:
+        List of TOC entries with 'level', 'title' and 'page_number'
+    """
+    entries = []
+    region: List[Dict[str, Any]] = []
+    region_lines = gap = 0
+
+    def close_region():
+        accepted = _region_entries(region, region_lines)
+        if accepted and (not entries or entries[-1]['page_number'] <= accepted[0]['page_number']):
+            entries.extend(accepted)
+
+    for line in text.split('\n', MAX_TOC_LINES_PER_PAGE)[:MAX_TOC_LINES_PER_PAGE]:
+        line = line.strip()
+        if not line:
+            continue
+        entry = _match_toc_line(line)
+        if entry is not None:
+            region.append(entry)
+            region_lines += gap + 1
+            gap = 0
+        elif region:
+            gap += 1
+            if gap > MAX_TOC_GAP_LINES:
+                close_region()
+                region, region_lines, gap = [], 0, 0
+
+    if region:
+        close_region()
+    return entries
+
+
+class TocScanner:
+    def __init__(self, max_pages: int = TOC_SCAN_PAGES):
+        """
+        Incremental printed-TOC detection over a document's page stream.
+
+        Pages are scanned while they are extracted, so their text is never
+        read twice. Once the TOC has started, scanning stops at the first page
+        without a TOC region or whose entries do not continue the page numbers
+        of the previous page, or after max_pages.
+
+        Args:
+            max_pages: Number of leading pages to scan (0 disables scanning)
+        """
+        self.max_pages = max_pages
+        self.entries: List[Dict[str, Any]] = []
+        self.done = max_pages <= 0
+
+    def wants(self, page_num: int) -> bool:
+        """Whether the page at this 0-based index still needs scanning."""
+        return not self.done and page_num < self.max_pages
+
+    def accept(self, page_info: Dict[str, Any]):
+        """
+        Record the 'toc_entries' found on an extracted page.
+
+        Entries are kept on the page dict while the TOC region continues and
+        removed once it has ended, so stream consumers see the same TOC.
+        """
+        entries = page_info.pop('toc_entries', None)
+        if entries is None or self.done:
+            return
+
+        if entries and (not self.entries or self.entries[-1]['page_number'] <= entries[0]['page_number']):
+            self.entries.extend(entries)
+            page_info['toc_entries'] = entries
+        elif self.entries:
+            self.done = True  # The TOC region has ended
+
+        if page_info.get('page_number', 0) >= self.max_pages:
+            self.done = True
+
+
+class SectionIndex:
+    def __init__(self, toc: Optional[List[Dict[str, Any]]] = None):
+        """
+        Page-to-section interval index built from TOC entries.
+
+        Each entry opens a section that runs until the next entry's start
+        page, so looking up a page is a binary search over start pages.
+
+        Args:
+            toc: TOC entries with 'level', 'title' and 'page_number', in document order
+        """
+        self._toc: List[Dict[str, Any]] = []
+        self._starts: List[int] = []
+        self._paths: List[List[str]] = []
+        self._titles: List[str] = []
+        if toc:
+            self.add(toc)
+
+    def add(self, entries: List[Dict[str, Any]]):
+        """Add TOC entries (e.g. found incrementally while streaming pages)."""
+        self._toc.extend(e for e in entries if e.get('title') and e.get('page_number', 0) > 0)
+
+        # Section paths follow TOC order and levels; intervals follow page order
+        stack: List[tuple] = []
+        sections = []
+        for entry in self._toc:
+            level = entry.get('level', 1)
+            while stack and stack[-1][0] >= level:
+                stack.pop()
+            stack.append((level, entry['title']))
+            sections.append((entry['page_number'], [title for _, title in stack], entry['title']))
+
+        # Stable sort keeps the deepest entry last among sections starting on the same page
+        sections.sort(key=lambda section: section[0])
+        self._starts = [start for start, _, _ in sections]
+        self._paths = [path for _, path, _ in sections]
+        self._titles = [title for _, _, title in sections]
+
+    def lookup(self, page_number: int) -> List[str]:
+        """
+        Get the section path covering a page.
+
+        Args:
+            page_number: 1-based page number
+
+        Returns:
+            Titles from the top-level section down, or an empty list before the first section
+        """
+        position = bisect_right(self._starts, page_number) - 1
+        return self._paths[position] if position >= 0 else []
+
+    def starting_on(self, page_number: int) -> List[Tuple[str, List[str]]]:
+        """Title and section path of each section starting on a page, in TOC order."""
+        first = bisect_left(self._starts, page_number)
+        last = bisect_right(self._starts, page_number)
+        return [(self._titles[i], self._paths[i]) for i in range(first, last)]
+
+    def __len__(self) -> int:
+        return len(self._starts)
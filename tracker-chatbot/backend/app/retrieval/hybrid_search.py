@@ -1,27 +1,38 @@
 from rank_bm25 import BM25Okapi
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import re
 import logging
+import threading
 from collections import defaultdict
 
 logger = logging.getLogger(__name__)
 
+# Children fetched per requested result when answering with parents; neighbouring
+# children of one parent tend to rank together
+CHILDREN_PER_PARENT = 4
+
 
 class HybridSearcher:
-    def __init__(self, vector_store, embedder, alpha: float = 0.5, rrf_k: int = 60):
+    def __init__(self, vector_store, embedder, alpha: float = 0.5, rrf_k: int = 60, parent_store=None):
         """
         Hybrid searcher combines:
         - Dense search (Chroma vector similarity)
         - Sparse search (BM25)
+        parent_store: ParentStore of parent/child chunking; indexed chunks with a
+            'parent_id' are then returned as their parent (small-to-big retrieval)
         """
         self.vector_store = vector_store
         self.embedder = embedder
         self.alpha = alpha
         self.rrf_k = rrf_k
+        self.parent_store = parent_store
 
         self.bm25_index = None
         self.documents = []         # BM25 docs
         self.doc_id_to_index = {}   # doc_id -> index
+        # The OCR thread extends the index while requests search and re-index it;
+        # reentrant because replace_documents() finishes with add_documents()
+        self._lock = threading.RLock()
 
         logger.info(f"Initialized hybrid searcher with alpha={alpha}, rrf_k={rrf_k}")
 
@@ -32,47 +43,131 @@ class HybridSearcher:
         It must NOT call vector_store.add_documents() because upload pipeline already does it,
         and calling it again causes duplicate docs in Chroma.
         """
-        if not documents:
-            return True
+        with self._lock:
+            if not documents:
+                return True
 
-        try:
-            self.documents = []
-            self.doc_id_to_index = {}
+            try:
+                self.documents = []
+                self.doc_id_to_index = {}
 
-            tokenized_docs = []
+                tokenized_docs = []
 
-            for i, doc in enumerate(documents):
-                content = doc.get("content", "") or ""
-                metadata = doc.get("metadata", {}) or {}
+                for i, doc in enumerate(documents):
+                    content = doc.get("content", "") or ""
+                    metadata = doc.get("metadata", {}) or {}
 
-                # Create a stable local id for BM25 indexing
-                doc_id = doc.get("id") or metadata.get("document_id") or f"bm25_{i}"
+                    # Same id as in Chroma, so dense and sparse hits fuse in RRF
+                    doc_id = doc.get("id") or metadata.get("chunk_id") or f"bm25_{i}"
 
-                tokens = self._tokenize_text(content)
-                tokenized_docs.append(tokens)
+                    tokens = self._tokenize_text(content)
+                    tokenized_docs.append(tokens)
 
-                self.documents.append({
-                    "id": doc_id,
-                    "content": content,
-                    "metadata": metadata,
-                    "tokens": tokens
-                })
-                self.doc_id_to_index[doc_id] = len(self.documents) - 1
+                    self.documents.append({
+                        "id": doc_id,
+                        "content": content,
+                        "metadata": metadata,
+                        "tokens": tokens
+                    })
+                    self.doc_id_to_index[doc_id] = len(self.documents) - 1
 
-            if tokenized_docs:
-                self.bm25_index = BM25Okapi(tokenized_docs)
-                logger.info(f"BM25 indexed {len(self.documents)} documents")
+                if tokenized_docs:
+                    self.bm25_index = BM25Okapi(tokenized_docs)
+                    logger.info(f"BM25 indexed {len(self.documents)} documents")
 
-            return True
+                return True
 
-        except Exception as e:
-            logger.error(f"Error indexing documents for BM25: {str(e)}", exc_info=True)
-            return False
+            except Exception as e:
+                logger.error(f"Error indexing documents for BM25: {str(e)}", exc_info=True)
+                return False
+
+    def add_documents(self, documents: List[Dict[str, Any]]) -> bool:
+        """
+        Append documents to the current BM25 index (e.g. OCR output arriving after upload).
+        BM25 statistics cover the whole corpus, so the index is rebuilt from stored tokens.
+        """
+        with self._lock:
+            if not documents:
+                return True
+
+            try:
+                for doc in documents:
+                    content = doc.get("content", "") or ""
+                    metadata = doc.get("metadata", {}) or {}
+                    doc_id = doc.get("id") or metadata.get("chunk_id") or f"bm25_{len(self.documents)}"
+                    entry = {
+                        "id": doc_id,
+                        "content": content,
+                        "metadata": metadata,
+                        "tokens": self._tokenize_text(content)
+                    }
+
+                    # Adding a chunk that is already indexed replaces it instead of duplicating it
+                    if doc_id in self.doc_id_to_index:
+                        self.documents[self.doc_id_to_index[doc_id]] = entry
+                    else:
+                        self.documents.append(entry)
+                        self.doc_id_to_index[doc_id] = len(self.documents) - 1
+
+                self.bm25_index = BM25Okapi([doc["tokens"] for doc in self.documents])
+                logger.info(f"BM25 index extended to {len(self.documents)} documents")
+                return True
+
+            except Exception as e:
+                logger.error(f"Error adding documents to BM25 index: {str(e)}", exc_info=True)
+                return False
+
+    def replace_documents(self, documents: List[Dict[str, Any]], filename: str,
+                          page_numbers: List[int]) -> bool:
+        """
+        Swap the BM25 entries of some pages of a file for re-parsed ones.
+        Entries from other files and pages are kept.
+        """
+        with self._lock:
+            pages = set(page_numbers)
+            kept = [
+                doc for doc in self.documents
+                if not (doc["metadata"].get("filename") == filename
+                        and not pages.isdisjoint(self._page_span(doc["metadata"])))
+            ]
+            removed = len(self.documents) - len(kept)
+
+            self.documents = kept
+            self.doc_id_to_index = {doc["id"]: i for i, doc in enumerate(kept)}
+            if not documents:
+                self.bm25_index = BM25Okapi([doc["tokens"] for doc in kept]) if kept else None
+                return True
+
+            logger.info(f"Replacing {removed} BM25 documents from {len(pages)} pages of {filename}")
+            return self.add_documents(documents)
+
+    def extend_if_current(self, documents: List[Dict[str, Any]], content_hash: str) -> bool:
+        """
+        Append documents only if the index still holds the upload with this
+        content hash; checked and extended atomically, so a concurrent upload
+        cannot replace the index in between.
 
-    def search(self, query: str, top_k: int = 8, threshold: float = None) -> List[Dict[str, Any]]:
+        Returns:
+            True if the documents were appended
+        """
+        with self._lock:
+            if not self.documents or self.documents[0]["metadata"].get("content_hash") != content_hash:
+                return False
+            return self.add_documents(documents)
+
+    @staticmethod
+    def _page_span(metadata: Dict[str, Any]) -> range:
+        """Pages a chunk covers; chunks can run across page breaks."""
+        page_start = metadata.get("page_start", metadata.get("page_number"))
+        return range(page_start, metadata.get("page_end", page_start) + 1)
+
+    def search(self, query: str, top_k: int = 8, threshold: float = None,
+               where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """
         Hybrid search (RRF fusion).
         NOTE: threshold must be small because RRF scores are small (~0.01).
+        where: Chroma-style metadata filter applied to both searches, e.g. {"chunk_type": "table"};
+            equality, $in, $and and $or are supported
         """
         # Use config threshold if not provided
         if threshold is None:
@@ -86,8 +181,10 @@ class HybridSearcher:
             return []
 
         try:
-            dense_results = self._dense_search(query, top_k * 2)
-            sparse_results = self._sparse_search(query, top_k * 2)
+            # Several matching children can share a parent, so more are fetched
+            fetch_k = top_k * CHILDREN_PER_PARENT if self.parent_store is not None else top_k
+            dense_results = self._dense_search(query, fetch_k * 2, where)
+            sparse_results = self._sparse_search(query, fetch_k * 2, where)
             
             logger.info(f"Dense results: {len(dense_results)}, Sparse results: {len(sparse_results)}")
 
@@ -101,7 +198,10 @@ class HybridSearcher:
             filtered = [r for r in fused_results if r.get("combined_score", 0.0) >= threshold]
             logger.info(f"After threshold filtering ({threshold}): {len(filtered)} results")
             
-            final_results = filtered[:top_k]
+            if self.parent_store is not None:
+                final_results = self._expand_parents(filtered, top_k)
+            else:
+                final_results = filtered[:top_k]
             logger.info(f"Final results (top_k={top_k}): {len(final_results)}")
             
             return final_results
@@ -110,7 +210,8 @@ class HybridSearcher:
             logger.error(f"Error in hybrid search: {str(e)}", exc_info=True)
             return []
 
-    def _dense_search(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+    def _dense_search(self, query: str, top_k: int,
+                      where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """Dense vector similarity search using Chroma."""
         try:
             # FIX: your Embedder does not have embed_query()
@@ -119,7 +220,7 @@ class HybridSearcher:
             if query_embedding is None or len(query_embedding) == 0:
                 return []
 
-            results = self.vector_store.query(query_embedding, top_k)
+            results = self.vector_store.query(query_embedding, top_k, where=where)
 
             for rank, r in enumerate(results):
                 r["dense_rank"] = rank + 1
@@ -131,26 +232,32 @@ class HybridSearcher:
             logger.error(f"Error in dense search: {str(e)}", exc_info=True)
             return []
 
-    def _sparse_search(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+    def _sparse_search(self, query: str, top_k: int,
+                       where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """Sparse BM25 search."""
         if not self.bm25_index:
             return []
 
         try:
             query_tokens = self._tokenize_text(query)
-            bm25_scores = self.bm25_index.get_scores(query_tokens)
-
             results = []
-            for idx, score in enumerate(bm25_scores):
-                if score > 0:
-                    doc = self.documents[idx]
-                    results.append({
-                        "id": doc["id"],
-                        "content": doc["content"],
-                        "metadata": doc["metadata"],
-                        "sparse_score": float(score),
-                        "sparse_rank": None
-                    })
+            # Scores are positions in self.documents, which must not change underneath them
+            with self._lock:
+                if not self.bm25_index:
+                    return []
+                bm25_scores = self.bm25_index.get_scores(query_tokens)
+                for idx, score in enumerate(bm25_scores):
+                    if score > 0:
+                        doc = self.documents[idx]
+                        if where and not self._matches_where(doc["metadata"], where):
+                            continue
+                        results.append({
+                            "id": doc["id"],
+                            "content": doc["content"],
+                            "metadata": doc["metadata"],
+                            "sparse_score": float(score),
+                            "sparse_rank": None
+                        })
 
             results.sort(key=lambda x: x["sparse_score"], reverse=True)
 
@@ -163,6 +270,29 @@ class HybridSearcher:
             logger.error(f"Error in sparse search: {str(e)}", exc_info=True)
             return []
 
+    @classmethod
+    def _matches_where(cls, metadata: Dict[str, Any], where: Dict[str, Any]) -> bool:
+        """Evaluate a Chroma-style metadata filter against one document's metadata."""
+        for key, condition in where.items():
+            if key == "$and":
+                if not all(cls._matches_where(metadata, clause) for clause in condition):
+                    return False
+            elif key == "$or":
+                if not any(cls._matches_where(metadata, clause) for clause in condition):
+                    return False
+            elif isinstance(condition, dict):
+                value = metadata.get(key)
+                for operator, operand in condition.items():
+                    if operator == "$eq" and value != operand:
+                        return False
+                    if operator == "$ne" and value == operand:
+                        return False
+                    if operator == "$in" and value not in operand:
+                        return False
+            elif metadata.get(key) != condition:
+                return False
+        return True
+
     def _reciprocal_rank_fusion(self, dense_results: List[Dict[str, Any]],
                                 sparse_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """RRF fusion of dense + sparse results."""
@@ -193,6 +323,41 @@ class HybridSearcher:
         final.sort(key=lambda x: x["combined_score"], reverse=True)
         return final
 
+    def _expand_parents(self, results: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
+        """
+        Answer with the parents of the matched children: one result per parent,
+        ranked by its best child, fetched in a single parent store lookup.
+        Results without a stored parent are returned as they are.
+        """
+        selected = []
+        matched_children = defaultdict(int)
+        for r in results:
+            key = r.get("metadata", {}).get("parent_id") or r["id"]
+            matched_children[key] += 1
+            if matched_children[key] == 1 and len(selected) < top_k:
+                selected.append(r)
+
+        parents = self.parent_store.get_many(
+            r["metadata"]["parent_id"] for r in selected if r.get("metadata", {}).get("parent_id")
+        )
+
+        expanded = []
+        for r in selected:
+            parent = parents.get(r.get("metadata", {}).get("parent_id"))
+            if parent is None:
+                expanded.append(r)
+                continue
+            expanded.append({
+                **r,
+                "id": parent["id"],
+                "content": parent["content"],
+                "metadata": parent["metadata"],
+                "child_id": r["id"],
+                "child_content": r["content"],
+                "matched_children": matched_children[parent["id"]]
+            })
+        return expanded
+
     def _tokenize_text(self, text: str) -> List[str]:
         """Tokenize text for BM25."""
         if not text:
@@ -207,12 +372,16 @@ class HybridSearcher:
             "bm25_index_created": self.bm25_index is not None,
             "alpha": self.alpha,
             "rrf_k": self.rrf_k,
+            "parent_store_stats": self.parent_store.get_stats() if self.parent_store is not None else None,
             "vector_store_stats": self.vector_store.get_stats()
         }
 
     def clear_index(self):
-        self.documents = []
-        self.doc_id_to_index = {}
-        self.bm25_index = None
-        self.vector_store.clear_collection()
+        with self._lock:
+            self.documents = []
+            self.doc_id_to_index = {}
+            self.bm25_index = None
+            self.vector_store.clear_collection()
+            if self.parent_store is not None:
+                self.parent_store.clear()
         logger.info("Cleared hybrid search index")
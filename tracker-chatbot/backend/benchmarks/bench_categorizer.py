@@ -0,0 +1,97 @@
+"""
+Micro-benchmark: KeywordCategorizer vs. the original substring-scan _categorize_chunk.
+
+Usage (from tracker-chatbot/backend):
+    python -m benchmarks.bench_categorizer [PDF ...] [--chunks 10000] [--repeat 3]
+
+Chunks come from splitting the given PDFs like the upload pipeline does, or
+from the synthetic corpus text when no PDF is given; they are repeated up to
+--chunks. Prints a JSON report with per-chunk timings, the speedup and how
+many chunks change primary category (substring hits such as 'can' in 'scan'
+no longer count).
+"""
+import argparse
+import json
+import random
+import time
+
+from app.pdf_processor.categorizer import KeywordCategorizer, DEFAULT_CATEGORY_KEYWORDS
+from app.pdf_processor.chunker import SemanticChunker
+from benchmarks.corpus import WORDS
+
+
+def legacy_categorize_chunk(text: str) -> list:
+    """Original SemanticChunker._categorize_chunk, kept verbatim as the reference."""
+    text_lower = text.lower()
+    category_scores = {}
+    for category, keywords in DEFAULT_CATEGORY_KEYWORDS.items():
+        score = 0
+        for keyword in keywords:
+            if keyword in text_lower:
+                score += 1
+        category_scores[category] = score
+    sorted_categories = [
+        cat for cat, score in sorted(category_scores.items(), key=lambda x: x[1], reverse=True)
+        if score > 0
+    ]
+    return sorted_categories if sorted_categories else ["general"]
+
+
+def load_chunks(paths, count):
+    """Chunk texts from PDFs (or synthetic text), repeated up to count."""
+    chunker = SemanticChunker()
+    if paths:
+        import fitz  # PyMuPDF
+        texts = []
+        for path in paths:
+            doc = fitz.open(path)
+            try:
+                for page in doc:
+                    texts.extend(chunker.text_splitter.split_text(page.get_text()))
+            finally:
+                doc.close()
+    else:
+        rng = random.Random(1)
+        texts = [" ".join(rng.choice(WORDS) for _ in range(120)) for _ in range(500)]
+    texts = [text for text in texts if text.strip()]
+    return (texts * (count // max(len(texts), 1) + 1))[:count]
+
+
+def time_per_chunk(categorize, chunks, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        categorize(chunks)
+        best = min(best, time.perf_counter() - start)
+    return best / max(len(chunks), 1)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('pdfs', nargs='*', help='PDF files providing the chunks')
+    arg_parser.add_argument('--chunks', type=int, default=10000, help='Number of chunks categorized')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Timing runs (best is reported)')
+    args = arg_parser.parse_args()
+
+    chunks = load_chunks(args.pdfs, args.chunks)
+    categorizer = KeywordCategorizer()
+
+    changed = sum(
+        1 for text in chunks
+        if legacy_categorize_chunk(text)[0] != categorizer.categorize(text)[0]
+    )
+
+    legacy = time_per_chunk(lambda texts: [legacy_categorize_chunk(text) for text in texts], chunks, args.repeat)
+    current = time_per_chunk(categorizer.categorize_batch, chunks, args.repeat)
+
+    print(json.dumps({
+        'chunks': len(chunks),
+        'legacy_us_per_chunk': round(legacy * 1e6, 1),
+        'categorizer_us_per_chunk': round(current * 1e6, 1),
+        'speedup': round(legacy / current, 2) if current else None,
+        'changed_primary_category': changed,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Chunking benchmark: serial vs. process-pool SemanticChunker.
+
+Usage (from tracker-chatbot/backend):
+    python -m benchmarks.bench_chunker [PDF ...] [--corpus-dir DIR] [--scale 1.0]
+        [--workers 4] [--repeat 3] [--structure]
+
+Each document is parsed once; chunk_document (pre-parsed PDFContent) and
+chunk_pages over a page generator are then timed with workers=1 and with
+--workers. Prints a JSON report with the timings, the speedup and whether
+the pooled run produced the same chunk IDs in the same order.
+"""
+import argparse
+import json
+import os
+import time
+
+from app.pdf_processor.chunker import SemanticChunker
+from app.pdf_processor.parser import PDFParser
+from benchmarks.corpus import generate_corpus, scaled_specs
+
+
+def best_time(func, repeat):
+    """Best wall time of repeat calls, in seconds, and the last result."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def measure_document(path, workers, repeat, structure):
+    content = PDFParser().parse_pdf(path)
+    serial = SemanticChunker(structure=structure)
+    # Every page goes to the pool, so small documents measure the pool too
+    pooled = SemanticChunker(structure=structure, workers=workers, parallel_min_pages=1)
+    try:
+        # Pool start-up is paid once per process, not per document
+        pooled.chunk_document(content)
+
+        serial_seconds, serial_chunks = best_time(lambda: serial.chunk_document(content), repeat)
+        pooled_seconds, pooled_chunks = best_time(lambda: pooled.chunk_document(content), repeat)
+        stream_seconds, stream_chunks = best_time(
+            lambda: pooled.chunk_pages(iter(content.pages), content.metadata, serial.document_id(content.pages),
+                                       content.toc, content.tables),
+            repeat
+        )
+    finally:
+        pooled.close()
+
+    serial_ids = [chunk.chunk_id for chunk in serial_chunks]
+    return {
+        'path': path,
+        'pages': len(content.pages),
+        'chunks': len(serial_chunks),
+        'serial_ms': round(serial_seconds * 1000, 2),
+        'pooled_ms': round(pooled_seconds * 1000, 2),
+        'pooled_stream_ms': round(stream_seconds * 1000, 2),
+        'speedup': round(serial_seconds / pooled_seconds, 2) if pooled_seconds else None,
+        'same_chunks': serial_ids == [chunk.chunk_id for chunk in pooled_chunks]
+                       == [chunk.chunk_id for chunk in stream_chunks],
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('pdfs', nargs='*', help='PDFs to benchmark (default: synthetic corpus)')
+    arg_parser.add_argument('--corpus-dir', default='benchmarks/synthetic_corpus', help='Where the synthetic corpus is written')
+    arg_parser.add_argument('--scale', type=float, default=1.0, help='Page count multiplier for the synthetic corpus')
+    arg_parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Chunking workers of the pooled run')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Timing runs (best is reported)')
+    arg_parser.add_argument('--structure', action='store_true', help='Chunk in structure mode')
+    args = arg_parser.parse_args()
+
+    pdfs = args.pdfs or [entry['path'] for entry in generate_corpus(args.corpus_dir, scaled_specs(args.scale))]
+    documents = [measure_document(path, args.workers, args.repeat, args.structure) for path in pdfs]
+
+    print(json.dumps({
+        'workers': args.workers,
+        'structure': args.structure,
+        'documents': documents,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+"""
+Parser benchmark: end-to-end parse_pdf plus per-stage timings.
+
+Usage (from tracker-chatbot/backend):
+    python -m benchmarks.bench_parser [PDF ...] [--corpus-dir DIR] [--scale 0.2]
+        [--repeat 3] [--workers 1] [--table-backend pymupdf] [--table-workers 0] [--extraction-mode text]
+        [--compact] [--strip-boilerplate] [--output results.json] [--baseline previous.json]
+
+Without PDF arguments a synthetic corpus (benchmarks.corpus) is generated
+into --corpus-dir first. Each document is measured in a fresh process, so
+the reported peak RSS belongs to that document alone.
+
+Stages are timed in isolation on the same document:
+- parse_pdf: the full pipeline as used by the API (pages/sec is based on this)
+- clean_text: PDFParser._clean_text over the raw text of every page
+- extract_tables: the configured table backend on its own
+- extract_toc: outline TOC plus the printed TOC scan of the first pages
+
+With --baseline, every timing also gets a ratio against the matching
+document in an earlier report (> 1.0 means slower than the baseline).
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz  # PyMuPDF
+
+from app.pdf_processor.parser import PDFParser
+from benchmarks.corpus import generate_corpus, scaled_specs
+
+
+def best_time(func, repeat):
+    """Best wall time of repeat calls, in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process (ru_maxrss is KiB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def measure_document(path, options, repeat, compact=False):
+    """Time every stage for one PDF (runs in its own process)."""
+    parser = PDFParser(**options)
+    try:
+        doc = fitz.open(path)
+        try:
+            page_count = len(doc)
+            raw_pages = [page.get_text() for page in doc]
+        finally:
+            doc.close()
+
+        parse_seconds = best_time(lambda: parser.parse_pdf(path, compact=compact), repeat)
+        content = parser.parse_pdf(path, compact=compact)
+
+        def clean_all():
+            for text in raw_pages:
+                parser._clean_text(text)
+
+        def extract_tables():
+            return parser.get_tables(path)
+
+        def extract_toc():
+            return parser.get_toc(path, scan_text=True)
+
+        stages = {
+            'parse_pdf': parse_seconds,
+            'clean_text': best_time(clean_all, repeat),
+            'extract_tables': best_time(extract_tables, repeat),
+            'extract_toc': best_time(extract_toc, repeat),
+        }
+    finally:
+        parser.close()
+
+    return {
+        'path': path,
+        'pages': page_count,
+        'chars': sum(page_info['char_count'] for page_info in content.pages),
+        'boilerplate_chars_removed': content.metadata.get('boilerplate_chars_removed', 0),
+        'tables': len(content.tables),
+        'table_timeout_pages': content.metadata.get('table_timeout_pages', []),
+        'toc_entries': len(content.toc),
+        'empty_pages': sum(1 for page_info in content.pages if not page_info['text']),
+        'pages_per_second': round(page_count / parse_seconds, 1) if parse_seconds else None,
+        'peak_rss_mb': peak_rss_mb(),
+        'stages_ms': {stage: round(seconds * 1000, 2) for stage, seconds in stages.items()},
+    }
+
+
+def run_isolated(path, options, repeat, compact=False):
+    """Measure a document in a fresh spawned process."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(measure_document, path, options, repeat, compact).result()
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(results, baseline):
+    """Add stage ratios against a baseline report, matched by file name."""
+    previous = {os.path.basename(doc['path']): doc for doc in baseline.get('documents', [])}
+    for doc in results:
+        old = previous.get(os.path.basename(doc['path']))
+        if not old:
+            continue
+        doc['vs_baseline'] = {
+            stage: round(ms / old['stages_ms'][stage], 2)
+            for stage, ms in doc['stages_ms'].items()
+            if old['stages_ms'].get(stage)
+        }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('pdfs', nargs='*', help='PDFs to benchmark (default: synthetic corpus)')
+    arg_parser.add_argument('--corpus-dir', default='benchmarks/synthetic_corpus', help='Where the synthetic corpus is written')
+    arg_parser.add_argument('--scale', type=float, default=1.0, help='Page count multiplier for the synthetic corpus')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Timing runs per stage (best is reported)')
+    arg_parser.add_argument('--workers', type=int, default=1, help='PDFParser workers')
+    arg_parser.add_argument('--table-backend', default='pymupdf', help='PDFParser table_backend')
+    arg_parser.add_argument('--table-workers', type=int, default=0, help='PDFParser table_workers')
+    arg_parser.add_argument('--extraction-mode', default='text', help='PDFParser extraction_mode')
+    arg_parser.add_argument('--compact', action='store_true', help='Parse into CompactPDFContent')
+    arg_parser.add_argument('--strip-boilerplate', action='store_true', help='PDFParser strip_boilerplate')
+    arg_parser.add_argument('--output', help='Also write the JSON report to this file')
+    arg_parser.add_argument('--baseline', help='Earlier JSON report to compare against')
+    args = arg_parser.parse_args()
+
+    pdfs = args.pdfs or [entry['path'] for entry in generate_corpus(args.corpus_dir, scaled_specs(args.scale))]
+    options = {
+        'workers': args.workers,
+        'table_backend': args.table_backend,
+        'extraction_mode': args.extraction_mode,
+        'table_workers': args.table_workers,
+        'strip_boilerplate': args.strip_boilerplate,
+    }
+
+    documents = [run_isolated(path, options, args.repeat, args.compact) for path in pdfs]
+    total_pages = sum(doc['pages'] for doc in documents)
+    total_parse = sum(doc['stages_ms']['parse_pdf'] for doc in documents) / 1000
+
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'pymupdf': fitz.VersionBind,
+        'cpu_count': os.cpu_count(),
+        'options': options,
+        'compact': args.compact,
+        'repeat': args.repeat,
+        'documents': documents,
+        'total': {
+            'pages': total_pages,
+            'parse_seconds': round(total_parse, 3),
+            'pages_per_second': round(total_pages / total_parse, 1) if total_parse else None,
+            'peak_rss_mb': max((doc['peak_rss_mb'] for doc in documents), default=0),
+        },
+    }
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(documents, json.load(f))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
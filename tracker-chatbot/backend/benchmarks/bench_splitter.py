@@ -0,0 +1,96 @@
+"""
+Splitter benchmark: RecursiveSplitter vs. LangChain's RecursiveCharacterTextSplitter.
+
+Usage (from tracker-chatbot/backend):
+    python -m benchmarks.bench_splitter [PDF ...] [--corpus-dir DIR] [--scale 1.0]
+        [--extraction-mode text] [--repeat 3]
+
+Both splitters get the SemanticChunker settings and the parsed page texts of
+the same documents (the synthetic corpus when no PDF is given). Prints a
+JSON report with per-page split times, the speedup, whether every page
+produced identical chunks, and the import time of each splitter's module in
+a fresh interpreter.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from app.pdf_processor.chunker import SemanticChunker
+from app.pdf_processor.parser import PDFParser
+from benchmarks.corpus import generate_corpus, scaled_specs
+
+
+def import_seconds(module, repeat):
+    """Best time to import module in a fresh interpreter, minus the interpreter start-up."""
+    def run(statement):
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, '-c', statement], check=True, capture_output=True)
+            best = min(best, time.perf_counter() - start)
+        return best
+
+    return max(run(f'import {module}') - run('pass'), 0.0)
+
+
+def time_per_page(split, texts, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            split(text)
+        best = min(best, time.perf_counter() - start)
+    return best / max(len(texts), 1)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('pdfs', nargs='*', help='PDFs providing the page texts (default: synthetic corpus)')
+    arg_parser.add_argument('--corpus-dir', default='benchmarks/synthetic_corpus', help='Where the synthetic corpus is written')
+    arg_parser.add_argument('--scale', type=float, default=1.0, help='Page count multiplier for the synthetic corpus')
+    arg_parser.add_argument('--extraction-mode', default='text', help='PDFParser extraction_mode')
+    arg_parser.add_argument('--repeat', type=int, default=3, help='Timing runs (best is reported)')
+    args = arg_parser.parse_args()
+
+    pdfs = args.pdfs or [entry['path'] for entry in generate_corpus(args.corpus_dir, scaled_specs(args.scale))]
+    parser = PDFParser(extraction_mode=args.extraction_mode)
+    texts = [
+        page_info['text'].strip()
+        for path in pdfs
+        for page_info in parser.parse_pdf(path).pages
+        if page_info['text'].strip()
+    ]
+
+    chunker = SemanticChunker()
+    splitter = chunker.text_splitter
+    reference = RecursiveCharacterTextSplitter(
+        chunk_size=splitter.chunk_size,
+        chunk_overlap=splitter.chunk_overlap,
+        length_function=len,
+        separators=splitter.separators
+    )
+
+    identical = sum(1 for text in texts if splitter.split_text(text) == reference.split_text(text))
+    langchain_seconds = time_per_page(reference.split_text, texts, args.repeat)
+    native_seconds = time_per_page(splitter.split_text, texts, args.repeat)
+
+    print(json.dumps({
+        'pages': len(texts),
+        'extraction_mode': args.extraction_mode,
+        'identical_pages': identical,
+        'langchain_us_per_page': round(langchain_seconds * 1e6, 1),
+        'native_us_per_page': round(native_seconds * 1e6, 1),
+        'speedup': round(langchain_seconds / native_seconds, 2) if native_seconds else None,
+        'import_ms': {
+            'langchain_text_splitters': round(import_seconds('langchain_text_splitters', args.repeat) * 1000, 1),
+            'app.pdf_processor.chunker': round(import_seconds('app.pdf_processor.chunker', args.repeat) * 1000, 1),
+        },
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
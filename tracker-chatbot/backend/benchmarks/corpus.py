@@ -0,0 +1,150 @@
+"""
+Synthetic PDF corpus for the parser benchmarks.
+
+Usage (from tracker-chatbot/backend):
+    python -m benchmarks.corpus OUT_DIR [--scale 1.0] [--seed 1]
+
+Writes one PDF per corpus spec plus corpus.json describing them. Documents
+vary page count, text density, ruled tables per page and image-only
+(scanned) pages. Every document has a running header, a "Page N of M"
+footer and a printed TOC on its first page, like the manuals the app ingests.
+"""
+import argparse
+import json
+import os
+import random
+from dataclasses import dataclass, asdict
+from typing import List
+
+import fitz  # PyMuPDF
+
+WORDS = (
+    "the device supports WiFi and IoT over USB with HTTPS API calls using JSON; "
+    "voltage current power battery firmware command install configure. sensor "
+    "gateway antenna LoRa signal protocol network regulator charging consumption "
+    "connect the GPIO pin to the UART header, then restart the myController unit."
+).split()
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+LINE_HEIGHT = 13
+TABLE_ROWS, TABLE_COLUMNS = 5, 4
+
+
+@dataclass
+class CorpusSpec:
+    name: str
+    pages: int
+    lines_per_page: int  # Text density: 10-word lines of body text per page
+    tables_per_page: int
+    image_only_every: int = 0  # Every Nth page is a scanned image without text (0 = none)
+
+
+DEFAULT_SPECS = (
+    CorpusSpec("small_sparse", pages=10, lines_per_page=12, tables_per_page=0),
+    CorpusSpec("medium_dense", pages=100, lines_per_page=50, tables_per_page=0),
+    CorpusSpec("medium_tables", pages=100, lines_per_page=25, tables_per_page=2),
+    CorpusSpec("medium_scanned", pages=100, lines_per_page=30, tables_per_page=0, image_only_every=4),
+    CorpusSpec("large_mixed", pages=500, lines_per_page=40, tables_per_page=1, image_only_every=25),
+)
+
+
+def scaled_specs(scale: float) -> List[CorpusSpec]:
+    """DEFAULT_SPECS with page counts multiplied by scale (at least 2 pages each)."""
+    return [
+        CorpusSpec(**{**asdict(spec), 'pages': max(2, int(spec.pages * scale))})
+        for spec in DEFAULT_SPECS
+    ]
+
+
+def _draw_table(page, top: float, rng: random.Random):
+    """Ruled grid with short cell values; returns the y below the table."""
+    left, cell_width, cell_height = 72, 110, 18
+    for row in range(TABLE_ROWS + 1):
+        y = top + row * cell_height
+        page.draw_line((left, y), (left + TABLE_COLUMNS * cell_width, y))
+    for column in range(TABLE_COLUMNS + 1):
+        x = left + column * cell_width
+        page.draw_line((x, top), (x, top + TABLE_ROWS * cell_height))
+    for row in range(TABLE_ROWS):
+        for column in range(TABLE_COLUMNS):
+            value = "Pin" if row == 0 else f"{rng.choice(WORDS)} {rng.randint(1, 99)}"
+            page.insert_text((left + 4 + column * cell_width, top + 13 + row * cell_height), value, fontsize=8)
+    return top + TABLE_ROWS * cell_height + 16
+
+
+def _scanned_image(rng: random.Random) -> fitz.Pixmap:
+    """Gray noise standing in for a scanned page."""
+    width, height = 120, 170
+    samples = bytes(rng.randint(180, 255) for _ in range(width * height))
+    return fitz.Pixmap(fitz.csGRAY, width, height, samples, False)
+
+
+def generate_pdf(path: str, spec: CorpusSpec, seed: int = 1):
+    """Write one synthetic PDF for spec."""
+    rng = random.Random(f"{seed}:{spec.name}")
+    scan = _scanned_image(rng) if spec.image_only_every else None
+    doc = fitz.open()
+
+    for page_index in range(spec.pages):
+        page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+
+        if spec.image_only_every and page_index % spec.image_only_every == spec.image_only_every - 1:
+            page.insert_image(page.rect, pixmap=scan)
+            continue
+
+        page.insert_text((72, 40), "ACME Corp Confidential - Tracker Manual v2", fontsize=9)
+        y = 70
+        if page_index == 0:
+            for line in ("Contents", "1. Introduction 2", "2. Hardware Setup 3", "3. Wiring Diagrams 5"):
+                page.insert_text((72, y), line, fontsize=11)
+                y += 16
+
+        # Tables are spread between runs of body text
+        runs = spec.tables_per_page + 1
+        for run in range(runs):
+            for _ in range(spec.lines_per_page // runs):
+                if y > PAGE_HEIGHT - 80:
+                    break
+                page.insert_text((72, y), " ".join(rng.choice(WORDS) for _ in range(10)), fontsize=10)
+                y += LINE_HEIGHT
+            if run < spec.tables_per_page and y < PAGE_HEIGHT - 200:
+                y = _draw_table(page, y + 8, rng)
+
+        page.insert_text((270, PAGE_HEIGHT - 30), f"Page {page_index + 1} of {spec.pages}", fontsize=9)
+
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+
+
+def generate_corpus(out_dir: str, specs: List[CorpusSpec], seed: int = 1) -> List[dict]:
+    """
+    Generate every spec into out_dir.
+
+    Returns:
+        List of corpus entries (the spec plus 'path'), also written to corpus.json
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    entries = []
+    for spec in specs:
+        path = os.path.join(out_dir, f"{spec.name}.pdf")
+        generate_pdf(path, spec, seed)
+        entries.append({**asdict(spec), 'path': path})
+
+    with open(os.path.join(out_dir, "corpus.json"), "w") as f:
+        json.dump({'seed': seed, 'documents': entries}, f, indent=2)
+    return entries
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('out_dir', help='Directory the PDFs are written to')
+    arg_parser.add_argument('--scale', type=float, default=1.0, help='Multiplier for page counts')
+    arg_parser.add_argument('--seed', type=int, default=1, help='Random seed for the generated text')
+    args = arg_parser.parse_args()
+
+    entries = generate_corpus(args.out_dir, scaled_specs(args.scale), args.seed)
+    print(json.dumps(entries, indent=2))
+
+
+if __name__ == '__main__':
+    main()
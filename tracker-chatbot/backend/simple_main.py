@@ -111,7 +111,8 @@ async def upload_pdf(file: UploadFile = File(...)):
             f.write(content)
 
         pdf_content = global_parser.parse_pdf(temp_path)
-        chunks = global_chunker.chunk_document(pdf_content)
+        # Same merge step as app.api.main, so both entry points chunk a PDF alike
+        chunks = global_chunker.merge_small_chunks(global_chunker.chunk_document(pdf_content))
 
         print(f"Created {len(chunks)} chunks from PDF")
         print(f"Generating embeddings for {len(chunks)} chunks...")
@@ -0,0 +1,43 @@
+from app.pdf_processor.chunker import SemanticChunker
+
+
+def _table(rows):
+    header = ["Pin", "Signal", "Voltage", "Description"]
+    data = [header] + [[f"P{i}", f"GPIO{i}", "3.3V", f"General purpose line {i} of the tracker header"]
+                       for i in range(1, rows + 1)]
+    return {'page_number': 2, 'table_number': 1, 'data': data, 'rows': len(data), 'columns': len(header)}
+
+
+def _chunks(chunker, tables):
+    pages = [{'page_number': page, 'text': f"Page {page} explains the tracker wiring. " * 20} for page in (1, 2, 3)]
+    return chunker.merge_small_chunks(chunker.chunk_pages(pages, {'title': "manual.pdf"}, doc_id="doc", tables=tables))
+
+
+def test_children_are_never_longer_than_child_size():
+    chunker = SemanticChunker(chunk_size=1500, chunk_overlap=150, child_size=300, child_overlap=40)
+    parents = _chunks(chunker, [_table(40)])
+    table_parents = [parent for parent in parents if parent.metadata['chunk_type'] == 'table']
+    assert any(len(parent.content) > chunker.child_size for parent in table_parents)
+
+    children = chunker.split_children(parents)
+
+    assert children
+    assert all(len(child.content) <= chunker.child_size for child in children)
+
+
+def test_table_children_repeat_caption_and_header_and_keep_every_row():
+    chunker = SemanticChunker(chunk_size=1500, chunk_overlap=150, child_size=300, child_overlap=40)
+    parents = [parent for parent in _chunks(chunker, [_table(40)]) if parent.metadata['chunk_type'] == 'table']
+
+    for parent in parents:
+        caption, header, *rows = parent.content.split("\n")
+        children = chunker.split_children([parent])
+        assert len(children) > 1
+        assert [child.metadata['child_index'] for child in children] == list(range(1, len(children) + 1))
+        child_rows = []
+        for child in children:
+            child_caption, child_header, *part_rows = child.content.split("\n")
+            assert (child_caption, child_header) == (caption, header)
+            assert child.metadata['parent_id'] == parent.chunk_id
+            child_rows.extend(part_rows)
+        assert child_rows == rows
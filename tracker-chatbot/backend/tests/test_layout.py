@@ -0,0 +1,43 @@
+import pytest
+
+fitz = pytest.importorskip("fitz")
+
+from app.pdf_processor.layout import extract_text_blocks
+
+BODY = [
+    "The tracker reports its position over LoRa every minute.",
+    "It wakes the GPS module, waits for a fix and sends it.",
+    "Battery life depends on the reporting interval.",
+]
+
+
+def _page(doc):
+    """Tightly set body paragraphs under a real heading, then a loosely set TOC block in body type."""
+    page = doc.new_page()
+    page.insert_text((72, 80), "Hardware Setup", fontsize=14)
+    y = 120
+    for _ in range(4):
+        page.insert_text((72, y), BODY, fontsize=11, lineheight=1.2)
+        y += 60
+    page.insert_text((72, y), ["Contents", "1. Introduction 2", "2. Hardware Setup 3", "3. Wiring 5"],
+                     fontsize=11, lineheight=1.5)
+    return page
+
+
+def test_widely_spaced_multi_line_body_block_is_not_a_heading():
+    doc = fitz.open()
+    blocks = extract_text_blocks(_page(doc))
+
+    toc = next(block for block in blocks if block['text'].startswith("Contents"))
+    assert toc['text'].count("\n") == 3
+    # Its line pitch is well over HEADING_SIZE_RATIO times the body pitch; its type is not
+    assert (toc['bbox'][3] - toc['bbox'][1]) / 4 > 1.15 * 13.2
+    assert toc['font_size'] == 11.0
+    assert not toc['is_heading']
+
+
+def test_larger_type_is_a_heading():
+    doc = fitz.open()
+    blocks = extract_text_blocks(_page(doc))
+
+    assert [block['text'] for block in blocks if block['is_heading']] == ["Hardware Setup"]
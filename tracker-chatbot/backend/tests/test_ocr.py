@@ -0,0 +1,33 @@
+import time
+
+from app.pdf_processor import ocr
+from app.pdf_processor.ocr import OCRProcessor
+
+STUCK_PAGE = 2
+
+
+def _fake_ocr_page(file_path, page_num, dpi, language, timeout):
+    """Stands in for _ocr_page in the OCR workers; one page never finishes."""
+    if page_num + 1 == STUCK_PAGE:
+        time.sleep(600)
+    return f"Text of page {page_num + 1}"
+
+
+def test_stuck_page_does_not_hold_up_later_pages(monkeypatch):
+    monkeypatch.setattr(ocr, "_ocr_page", _fake_ocr_page)
+    monkeypatch.setattr(ocr, "RESULT_TIMEOUT_MARGIN", 3.0)
+    processor = OCRProcessor(workers=1, page_timeout=2.0)
+    processor.available = True
+    try:
+        start = time.monotonic()
+        pages = list(processor.ocr_pages("unused.pdf", [1, 2, 3, 4]))
+        elapsed = time.monotonic() - start
+    finally:
+        processor.close()
+
+    assert [page['page_number'] for page in pages] == [1, 3, 4]
+    assert [page['text'] for page in pages] == ["Text of page 1", "Text of page 3", "Text of page 4"]
+    stats = processor.get_stats()
+    assert (stats['pages_completed'], stats['pages_timed_out']) == (3, 1)
+    # One page budget for the stuck page, plus worker start-up, not one per later page
+    assert elapsed < 30
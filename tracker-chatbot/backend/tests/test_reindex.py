@@ -0,0 +1,81 @@
+import pytest
+
+pytest.importorskip("chromadb")
+
+from app.knowledge_base.vector_store import VectorStore
+from app.pdf_processor.chunker import SemanticChunker
+
+FILENAME = "manual.pdf"
+
+
+def _pages():
+    """Eight pages of marked sentences; page 4 is a short caption that gets merged into page 3."""
+    pages = []
+    for page_number in range(1, 9):
+        if page_number == 4:
+            text = "Figure p4s1 shows the wiring of the tracker board."
+        else:
+            text = " ".join(
+                f"Sentence p{page_number}s{i} describes how the tracker reports its position over LoRa."
+                for i in range(1, 13)
+            )
+        pages.append({'page_number': page_number, 'text': text})
+    return pages
+
+
+def _markers(pages):
+    return {word for page in pages for word in page['text'].split() if word.startswith('p') and 's' in word[1:]}
+
+
+def _documents(chunks):
+    return [{
+        'id': chunk.chunk_id,
+        'content': chunk.content,
+        'embedding': [1.0, 0.0],
+        'metadata': {
+            'filename': FILENAME,
+            'page_number': chunk.page_number,
+            'page_start': chunk.metadata.get('page_start', chunk.page_number),
+            'page_end': chunk.metadata.get('page_end', chunk.page_number),
+        }
+    } for chunk in chunks]
+
+
+def _index(store, chunker, pages):
+    chunks = chunker.merge_small_chunks(chunker.chunk_pages(pages, {'title': FILENAME}, doc_id="doc"))
+    store.upsert_documents(_documents(chunks))
+
+
+def _reindex(store, chunker, pages, selection):
+    """Re-index pages the way /api/upload does with a page selection."""
+    replaced = store.expand_page_selection(FILENAME, selection)
+    store.delete_pages(FILENAME, replaced)
+    _index(store, chunker, [page for page in pages if page['page_number'] in replaced])
+    return replaced
+
+
+def _indexed_markers(store):
+    return {word for content in store.collection.get(include=['documents'])['documents'] for word in content.split()}
+
+
+@pytest.mark.parametrize("cross_page", [False, True])
+def test_reindexing_one_page_keeps_every_page_searchable(tmp_path, cross_page):
+    store = VectorStore(persist_directory=str(tmp_path / "chroma"))
+    chunker = SemanticChunker(cross_page=cross_page)
+    pages = _pages()
+    _index(store, chunker, pages)
+    assert _markers(pages) <= _indexed_markers(store)
+
+    for selection in ([4], [5], [3, 7]):
+        replaced = _reindex(store, chunker, pages, selection)
+        assert set(selection) <= set(replaced)
+        assert _markers(pages) <= _indexed_markers(store), f"text lost re-indexing {selection}"
+
+
+def test_merged_chunk_widens_selection(tmp_path):
+    store = VectorStore(persist_directory=str(tmp_path / "chroma"))
+    _index(store, SemanticChunker(), _pages())
+
+    # The page 4 caption was merged into a chunk that starts on page 3
+    assert store.expand_page_selection(FILENAME, [4]) == [3, 4]
+    assert store.expand_page_selection(FILENAME, [1]) == [1]
@@ -0,0 +1,41 @@
+import os
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fitz")
+
+from app.pdf_processor.tables import TableExtractor
+
+CORPUS = Path(__file__).resolve().parent.parent / "benchmarks" / "synthetic_corpus"
+
+
+def _open_files(pid):
+    fd_dir = f"/proc/{pid}/fd"
+    files = set()
+    for fd in os.listdir(fd_dir):
+        try:
+            files.add(os.readlink(os.path.join(fd_dir, fd)))
+        except OSError:
+            pass
+    return files
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs /proc to list open files")
+def test_workers_close_the_document_once_the_batch_is_done():
+    path = str(CORPUS / "medium_tables.pdf")
+    extractor = TableExtractor(workers=2, page_timeout=60.0)
+    try:
+        tables = list(extractor.iter_tables(path, range(6)))
+        assert tables
+
+        processes = list(extractor._executor._processes.values())
+        assert len(processes) == 2
+        for process in processes:
+            assert path not in _open_files(process.pid)
+
+        # The same pool serves the next batch, reopening the file
+        assert list(extractor.iter_tables(path, range(2))) == [t for t in tables if t['page_number'] <= 2]
+        assert list(extractor._executor._processes.values()) == processes
+    finally:
+        extractor.close()
@@ -0,0 +1,29 @@
+import pytest
+
+pytest.importorskip("chromadb")
+
+from app.knowledge_base import vector_store as vector_store_module
+from app.knowledge_base.vector_store import VectorStore
+
+
+def _documents(count, page_number=1):
+    return [{
+        'id': f"chunk_{page_number}_{i}",
+        'content': f"chunk {i} of page {page_number}",
+        'embedding': [1.0, float(i)],
+        'metadata': {'filename': "manual.pdf", 'page_number': page_number,
+                     'page_start': page_number, 'page_end': page_number},
+    } for i in range(count)]
+
+
+def test_upsert_and_delete_more_ids_than_one_batch(tmp_path):
+    store = VectorStore(persist_directory=str(tmp_path / "chroma"))
+    count = vector_store_module._ID_BATCH * 2 + 7
+
+    assert len(store.upsert_documents(_documents(count))) == count
+    assert store.upsert_documents(_documents(count)) == []
+    assert len(store.upsert_documents(_documents(count) + _documents(3, page_number=2))) == 3
+    assert store.collection.count() == count + 3
+
+    assert store.delete_pages("manual.pdf", [1]) == count
+    assert store.collection.count() == 3